@@ -648,14 +648,23 @@ idma_lint_all: idma_lint_elab idma_lint_inst64
 
 .PHONY: idma_trace_clean
 
-IDMA_TRACE := $(IDMA_UTIL_DIR)/trace_idma.py
+IDMA_TRACE         := $(IDMA_UTIL_DIR)/trace_idma.py
+IDMA_TRACE_REPORTS ?= utilization stalls
 
 %_trace.rpt: $(IDMA_TRACE) $(IDMA_DB_FILES) %.txt
-	$(PYTHON) $(IDMA_TRACE) --db $(IDMA_DB_FILES) --trace $*.txt > $@
+	$(PYTHON) $(IDMA_TRACE) --db $(IDMA_DB_FILES) --trace $*.txt --report $(IDMA_TRACE_REPORTS) > $@
+
+# Summarized metrics of a trace, the baseline of a later `--compare`
+%_trace.json: $(IDMA_TRACE) $(IDMA_DB_FILES) %.txt
+	$(PYTHON) $(IDMA_TRACE) --db $(IDMA_DB_FILES) --trace $*.txt --summary $@
+
+# Burst lengths and split reasons of the legalizer
+%_splits.rpt: $(IDMA_UTIL_DIR)/trace_splits.py $(IDMA_DB_FILES) %.txt
+	$(PYTHON) $(IDMA_UTIL_DIR)/trace_splits.py --db $(IDMA_DB_FILES) --trace $*.txt > $@
 
 idma_trace_clean:
-	rm -f $(IDMA_VSIM_DIR)/*_trace.rpt
-	rm -f $(IDMA_VCS_DIR)/*_trace.rpt
+	rm -f $(IDMA_VSIM_DIR)/*_trace.rpt $(IDMA_VSIM_DIR)/*_trace.json $(IDMA_VSIM_DIR)/*_splits.rpt
+	rm -f $(IDMA_VCS_DIR)/*_trace.rpt $(IDMA_VCS_DIR)/*_trace.json $(IDMA_VCS_DIR)/*_splits.rpt
 
 
 # ---------------
@@ -444,6 +444,9 @@ _rsp_t ${mh_format['aw'][protocol]}${protocol}_write_rsp_i,
     //--------------------------------------
     logic req_valid_leg, leg_ready;
 % if compute_eligible:
+    // a request waits for the datapath to drain, observed by the tracer
+    logic compute_cfg_stall;
+
     if (EnableCompute) begin : gen_compute_cfg_gate
         // a request whose compute config differs from the last accepted one waits
         // until the datapath drained: its reads must not race a draining engine
@@ -458,9 +461,11 @@ _rsp_t ${mh_format['aw'][protocol]}${protocol}_write_rsp_i,
             if (!rst_ni)                        cmp_cfg_q <= '0;
             else if (req_valid_leg & leg_ready) cmp_cfg_q <= idma_req_i.opt.compute;
         end
+        assign compute_cfg_stall = cmp_cfg_stall;
     end else begin : gen_no_compute_cfg_gate
-        assign req_valid_leg = req_valid;
-        assign req_ready_o   = leg_ready;
+        assign req_valid_leg     = req_valid;
+        assign req_ready_o       = leg_ready;
+        assign compute_cfg_stall = 1'b0;
     end
 % else:
     assign req_valid_leg = req_valid;
@@ -383,6 +383,11 @@ ${rendered_read_ports[read_port]}
     //--------------------------------------
 
 % if compute_eligible:
+    // handshakes of the compute stage, observed by the tracer
+    logic compute_active;
+    logic compute_in_valid, compute_in_ready;
+    logic compute_out_valid, compute_out_ready;
+
     if (EnableCompute) begin : gen_compute
         logic                  cmp_active;
         logic                  cmp_in_ready;
@@ -414,11 +419,24 @@ ${rendered_read_ports[read_port]}
         assign wr_strb           = cmp_active ? cmp_strb_o : '1;
         assign dataflow_ready_in = cmp_active ? {StrbWidth{(&buffer_out_valid) & cmp_in_ready}}
                                               : buffer_out_ready_shifted;
+
+        // the output is accepted once all its valid lanes are
+        assign compute_active    = cmp_active;
+        assign compute_in_valid  = &buffer_out_valid;
+        assign compute_in_ready  = cmp_in_ready;
+        assign compute_out_valid = |cmp_lane_valid;
+        assign compute_out_ready = &(buffer_out_ready_shifted | ~cmp_lane_valid);
     end else begin : gen_no_compute
         assign wr_data           = buffer_out;
         assign wr_valid          = buffer_out_valid;
         assign wr_strb           = '1;
         assign dataflow_ready_in = buffer_out_ready_shifted;
+
+        assign compute_active    = 1'b0;
+        assign compute_in_valid  = 1'b0;
+        assign compute_in_ready  = 1'b0;
+        assign compute_out_valid = 1'b0;
+        assign compute_out_ready = 1'b0;
     end
 % else:
     assign wr_data           = buffer_out;
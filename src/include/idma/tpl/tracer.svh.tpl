@@ -5,8 +5,8 @@
 // Authors:
 // - Thomas Benz <tbenz@iis.ee.ethz.ch>
 
-// Shared resources of the iDMA backend tracer; the per-id macros live in
-// idma/tracer_<id>.svh and include this file themselves
+// Shared resources of the iDMA backend tracer and the midend tracers; the per-id
+// backend macros live in idma/tracer_<id>.svh and include this file themselves
 `ifndef IDMA_TRACER_SVH_
 `define IDMA_TRACER_SVH_
 
@@ -27,4 +27,5 @@
     if(__cond) begin <%text>\</%text>
         __cond = ~__cond; <%text>\</%text>
     end
+${midend_tracers}
 `endif
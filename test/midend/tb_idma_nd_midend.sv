@@ -449,6 +449,17 @@ module tb_idma_nd_midend import idma_pkg::*; #(
         `IDMA_TRACER_RW_AXI(i_idma_backend, trace_file);
     end
 
+    // the midend is traced into its own file, midend_trace.txt unless given on the CMD line
+    if (DmaTracing) begin : gen_midend_tracer
+        string midend_trace_file;
+        initial begin
+            if (!$value$plusargs("midend_trace_file=%s", midend_trace_file))
+                midend_trace_file = "midend_trace.txt";
+        end
+        // attach the tracer
+        `IDMA_TRACER_ND_MIDEND(i_idma_nd_midend, midend_trace_file);
+    end
+
 
     //--------------------------------------
     // TB connections
@@ -6,11 +6,14 @@
 // - Thomas Benz <tbenz@iis.ee.ethz.ch>
 // - Daniel Keller <dankeller@iis.ee.ethz.ch>
 
+`include "idma/tracer.svh"
 `include "idma/typedef.svh"
 
 /// Sanity testbench for the RT midend: checks bypass responses are routed
 /// to the bypass output, not lost to the internal sink.
-module tb_idma_rt_midend;
+module tb_idma_rt_midend #(
+    parameter bit DmaTracing = 1
+);
 
     logic clk;
     logic rst_n;
@@ -99,6 +102,17 @@ module tb_idma_rt_midend;
         .burst_rsp_ready_i ( byp_rsp_ready    )
     );
 
+    // the midend is traced into its own file, midend_trace.txt unless given on the CMD line
+    if (DmaTracing) begin : gen_midend_tracer
+        string midend_trace_file;
+        initial begin
+            if (!$value$plusargs("midend_trace_file=%s", midend_trace_file))
+                midend_trace_file = "midend_trace.txt";
+        end
+        // attach the tracer
+        `IDMA_TRACER_RT_MIDEND(i_idma_rt_midend, midend_trace_file);
+    end
+
     // Always accept the downstream request and acknowledge any response stream.
     assign out_req_ready = 1'b1;
     assign byp_rsp_ready = 1'b1;
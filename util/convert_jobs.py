@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Converts job files between the text and the binary format of `util/job_file.py`.
+
+The direction follows from the input: a text file becomes binary, a binary file text.
+The testbench loads job files ending in `.bin` as binary:
+
+    convert_jobs.py --infile soak.txt --outfile soak.bin
+    convert_jobs.py --infile nd.txt --num-dims 4 --outfile nd.bin
+    convert_jobs.py --infile soak.bin --outfile soak.txt
+"""
+
+import argparse
+import sys
+
+from job_file import JobFileError, bin_num_dims, is_binary, read_jobs, write_bin_jobs, \
+    write_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='convert_jobs',
+        description='Converts job files between the text and the binary format'
+    )
+    parser.add_argument('--infile', dest='infile', required=True,
+        help='Text or binary job file')
+    parser.add_argument('--outfile', dest='outfile', required=True,
+        help='Job file to write in the other format')
+    parser.add_argument('--num-dims', dest='num_dims', type=int, default=1,
+        help='NumDim of a text job file, the 1D transfer included')
+    args = parser.parse_args()
+
+    try:
+        if is_binary(args.infile):
+            num_dims = bin_num_dims(args.infile)
+            with open(args.outfile, 'w', encoding='utf8') as out:
+                num_jobs = write_jobs(out, read_jobs(args.infile, num_dims))
+        else:
+            with open(args.outfile, 'wb') as out:
+                num_jobs = write_bin_jobs(out, read_jobs(args.infile, args.num_dims),
+                    args.num_dims)
+    except JobFileError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    print(f'Converted {num_jobs} jobs to {args.outfile}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
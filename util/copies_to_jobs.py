@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Converts software copy logs into job files for replay in the standalone testbench.
+
+A copy log is a CSV of the copies firmware issued, e.g. profiled from its memcpy and DMA driver
+calls, one copy per row:
+
+    src,dst,length,reps,src_stride,dst_stride
+    0x80001000,0x10000000,256
+    0x80100000,0x10000400,64,16,0x200,0x40
+
+The columns are `src`, `dst` and `length`, optionally followed by `reps`, `src_stride` and
+`dst_stride` of each outer dimension, numbered from the second on: `reps2`, `src_stride2`, ...
+Without a header, the columns are taken in this order. A value in any other column, such as one
+of a dimension following a missing one, is rejected. Values are decimal or hex, lines starting
+with `#` are skipped. Strides are pitches, the distance between consecutive repetitions as
+software gives them; the ND midend adds a stride to the address of the last transfer instead, the
+pitches are converted unless `--stride jump`. Copies of zero bytes or zero repetitions copy
+nothing and are skipped.
+
+Each side of a copy is mapped by the first `--region LO,HI,PROTOCOL[,BASE]` holding all bytes it
+accesses: it is read or written over PROTOCOL, at BASE plus its offset in the region if given.
+Rebasing moves firmware windows into the testbench's `AddrWidth`. Regions rebased onto the same
+window of a protocol alias one memory, as cached and uncached views of a DRAM do; rebased windows
+overlapping otherwise are rejected. The protocols must be among those of the variant's backend
+id:
+
+    copies_to_jobs.py --db src/db/*.yml --variant r_obi_w_axi --infile copies.csv \\
+        --region 0x10000000,0x1001ffff,OBI \\
+        --region 0x80000000,0x8fffffff,AXI,0x20000000 \\
+        --region 0xa0000000,0xafffffff,AXI,0x20000000 --outfile fw.txt
+
+On an ND variant, a copy becomes one ND job with its unused dimensions bypassed; on a 1D variant,
+the copy is unrolled into one job per 1D transfer.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+
+from tabulate import tabulate
+from mario.database import read_database
+from mario.util import prepare_ids
+from gen_jobs import protocol_index
+from job_file import BURST_LEN, PROTOCOL_ENUM, Dim, Job, JobFileError, extent, to_jumps, \
+    to_pitches, write_job_file
+
+# the columns of a copy, then those of each outer dimension
+COLUMNS = ['src', 'dst', 'length']
+DIM_COLUMNS = ['reps', 'src_stride', 'dst_stride']
+
+
+def column(name: str, dim: int) -> str:
+    """Returns the column of a field of the outer dimension dim, 1 for the first"""
+    return f'{name}{dim if dim > 1 else ""}'
+
+
+class Region:
+    """A firmware address window, the protocol it is accessed over, and its rebased base"""
+
+    __slots__ = ('low', 'high', 'protocol', 'base')
+
+    def __init__(self, low: int, high: int, protocol: int, base: int = None):
+        self.low = low
+        self.high = high
+        self.protocol = protocol
+        self.base = low if base is None else base
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Region':
+        """Parses a region given as `LO,HI,PROTOCOL[,BASE]`"""
+        fields = [field.strip() for field in spec.split(',')]
+        if len(fields) not in (3, 4):
+            raise ValueError(f'expected LO,HI,PROTOCOL[,BASE], got {spec!r}')
+        low, high = int(fields[0], 0), int(fields[1], 0)
+        if low > high:
+            raise ValueError(f'region {spec!r} ends before it starts')
+        return cls(low, high, protocol_index(fields[2]),
+                   int(fields[3], 0) if len(fields) == 4 else None)
+
+    def __str__(self) -> str:
+        rebased = f' at 0x{self.base:x}' if self.base != self.low else ''
+        return f'0x{self.low:x}-0x{self.high:x} {PROTOCOL_ENUM[self.protocol]}{rebased}'
+
+    def target(self) -> tuple:
+        """Returns the first and last address of the rebased window"""
+        return self.base, self.base + self.high - self.low
+
+
+def check_aliases(regions: list):
+    """Raises a ValueError if rebased windows of a protocol overlap without aliasing"""
+    for idx, region in enumerate(regions):
+        for other in regions[:idx]:
+            if region.protocol != other.protocol or region.target() == other.target():
+                continue
+            (first, last), (other_first, other_last) = region.target(), other.target()
+            if first <= other_last and other_first <= last:
+                raise ValueError(f'regions {other} and {region} overlap once rebased; '
+                                 f'aliases must be rebased onto the same window')
+
+
+def unrolled(addr: int, pitches: list, reps: list):
+    """Yields the address of each 1D transfer of a side of a copy, innermost dimension first"""
+    idx = [0] * len(reps)
+    while True:
+        yield addr + sum(pos * pitch for pos, pitch in zip(idx, pitches))
+        for dim, num in enumerate(reps):
+            idx[dim] += 1
+            if idx[dim] < num:
+                break
+            idx[dim] = 0
+        else:
+            return
+
+
+class CopyLog:
+    """Reads a copy log and maps its copies onto the jobs of a backend variant"""
+
+    def __init__(self, args, regions: list, reads: set, writes: set, num_dims: int,
+                 addr_width: int):
+        self.args = args
+        self.regions = regions
+        self.protocols = {'src': reads, 'dst': writes}
+        self.num_dims = num_dims
+        self.addr_width = addr_width
+        self.counts = Counter()
+        self.hits = {side: Counter() for side in self.protocols}
+
+    def _rows(self):
+        """Yields the line and the fields of each copy of the log by column name"""
+        with open(self.args.infile, 'r', encoding='utf8', newline='') as log:
+            header = None
+            reader = csv.reader(log)
+            for row in reader:
+                if not row or not ''.join(row).strip() or row[0].lstrip().startswith('#'):
+                    continue
+                cells = [cell.strip() for cell in row]
+                if header is None:
+                    try:
+                        int(cells[0], 0)
+                        header = []
+                    except ValueError:
+                        header = [cell.lower() for cell in cells]
+                        continue
+                if header and len(cells) > len(header):
+                    raise JobFileError(self.args.infile, reader.line_num,
+                        f'{len(cells)} values, the header names {len(header)} columns')
+                # without a header, the columns are positional
+                num_dims = -(-(len(cells) - len(COLUMNS)) // len(DIM_COLUMNS))
+                names = header or COLUMNS + [column(name, dim + 1) for dim in range(num_dims)
+                                             for name in DIM_COLUMNS]
+                yield reader.line_num, dict(zip(names, cells))
+
+    def _copy(self, line: int, fields: dict) -> tuple:
+        """Returns the addresses, length, repetitions and pitches of a copy"""
+
+        def value(name: str) -> int:
+            try:
+                return int(fields[name], 0)
+            except KeyError:
+                raise JobFileError(self.args.infile, line, f'{name} missing') from None
+            except ValueError:
+                raise JobFileError(self.args.infile, line,
+                    f'{name}: expected a decimal or hex number, got {fields[name]!r}') from None
+
+        src, dst, length = (value(name) for name in COLUMNS)
+        if min(src, dst, length) < 0:
+            raise JobFileError(self.args.infile, line, 'negative address or length')
+        reps, pitches = [], {'src': [], 'dst': []}
+        while fields.get(column('reps', len(reps) + 1), ''):
+            dim = len(reps) + 1
+            reps.append(value(column('reps', dim)))
+            pitches['src'].append(value(column('src_stride', dim)))
+            pitches['dst'].append(value(column('dst_stride', dim)))
+
+        # a value no dimension took would be dropped silently, e.g. after a gap or a typo
+        used = COLUMNS + [column(name, dim + 1) for dim in range(len(reps))
+                          for name in DIM_COLUMNS]
+        unused = [name for name, cell in fields.items() if cell and name not in used]
+        if unused:
+            raise JobFileError(self.args.infile, line, f'{unused[0]} is not a column of the '
+                f'{len(reps) + 1} dimensions given, expected {", ".join(used)}')
+        if self.args.stride == 'jump':
+            pitches = {side: to_pitches(jumps, reps) for side, jumps in pitches.items()}
+        return src, dst, length, reps, pitches
+
+    def _map(self, line: int, side: str, addr: int, length: int, pitches: list,
+             reps: list) -> tuple:
+        """Returns the protocol and rebased address of a side, None if no region holds it"""
+
+        first, last = extent(addr, length, pitches, reps)
+        region = next((region for region in self.regions
+                       if region.low <= first and last <= region.high), None)
+        if region is None:
+            if self.args.skip_unmapped:
+                return None
+            raise JobFileError(self.args.infile, line,
+                f'{side} 0x{first:x}-0x{last:x} is in no region')
+        if region.protocol not in self.protocols[side]:
+            raise JobFileError(self.args.infile, line, f'the variant cannot '
+                f'{"read" if side == "src" else "write"} {PROTOCOL_ENUM[region.protocol]}')
+        if region.base + last - region.low >> self.addr_width:
+            raise JobFileError(self.args.infile, line,
+                f'{side} rebased beyond AddrWidth {self.addr_width}, rebase {region}')
+        self.hits[side][str(region)] += 1
+        return region.protocol, region.base + addr - region.low
+
+    def __iter__(self):
+        mask = (1 << self.addr_width) - 1
+        for line, fields in self._rows():
+            src, dst, length, reps, pitches = self._copy(line, fields)
+            self.counts['copies'] += 1
+            if not length or 0 in reps:
+                self.counts['empty copies skipped'] += 1
+                continue
+            if self.num_dims > 1 and len(reps) > self.num_dims - 1:
+                raise JobFileError(self.args.infile, line, f'{len(reps) + 1} dimensions, '
+                    f'the variant has NumDim {self.num_dims}')
+            mapped = [self._map(line, side, addr, length, pitches[side], reps)
+                      for side, addr in [('src', src), ('dst', dst)]]
+            if None in mapped:
+                self.counts['unmapped copies skipped'] += 1
+                continue
+            (src_protocol, src), (dst_protocol, dst) = mapped
+
+            def job(src_addr: int, dst_addr: int) -> Job:
+                return Job(length, src_addr, dst_addr, src_protocol, dst_protocol,
+                           self.args.max_src_len, self.args.max_dst_len,
+                           self.args.decouple_aw, self.args.decouple_rw)
+
+            if self.num_dims == 1:
+                for src_addr, dst_addr in zip(unrolled(src, pitches['src'], reps),
+                                              unrolled(dst, pitches['dst'], reps)):
+                    self.counts['jobs'] += 1
+                    yield job(src_addr, dst_addr)
+                continue
+            nd_job = job(src, dst)
+            jumps = {side: to_jumps(pitches[side], reps) for side in pitches}
+            nd_job.dims = [Dim(num, src_jump & mask, dst_jump & mask)
+                           for num, src_jump, dst_jump in zip(reps, jumps['src'], jumps['dst'])]
+            # unused dimensions are bypassed, but one must repeat for a transfer to issue
+            nd_job.dims += [Dim(0 if nd_job.dims or idx else 1, 0, 0)
+                            for idx in range(self.num_dims - 1 - len(nd_job.dims))]
+            self.counts['jobs'] += 1
+            yield nd_job
+
+    def format_report(self) -> str:
+        text = tabulate(self.counts.items(), headers=['log', 'number'])
+        rows = [[str(region), self.hits['src'][str(region)], self.hits['dst'][str(region)]]
+                for region in self.regions]
+        return text + '\n\n' + tabulate(rows, headers=['region', 'read', 'written'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='copies_to_jobs',
+        description='Converts software copy logs into job files'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True,
+        help='Protocol database files')
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', required=True,
+        help='Variant in jobs.json supplying the backend id, AddrWidth and NumDim')
+    parser.add_argument('--infile', dest='infile', required=True,
+        help='CSV copy log')
+    parser.add_argument('--outfile', dest='outfile', required=True,
+        help='Job file to write, binary if it ends in .bin')
+    parser.add_argument('--region', dest='regions', action='append', type=Region.parse,
+        required=True, metavar='LO,HI,PROTOCOL[,BASE]',
+        help='Address window, its protocol and where it is rebased to, first match wins')
+    parser.add_argument('--skip-unmapped', dest='skip_unmapped', action='store_true',
+        help='Skip copies outside all regions instead of failing')
+    parser.add_argument('--stride', dest='stride', choices=['pitch', 'jump'], default='pitch',
+        help='Whether the log gives the pitch of a dimension or the stride the midend adds')
+    parser.add_argument('--max-src-len', dest='max_src_len', type=int, default=BURST_LEN,
+        help='Maximum source burst length of the jobs')
+    parser.add_argument('--max-dst-len', dest='max_dst_len', type=int, default=BURST_LEN,
+        help='Maximum destination burst length of the jobs')
+    parser.add_argument('--decouple-aw', dest='decouple_aw', type=int, choices=[0, 1],
+        default=0, help='Decouple R-AW bit of the jobs')
+    parser.add_argument('--decouple-rw', dest='decouple_rw', type=int, choices=[0, 1],
+        default=0, help='Decouple R-W bit of the jobs')
+    args = parser.parse_args()
+
+    try:
+        check_aliases(args.regions)
+    except ValueError as err:
+        parser.error(str(err))
+
+    database = read_database(args.db)
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    if args.variant not in variants:
+        parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+    variant = variants[args.variant]
+    prot_info = prepare_ids([variant['proc_id']])[variant['proc_id']]
+    reads, writes = ({PROTOCOL_ENUM.index(database[prot]['protocol_enum'])
+                      for prot in prot_info[dir]} for dir in ['ar', 'aw'])
+    num_dims = variant['params'].get('NumDim', 1)
+    copies = CopyLog(args, args.regions, reads, writes, num_dims, variant['params']['AddrWidth'])
+
+    try:
+        num_jobs = write_job_file(args.outfile, copies, num_dims)
+    except JobFileError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    print(copies.format_report(), file=sys.stderr)
+    print(f'Converted {copies.counts["copies"]} copies into {num_jobs} jobs to {args.outfile}',
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Generates random job files in the 1D or ND format of `jobs/README.md`.
+
+Every field is drawn from a distribution given on the command line:
+
+  - `N`: always N,
+  - `uniform:LO,HI`: uniform in [LO, HI],
+  - `log:LO,HI`: log-uniform in [LO, HI], many short and few long values,
+  - `choice:A,B,...`: one of the values, weighted if given as `A=3,B=1`.
+
+Values may be hex. Protocols are weighted choices of their names or indices, e.g.
+`AXI=3,OBI=1`. Jobs are written as they are drawn, so soak files of millions of
+jobs take no memory, in the binary format if the output ends in `.bin`; the same seed and
+arguments give the same jobs:
+
+    gen_jobs.py --num-jobs 1000000 --length log:1,65536 --src-align choice:1,4,64 \\
+        --cross-page 0.3 --read-errors 0.01 --outfile soak.txt
+"""
+
+import argparse
+import math
+import random
+import sys
+
+from job_file import BURST_LEN, PROTOCOL_ENUM, Dim, InjectedError, Job, extent, side_pitches, \
+    write_bin_jobs, write_jobs
+
+# error handler options of an injected error, see idma_pkg::idma_eh_req_t
+ERROR_ACTIONS = ['c', 'a']
+
+# draws of the length and dimensions of a job before its ranges are deemed too small
+MAX_DRAWS = 100
+
+
+def parse_weighted(spec: str, parse_value=lambda value: int(value, 0)) -> tuple:
+    """Returns the values and weights of a comma-separated choice, `A=3,B=1` or `A,B`"""
+    values = []
+    weights = []
+    for item in spec.split(','):
+        value, _, weight = item.partition('=')
+        values.append(parse_value(value.strip()))
+        weights.append(float(weight) if weight else 1.0)
+    return values, weights
+
+
+def distribution(spec: str, rng: random.Random):
+    """Returns a function drawing integers from a distribution spec"""
+
+    kind, _, args = spec.partition(':')
+    if not args:
+        value = int(spec, 0)
+        return lambda: value
+    if kind == 'uniform':
+        low, high = (int(arg, 0) for arg in args.split(','))
+        return lambda: rng.randint(low, high)
+    if kind == 'log':
+        low, high = (int(arg, 0) for arg in args.split(','))
+        if low < 1:
+            raise ValueError(f'log-uniform needs a positive lower bound: {spec}')
+        log_low, log_high = math.log(low), math.log(high + 1)
+        return lambda: min(high, int(math.exp(rng.uniform(log_low, log_high))))
+    if kind == 'choice':
+        values, weights = parse_weighted(args)
+        return lambda: rng.choices(values, weights)[0]
+    raise ValueError(f'unknown distribution {kind} in {spec}')
+
+
+def protocol_index(name: str) -> int:
+    """Returns the index of a protocol given by name or index"""
+    if name.upper() in PROTOCOL_ENUM:
+        return PROTOCOL_ENUM.index(name.upper())
+    if not name.isdigit() or int(name) >= len(PROTOCOL_ENUM):
+        raise ValueError(f'unknown protocol {name}')
+    return int(name)
+
+
+class JobGenerator:
+    """Draws jobs from the distributions of the command line arguments"""
+
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.args = args
+        self.length = distribution(args.length, self.rng)
+        self.align = {'src': distribution(args.src_align, self.rng),
+                      'dst': distribution(args.dst_align, self.rng)}
+        self.ranges = {'src': args.src_range, 'dst': args.dst_range}
+        self.max_len = {'src': distribution(args.max_src_len, self.rng),
+                        'dst': distribution(args.max_dst_len, self.rng)}
+        self.protocols = {'src': parse_weighted(args.src_protocols, protocol_index),
+                          'dst': parse_weighted(args.dst_protocols, protocol_index)}
+        self.error_actions = parse_weighted(args.error_actions, str)
+        self.reps = distribution(args.reps, self.rng)
+        # strides are the jumps the midend adds after a transfer, `length` if dense
+        self.strides = {}
+        for side, spec in [('src', args.src_stride), ('dst', args.dst_stride)]:
+            self.strides[side] = None if spec == 'dense' else distribution(spec, self.rng)
+
+    def _address(self, side: str, length: int, dims: list) -> int:
+        """Draws an aligned address of one side, crossing a page boundary as often as asked
+
+        The first transfer starts at the address; the range is narrowed by what the other
+        transfers of an ND job reach below and beyond it, so all of them stay in range.
+        Returns None if the job does not fit the range.
+        """
+
+        size = max(length, 1)
+        below, beyond = extent(0, size, side_pitches(dims, side), [dim.reps for dim in dims])
+        low, high = self.ranges[side]
+        low, high = low - below, high - (beyond + 1 - size)
+        last_addr = high + 1 - size
+        if last_addr < low:
+            return None
+        align = max(1, self.align[side]())
+        page = self.args.page_size
+
+        # the pages a transfer starting in them, crossing or not, stays in range
+        first_page = -(-low // page)
+        last_page = (high + 1 - page - size) // page
+        if self.args.cross_page is not None and length <= page and first_page <= last_page:
+            base = self.rng.randint(first_page, last_page) * page
+            if self.rng.random() < self.args.cross_page and length:
+                first, last = page - length + 1, page - 1
+            else:
+                first, last = 0, page - size
+            first = -(-first // align) * align
+            if first <= last:
+                return base + first + self.rng.randint(0, (last - first) // align) * align
+
+        # unconstrained, or the transfer does not fit a page anyway
+        return low + self.rng.randint(0, (last_addr - low) // align) * align
+
+    def _errors(self, job: Job) -> list:
+        """Draws the errors the memory injects into a job, at addresses the job accesses"""
+
+        errors = []
+        if not job.length:
+            return errors
+        for addr, is_read, prob in [(job.src_addr, True, self.args.read_errors),
+                                    (job.dst_addr, False, self.args.write_errors)]:
+            if self.rng.random() < prob:
+                action = self.rng.choices(*self.error_actions)[0]
+                errors.append(InjectedError(is_read, action,
+                    addr + self.rng.randrange(job.length)))
+        return errors
+
+    def _dims(self, length: int) -> list:
+        """Draws the repetitions and strides of the outer dimensions of an ND job"""
+
+        dims = []
+        for _ in range(self.args.num_dims - 1):
+            reps = self.reps()
+            strides = {side: length if self.strides[side] is None else self.strides[side]()
+                       for side in ['src', 'dst']}
+            dims.append(Dim(reps, strides['src'], strides['dst']))
+        return dims
+
+    def _draw_fitting(self, idx: int) -> tuple:
+        """Draws the length, dimensions and addresses of a job until it fits both ranges"""
+
+        for _ in range(MAX_DRAWS):
+            length = self.length()
+            dims = self._dims(length) if self.args.format == 'nd' else []
+            addrs = {side: self._address(side, length, dims) for side in ['src', 'dst']}
+            if None not in addrs.values():
+                return length, dims, addrs
+        misfits = [f'--{side}-range 0x{self.ranges[side][0]:x},0x{self.ranges[side][1]:x}'
+                   for side in ['src', 'dst'] if addrs[side] is None]
+        raise ValueError(f'job {idx}: no length and dimensions of {MAX_DRAWS} draws fit '
+                         f'{" and ".join(misfits)}')
+
+    def __iter__(self):
+        for idx in range(self.args.num_jobs):
+            length, dims, addrs = self._draw_fitting(idx)
+            job = Job(
+                length=length,
+                src_addr=addrs['src'],
+                dst_addr=addrs['dst'],
+                src_protocol=self.rng.choices(*self.protocols['src'])[0],
+                dst_protocol=self.rng.choices(*self.protocols['dst'])[0],
+                max_src_len=self.max_len['src'](),
+                max_dst_len=self.max_len['dst'](),
+                decouple_aw=int(self.rng.random() < self.args.decouple_aw),
+                decouple_rw=int(self.rng.random() < self.args.decouple_rw)
+            )
+            job.dims = dims
+            job.errors = self._errors(job)
+            yield job
+
+
+def parse_range(spec: str) -> tuple:
+    low, high = (int(value, 0) for value in spec.split(','))
+    if low > high:
+        raise argparse.ArgumentTypeError(f'{spec} starts above its end')
+    return low, high
+
+
+def probability(spec: str) -> float:
+    value = float(spec)
+    if not 0.0 <= value <= 1.0:
+        raise argparse.ArgumentTypeError(f'{spec} is not a probability')
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='gen_jobs',
+        description='Generates random job files'
+    )
+    parser.add_argument('--seed', dest='seed', type=int, default=1773,
+        help='Seed of the random number generator')
+    parser.add_argument('--num-jobs', dest='num_jobs', type=int, required=True,
+        help='Number of jobs to generate')
+    parser.add_argument('--format', dest='format', choices=['1d', 'nd'], default='1d',
+        help='Job file format, 1d for the backend or nd for the ND midend')
+    parser.add_argument('--num-dims', dest='num_dims', type=int, default=4,
+        help='NumDim of the ND testbench, the 1D transfer included')
+    parser.add_argument('--outfile', dest='outfile', default='-',
+        help='Job file to write, - for stdout, binary if it ends in .bin')
+    parser.add_argument('--length', dest='length', default='log:1,16384',
+        help='Distribution of the 1D length in bytes')
+    parser.add_argument('--src-range', dest='src_range', type=parse_range,
+        default=(0, 0xffffffff), metavar='LO,HI', help='Source address range')
+    parser.add_argument('--dst-range', dest='dst_range', type=parse_range,
+        default=(0, 0xffffffff), metavar='LO,HI', help='Destination address range')
+    parser.add_argument('--src-align', dest='src_align', default='1',
+        help='Distribution of the alignment of source addresses in bytes')
+    parser.add_argument('--dst-align', dest='dst_align', default='1',
+        help='Distribution of the alignment of destination addresses in bytes')
+    parser.add_argument('--page-size', dest='page_size', type=int, default=4096,
+        help='Page size in bytes for --cross-page')
+    parser.add_argument('--cross-page', dest='cross_page', type=probability,
+        help='Probability a transfer fitting a page crosses a page boundary, '
+             'unconstrained if not given')
+    parser.add_argument('--max-src-len', dest='max_src_len', default=str(BURST_LEN),
+        help='Distribution of the maximum source burst length in beats')
+    parser.add_argument('--max-dst-len', dest='max_dst_len', default=str(BURST_LEN),
+        help='Distribution of the maximum destination burst length in beats')
+    parser.add_argument('--decouple-aw', dest='decouple_aw', type=probability, default=0.0,
+        help='Probability of decoupling R and AW')
+    parser.add_argument('--decouple-rw', dest='decouple_rw', type=probability, default=0.0,
+        help='Probability of decoupling R and W')
+    parser.add_argument('--src-protocols', dest='src_protocols', default='AXI',
+        help='Weighted source protocols, e.g. AXI=3,OBI=1')
+    parser.add_argument('--dst-protocols', dest='dst_protocols', default='AXI',
+        help='Weighted destination protocols')
+    parser.add_argument('--read-errors', dest='read_errors', type=probability, default=0.0,
+        help='Probability a job has a read error injected')
+    parser.add_argument('--write-errors', dest='write_errors', type=probability, default=0.0,
+        help='Probability a job has a write error injected')
+    parser.add_argument('--error-actions', dest='error_actions', default='c',
+        help='Weighted error handler actions, c(ontinue) or a(bort), e.g. c=3,a=1')
+    parser.add_argument('--reps', dest='reps', default='choice:1,2,4',
+        help='Distribution of the repetitions of each ND dimension')
+    parser.add_argument('--src-stride', dest='src_stride', default='dense',
+        help='Distribution of the source strides the midend adds after a transfer, negative '
+             'to jump back, dense for contiguous dimensions')
+    parser.add_argument('--dst-stride', dest='dst_stride', default='dense',
+        help='Distribution of the destination strides, see --src-stride')
+    args = parser.parse_args()
+
+    for action in parse_weighted(args.error_actions, str)[0]:
+        if action not in ERROR_ACTIONS:
+            parser.error(f'unknown error action {action}')
+    try:
+        generator = JobGenerator(args)
+    except ValueError as err:
+        parser.error(str(err))
+
+    if args.outfile.endswith('.bin'):
+        try:
+            with open(args.outfile, 'wb') as out:
+                write_bin_jobs(out, generator, args.num_dims if args.format == 'nd' else 1)
+        except ValueError as err:
+            print(err, file=sys.stderr)
+            return 1
+        print(f'Generated {args.num_jobs} jobs to {args.outfile}', file=sys.stderr)
+        return 0
+
+    out = sys.stdout if args.outfile == '-' else open(args.outfile, 'w', encoding='utf8')
+    try:
+        write_jobs(out, generator)
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if out is not sys.stdout:
+        print(f'Generated {args.num_jobs} jobs to {args.outfile}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Generates job suites stressing one performance regime each, with their expected utilization.
+
+The suites of a `jobs.json` variant are:
+
+  - `perf_small_unaligned`: back-to-back copies of up to two words at unrelated offsets,
+  - `perf_page_cross`: transfers crossing a page boundary of their protocols,
+  - `perf_max_burst`: page-aligned transfers of maximum-length bursts, saturating
+    `NumAxInFlight`,
+  - `perf_alt_protocols`: transfers alternating over all protocol pairs, on variants with more
+    than one read or write protocol,
+  - `perf_coupled` and `perf_decoupled`: the same transfers of a few words with R-AW and R-W
+    coupled and decoupled, short enough for the coupler to cost bandwidth.
+
+Jobs never overlap, so the testbench never serializes them. The decoupled suite is only
+generated for variants whose R-AW coupler `perf_model.py` models, as the model predicts the
+same for both otherwise.
+
+The expected minimum write utilization of each suite is the utilization `perf_model.py`
+predicts for its regime, e.g. a coupled AW waiting for its read data, capped by the bound of
+`perf_bound.py`. It is lowered by the largest relative error of the predicted cycles the
+calibration measured, so a run the model predicts as well as the calibration runs passes. Only
+variants whose latencies were calibrated against traces (`run_verify.py --perf --calibrate`,
+stored in `--latencies`) get an expectation, and their decoupled suite is dropped unless the
+model tells it apart from the coupled one by more than that error. The suites are written next
+to the variant's job files, and the `jobs.json` entries naming them and their expected
+utilization are printed:
+
+    gen_perf_suites.py --db src/db/*.yml --variant rw_axi r_axi_w_obi
+
+With `--check`, nothing is written; the run fails if the suites or expectations in
+`jobs.json` differ from the ones generated. `perf_bound.py --trace` fails a run of a suite
+below its expected utilization, `run_verify.py --perf` runs all suites of a variant. Requires
+NumPy, as `perf_model.py` does.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+from tabulate import tabulate
+from mario.database import read_database
+from mario.util import prepare_ids
+from job_file import BURST_LEN, PROTOCOL_ENUM, Job, JobFileError, read_jobs, write_job_file
+from legalizer_model import jobs_to_arrays
+from perf_bound import MAX_PAGE_ADDR_WIDTH, file_bound, protocol_db
+from perf_model import BackendModel, read_calibration
+
+# base addresses of the source and destination regions the suites allocate from
+SRC_BASE = 0x1000_0000
+DST_BASE = 0x4000_0000
+
+# pages of one transfer of maximum-length bursts
+MAX_BURST_PAGES = 4
+
+# most words of a transfer of the coupled and decoupled suites
+RW_MAX_WORDS = 8
+
+
+class SuiteGenerator:
+    """Draws the jobs of the suites of one variant"""
+
+    def __init__(self, database: dict, reads: list, writes: list, strb_width: int,
+                 num_jobs: int, seed: int):
+        self.database = database
+        self.reads = reads
+        self.writes = writes
+        self.strb_width = strb_width
+        self.num_jobs = num_jobs
+        self.seed = seed
+
+    def _page(self, protocol: int) -> int:
+        prot = protocol_db(self.database, protocol)
+        return min(prot.get('page_size', 1 << MAX_PAGE_ADDR_WIDTH), 1 << MAX_PAGE_ADDR_WIDTH)
+
+    def _jobs(self, name: str, draw, packed: bool = False) -> list:
+        """Returns the jobs a draw function places one after the other
+
+        Packed jobs start right after the byte the testbench's overlap check counts as the
+        end of the previous one, others on the next page.
+        """
+
+        rng = random.Random(f'{self.seed}/{name}')
+        cursor = {'src': SRC_BASE, 'dst': DST_BASE}
+        jobs = []
+        for idx in range(self.num_jobs):
+            job = draw(rng, idx, cursor)
+            for side in cursor:
+                end = getattr(job, f'{side}_addr') + job.length
+                cursor[side] = end + 1 if packed else \
+                    (end >> MAX_PAGE_ADDR_WIDTH) + 1 << MAX_PAGE_ADDR_WIDTH
+            jobs.append(job)
+        return jobs
+
+    def small_unaligned(self) -> list:
+        def draw(rng, _, cursor):
+            return Job(rng.randint(1, 2 * self.strb_width),
+                       cursor['src'] + rng.randrange(self.strb_width),
+                       cursor['dst'] + rng.randrange(self.strb_width),
+                       self.reads[0], self.writes[0])
+        return self._jobs('small_unaligned', draw, packed=True)
+
+    def page_cross(self) -> list:
+        src_page, dst_page = self._page(self.reads[0]), self._page(self.writes[0])
+
+        def draw(rng, _, cursor):
+            length = rng.randint(2 * self.strb_width, min(src_page, dst_page) // 2)
+            return Job(length,
+                       cursor['src'] + src_page - rng.randint(1, length - 1),
+                       cursor['dst'] + dst_page - rng.randint(1, length - 1),
+                       self.reads[0], self.writes[0])
+        return self._jobs('page_cross', draw)
+
+    def max_burst(self) -> list:
+        def draw(_, __, cursor):
+            return Job(MAX_BURST_PAGES << MAX_PAGE_ADDR_WIDTH, cursor['src'], cursor['dst'],
+                       self.reads[0], self.writes[0])
+        return self._jobs('max_burst', draw)
+
+    def alt_protocols(self) -> list:
+        pairs = [(read, write) for read in self.reads for write in self.writes]
+
+        def draw(rng, idx, cursor):
+            return Job(rng.randint(1, 4) * BURST_LEN, cursor['src'], cursor['dst'],
+                       *pairs[idx % len(pairs)])
+        return self._jobs('alt_protocols', draw)
+
+    def _rw(self, decouple: int) -> list:
+        def draw(rng, _, cursor):
+            return Job(rng.randint(2, RW_MAX_WORDS) * self.strb_width, cursor['src'], cursor['dst'],
+                       self.reads[0], self.writes[0], decouple_aw=decouple,
+                       decouple_rw=decouple)
+        return self._jobs('rw', draw)
+
+    def suites(self, couples: bool) -> dict:
+        """Returns the jobs of each suite of the variant, the decoupled one if it couples R-AW"""
+
+        suites = {
+            'perf_small_unaligned': self.small_unaligned(),
+            'perf_page_cross': self.page_cross(),
+            'perf_max_burst': self.max_burst()
+        }
+        if len(self.reads) > 1 or len(self.writes) > 1:
+            suites['perf_alt_protocols'] = self.alt_protocols()
+        suites['perf_coupled'] = self._rw(0)
+        if couples:
+            suites['perf_decoupled'] = self._rw(1)
+        return suites
+
+
+def expectation(modelled: float, bound: float, error: float) -> float:
+    """Returns the utilization a run must achieve, the model's within its cycle error"""
+    return math.floor(min(modelled, bound) / (1 + error) * 1e4) / 1e4
+
+
+def _same_jobs(path: str, jobs: list) -> bool:
+    """Returns whether the job file at path holds exactly the jobs"""
+    try:
+        return list(read_jobs(path)) == jobs
+    except (OSError, JobFileError):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='gen_perf_suites',
+        description='Generates performance regime suites with their expected utilization'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True,
+        help='Protocol database files')
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variants')
+    parser.add_argument('--variant', dest='variant', nargs='+', required=True,
+        help='1D backend variants in jobs.json')
+    parser.add_argument('--num-jobs', dest='num_jobs', type=int, default=100,
+        help='Number of jobs per suite')
+    parser.add_argument('--latencies', dest='latencies',
+        help='JSON file of the latencies perf_model.py calibrated per variant, '
+             'perf_latencies.json next to jobs.json by default')
+    parser.add_argument('--seed', dest='seed', type=int, default=1773,
+        help='Seed of the random number generator')
+    parser.add_argument('--check', dest='check', action='store_true',
+        help='Fail if jobs.json and its suites differ from the generated ones, write nothing')
+    args = parser.parse_args()
+
+    database = read_database(args.db)
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    latencies_file = args.latencies or \
+        os.path.join(os.path.dirname(args.jobs), 'perf_latencies.json')
+
+    rows = []
+    entries = {}
+    written = {}
+    stale = []
+    for name in args.variant:
+        if name not in variants:
+            parser.error(f'unknown variant {name}, one of {", ".join(variants)}')
+        variant = variants[name]
+        if variant['params'].get('NumDim', 1) != 1:
+            parser.error(f'{name} is an ND variant, the suites are 1D')
+        prot_info = prepare_ids([variant['proc_id']])[variant['proc_id']]
+        # the first protocol of each direction carries the suites, bursting ones preferred
+        reads, writes = ([PROTOCOL_ENUM.index(database[prot]['protocol_enum'])
+                          for prot in sorted(prot_info[dir], key=lambda prot: (
+                              database[prot]['bursts'] == 'not_supported',
+                              database[prot]['protocol_enum'] == 'INIT'))]
+                         for dir in ['ar', 'aw'])
+        strb_width = variant['params']['DataWidth'] // 8
+        generator = SuiteGenerator(database, reads, writes, strb_width, args.num_jobs, args.seed)
+        tb_params = variant.get('tb_params', {})
+        latencies, error = read_calibration(latencies_file, name) \
+            if os.path.isfile(latencies_file) else (None, None)
+        model = BackendModel(database, variant['proc_id'], variant['params'], tb_params,
+                             latencies)
+        couples = model.raw_coupling and not model.aw_decoupled[writes[0]]
+
+        job_dir = os.path.dirname(next(iter(variant['jobs'].values())))
+        suites = generator.suites(couples)
+        modelled = {}
+        for suite, jobs in suites.items():
+            _, bound = file_bound(jobs, database, variant['proc_id'], variant['params'],
+                                  tb_params)
+            modelled[suite] = (bound['write_utilization'],
+                               model.run(jobs_to_arrays(jobs))['utilization'])
+        # a regime the calibrated model cannot tell apart expects nothing of its own
+        if error is not None and couples and abs(modelled['perf_coupled'][1] -
+                modelled['perf_decoupled'][1]) <= error * modelled['perf_decoupled'][1]:
+            del suites['perf_decoupled']
+
+        entries[name] = {'jobs': {}}
+        if error is not None:
+            entries[name]['perf'] = {}
+        for suite, jobs in suites.items():
+            rel = f'{job_dir}/{suite}.txt'
+            path = os.path.join(os.path.dirname(args.jobs), rel)
+            # variants sharing their job files must share the suites
+            if written.setdefault(rel, jobs) != jobs:
+                parser.error(f'{name} draws other jobs into {rel} than a variant before')
+            if not args.check:
+                write_job_file(path, jobs)
+            elif variant['jobs'].get(suite) != rel or not _same_jobs(path, jobs):
+                stale.append(f'{name}: {rel}')
+            bound, predicted = modelled[suite]
+            entries[name]['jobs'][suite] = rel
+            if error is not None:
+                entries[name]['perf'][suite] = expectation(predicted, bound, error)
+            rows.append([name, suite, len(jobs), bound, predicted,
+                         entries[name].get('perf', {}).get(suite)])
+        if args.check:
+            listed = {job for job in variant['jobs'] if job.startswith('perf_')}
+            if listed != set(suites):
+                stale.append(f'{name}: jobs')
+            if variant.get('perf') != entries[name].get('perf'):
+                stale.append(f'{name}: perf')
+
+    print(tabulate(rows, headers=['variant', 'suite', 'jobs', 'bound', 'model', 'expected'],
+                   floatfmt='.4f', missingval='uncalibrated'), file=sys.stderr)
+    if args.check:
+        for entry in stale:
+            print(f'{entry} differs from the generated suites', file=sys.stderr)
+        return 1 if stale else 0
+    print(json.dumps(entries, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,435 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Streaming parser and writer of the job files of `jobs/README.md`.
+
+Jobs are read one at a time into `Job` records, so files of any size take constant
+memory. 1D files are read with `num_dims=1`; ND files, which hold `num_dims - 1`
+repetition and stride triplets per job, with the testbench's `NumDim`. Each field is
+validated the way the testbench reads it; a malformed field raises a `JobFileError`
+naming the file and line:
+
+    for job in read_jobs('jobs/backend_rw_axi/tiny.txt'):
+        ...
+    with open('out.txt', 'w', encoding='utf8') as out:
+        write_jobs(out, jobs)
+
+Soak files of millions of jobs can also be stored in a binary format the testbench loads
+much faster, picked by its `.bin` extension. All numbers are big-endian, as `$fread` fills
+a variable from its most significant byte on:
+
+  - a 16 B header: the magic `IDMAJOBS`, the format version (u16), `NumDim` (u16), and
+    four reserved bytes,
+  - per job a 40 B record: length, source and destination address (u64 each), source and
+    destination protocol (u8 each), flags (u8, bit 0 decouple R-AW, bit 1 decouple R-W),
+    a reserved byte, the maximum source and destination burst length (u16 each), the
+    number of errors (u32), and four reserved bytes,
+  - then `NumDim - 1` repetitions, source and destination strides (u64 each),
+  - and per error a flags byte (bit 0 read, bit 1 abort) and its address (u64).
+
+`read_jobs` reads either format; `write_bin_jobs` writes the binary one, and
+`write_job_file` the one the extension of a file name picks.
+"""
+
+import re
+import struct
+from itertools import islice
+from operator import itemgetter
+
+# protocol indices in the job files, see idma_pkg::protocol_e
+PROTOCOL_ENUM = ['AXI', 'OBI', 'AXILITE', 'TILELINK', 'INIT', 'AXI_STREAM']
+
+# burst length the backend is built with if a job does not reduce it
+BURST_LEN = 256
+
+# strides are held as 64 bit two's complement, as the binary format stores them; the midend
+# adds them modulo its AddrWidth, so a negative stride is a backward jump
+STRIDE_WIDTH = 64
+
+# read or write, continue or abort, and the byte address, e.g. rc0x4
+ERROR_PATTERN = re.compile(r'([rw])([ca])0x([0-9a-fA-F]+)')
+
+# the binary format, see tb_tasks.svh:read_jobs_bin
+BIN_MAGIC = b'IDMAJOBS'
+BIN_VERSION = 1
+BIN_HEADER = struct.Struct('>8sHH4x')
+BIN_JOB = struct.Struct('>QQQBBBxHHI4x')
+BIN_DIM = struct.Struct('>QQQ')
+BIN_ERROR = struct.Struct('>BQ')
+
+
+class JobFileError(ValueError):
+    """A malformed job file, raised with the file and line of the offending field"""
+
+    def __init__(self, fn: str, line: int, msg: str):
+        super().__init__(f'{fn}:{line}: {msg}' if line is not None else f'{fn}: {msg}')
+        self.fn = fn
+        self.line = line
+
+
+class InjectedError:
+    """An error the testbench memory injects at an address a job reads or writes"""
+
+    __slots__ = ('is_read', 'action', 'addr')
+
+    def __init__(self, is_read: bool, action: str, addr: int):
+        self.is_read = is_read
+        self.action = action
+        self.addr = addr
+
+    @classmethod
+    def parse(cls, text: str):
+        match = ERROR_PATTERN.fullmatch(text)
+        if not match:
+            raise ValueError(f'malformed error {text!r}, expected e.g. rc0x4')
+        return cls(match[1] == 'r', match[2], int(match[3], 16))
+
+    def __str__(self) -> str:
+        return f'{"r" if self.is_read else "w"}{self.action}0x{self.addr:x}'
+
+    def __repr__(self) -> str:
+        return f'InjectedError({str(self)!r})'
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, InjectedError) and str(self) == str(other)
+
+
+def wrap_stride(stride: int) -> int:
+    """Returns a stride of -2^63 up to 2^64 - 1 as its 64 bit two's complement"""
+    if not -(1 << (STRIDE_WIDTH - 1)) <= stride < 1 << STRIDE_WIDTH:
+        raise ValueError(f'stride {stride} does not fit {STRIDE_WIDTH} bit')
+    return stride & ((1 << STRIDE_WIDTH) - 1)
+
+
+def signed_stride(stride: int) -> int:
+    """Returns the signed jump a stride of a `Dim` stands for"""
+    return stride - (1 << STRIDE_WIDTH) if stride >> (STRIDE_WIDTH - 1) else stride
+
+
+def to_jumps(pitches: list, reps: list) -> list:
+    """Returns the strides the ND midend adds after a transfer, given the pitches of dimensions"""
+    jumps = []
+    inner = 0
+    for pitch, num in zip(pitches, reps):
+        jumps.append(pitch - inner)
+        inner += (max(num, 1) - 1) * pitch
+    return jumps
+
+
+def to_pitches(jumps: list, reps: list) -> list:
+    """Returns the pitches of dimensions, given the strides the ND midend adds"""
+    pitches = []
+    inner = 0
+    for jump, num in zip(jumps, reps):
+        pitches.append(jump + inner)
+        inner += (max(num, 1) - 1) * pitches[-1]
+    return pitches
+
+
+def extent(addr: int, length: int, pitches: list, reps: list) -> tuple:
+    """Returns the first and last byte a side of an ND job accesses, bypassed dimensions once"""
+    spans = [(max(num, 1) - 1) * pitch for pitch, num in zip(pitches, reps)]
+    return (addr + sum(min(0, span) for span in spans),
+            addr + sum(max(0, span) for span in spans) + length - 1)
+
+
+def side_pitches(dims: list, side: str) -> list:
+    """Returns the signed pitches of the `src` or `dst` side of the dimensions of a job"""
+    return to_pitches([signed_stride(getattr(dim, f'{side}_stride')) for dim in dims],
+                      [dim.reps for dim in dims])
+
+
+class Dim:
+    """The repetitions and strides of one outer dimension of an ND job
+
+    Negative strides are stored as their 64 bit two's complement, so a job always writes
+    as a file its reader accepts; `signed_stride` recovers the jump.
+    """
+
+    __slots__ = ('reps', 'src_stride', 'dst_stride')
+
+    def __init__(self, reps: int, src_stride: int, dst_stride: int):
+        if not 0 <= reps < 1 << 64:
+            raise ValueError(f'repetitions {reps} do not fit 64 bit unsigned')
+        self.reps = reps
+        self.src_stride = wrap_stride(src_stride)
+        self.dst_stride = wrap_stride(dst_stride)
+
+    def __repr__(self) -> str:
+        return f'Dim({self.reps}, 0x{self.src_stride:x}, 0x{self.dst_stride:x})'
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Dim) and \
+            (self.reps, self.src_stride, self.dst_stride) == \
+            (other.reps, other.src_stride, other.dst_stride)
+
+
+class Job:
+    """One job; `line` is the line it starts at if it was read from a file"""
+
+    __slots__ = ('length', 'src_addr', 'dst_addr', 'src_protocol', 'dst_protocol',
+                 'max_src_len', 'max_dst_len', 'decouple_aw', 'decouple_rw', 'dims', 'errors',
+                 'line')
+
+    def __init__(self, length: int, src_addr: int, dst_addr: int, src_protocol: int = 0,
+                 dst_protocol: int = 0, max_src_len: int = BURST_LEN,
+                 max_dst_len: int = BURST_LEN, decouple_aw: int = 0, decouple_rw: int = 0,
+                 dims: list = None, errors: list = None, line: int = None):
+        self.length = length
+        self.src_addr = src_addr
+        self.dst_addr = dst_addr
+        self.src_protocol = src_protocol
+        self.dst_protocol = dst_protocol
+        self.max_src_len = max_src_len
+        self.max_dst_len = max_dst_len
+        self.decouple_aw = decouple_aw
+        self.decouple_rw = decouple_rw
+        self.dims = dims or []
+        self.errors = errors or []
+        self.line = line
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__[:-1])
+        return f'Job({fields})'
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Job) and \
+            all(getattr(self, name) == getattr(other, name) for name in self.__slots__[:-1])
+
+
+HEX_PATTERN = re.compile(r'0[xX][0-9a-fA-F]+')
+
+
+def _unsigned(text: str) -> int:
+    if not (text.isascii() and text.isdigit()):
+        raise ValueError(f'expected an unsigned decimal, got {text!r}')
+    return int(text)
+
+
+def _hex(text: str) -> int:
+    if not HEX_PATTERN.fullmatch(text):
+        raise ValueError(f'expected a 0x-prefixed hex number, got {text!r}')
+    return int(text, 16)
+
+
+def _u64(text: str) -> int:
+    value = _unsigned(text)
+    if value >> 64:
+        raise ValueError(f'{text} does not fit 64 bit')
+    return value
+
+
+def _stride(text: str) -> int:
+    value = _hex(text)
+    if value >> STRIDE_WIDTH:
+        raise ValueError(f'{text} does not fit {STRIDE_WIDTH} bit')
+    return value
+
+
+def _protocol(text: str) -> int:
+    value = _unsigned(text)
+    if value >= len(PROTOCOL_ENUM):
+        raise ValueError(f'protocol {value} is not one of 0 to {len(PROTOCOL_ENUM) - 1}')
+    return value
+
+
+def _burst_len(text: str) -> int:
+    value = _unsigned(text)
+    if not 1 <= value <= BURST_LEN:
+        raise ValueError(f'burst length {value} is not within 1 to {BURST_LEN}')
+    return value
+
+
+def _bit(text: str) -> int:
+    if text not in ('0', '1'):
+        raise ValueError(f'expected a bit, got {text!r}')
+    return int(text)
+
+
+# the fields of a job up to its dimensions, their parsers and their names in errors
+FIELDS = [
+    ('length', _unsigned, 'length'),
+    ('src_addr', _hex, 'source address'),
+    ('dst_addr', _hex, 'destination address'),
+    ('src_protocol', _protocol, 'source protocol'),
+    ('dst_protocol', _protocol, 'destination protocol'),
+    ('max_src_len', _burst_len, 'maximum source burst length'),
+    ('max_dst_len', _burst_len, 'maximum destination burst length'),
+    ('decouple_aw', _bit, 'decouple R-AW'),
+    ('decouple_rw', _bit, 'decouple R-W')
+]
+DIM_FIELDS = [
+    (_u64, 'repetitions'),
+    (_stride, 'source stride'),
+    (_stride, 'destination stride')
+]
+
+
+def _parse(fn: str, lines: list, fields: list) -> list:
+    """Parses lines of (number, text) with the (parser, name) of each field"""
+    try:
+        return [parse(text) for (_, text), (parse, _) in zip(lines, fields)]
+    except ValueError:
+        pass
+    # find the first malformed field again to name it
+    for (num, text), (parse, what) in zip(lines, fields):
+        try:
+            parse(text)
+        except ValueError as err:
+            raise JobFileError(fn, num, f'{what}: {err}') from None
+    raise AssertionError('unreachable')
+
+
+def is_binary(fn: str) -> bool:
+    """Returns whether a job file is in the binary format"""
+    with open(fn, 'rb') as job_file:
+        return job_file.read(len(BIN_MAGIC)) == BIN_MAGIC
+
+
+def bin_num_dims(fn: str) -> int:
+    """Returns the NumDim a binary job file was written for"""
+    with open(fn, 'rb') as job_file:
+        header = job_file.read(BIN_HEADER.size)
+    if len(header) < BIN_HEADER.size or header[:len(BIN_MAGIC)] != BIN_MAGIC:
+        raise JobFileError(fn, None, 'not a binary job file')
+    _, version, num_dims = BIN_HEADER.unpack(header)
+    if version != BIN_VERSION:
+        raise JobFileError(fn, None, f'binary format version {version}, expected {BIN_VERSION}')
+    return num_dims
+
+
+def read_jobs(fn: str, num_dims: int = 1):
+    """Yields the jobs of a text or binary job file with num_dims dimensions"""
+    if is_binary(fn):
+        return _read_bin_jobs(fn, num_dims)
+    return _read_text_jobs(fn, num_dims)
+
+
+def _read_bin_jobs(fn: str, num_dims: int):
+    file_dims = bin_num_dims(fn)
+    if file_dims != num_dims:
+        raise JobFileError(fn, None, f'written for {file_dims} dimensions, not {num_dims}')
+
+    with open(fn, 'rb') as job_file:
+        job_file.seek(BIN_HEADER.size)
+        index = 0
+        while True:
+            record = job_file.read(BIN_JOB.size)
+            if not record:
+                break
+            index += 1
+            if len(record) < BIN_JOB.size:
+                raise JobFileError(fn, None, f'job {index}: truncated')
+            (length, src_addr, dst_addr, src_protocol, dst_protocol, flags, max_src_len,
+             max_dst_len, num_errors) = BIN_JOB.unpack(record)
+            dims_size = (num_dims - 1) * BIN_DIM.size
+            tail = job_file.read(dims_size + num_errors * BIN_ERROR.size)
+            if len(tail) < dims_size + num_errors * BIN_ERROR.size:
+                raise JobFileError(fn, None, f'job {index}: truncated')
+
+            for what, ok in [('source protocol', src_protocol < len(PROTOCOL_ENUM)),
+                             ('destination protocol', dst_protocol < len(PROTOCOL_ENUM)),
+                             ('maximum source burst length', 1 <= max_src_len <= BURST_LEN),
+                             ('maximum destination burst length', 1 <= max_dst_len <= BURST_LEN),
+                             ('flags', flags < 4)]:
+                if not ok:
+                    raise JobFileError(fn, None, f'job {index}: invalid {what}')
+            job = Job(length, src_addr, dst_addr, src_protocol, dst_protocol, max_src_len,
+                      max_dst_len, flags & 1, flags >> 1)
+            job.dims = [Dim(*dim) for dim in BIN_DIM.iter_unpack(tail[:dims_size])]
+            for err_flags, addr in BIN_ERROR.iter_unpack(tail[dims_size:]):
+                if err_flags >= 4:
+                    raise JobFileError(fn, None, f'job {index}: invalid error flags')
+                job.errors.append(InjectedError(bool(err_flags & 1), 'ca'[err_flags >> 1], addr))
+            yield job
+
+
+def _read_text_jobs(fn: str, num_dims: int):
+    fields = [(parse, what) for _, parse, what in FIELDS]
+    for dim in range(1, num_dims):
+        fields += [(parse, f'{what} of dimension {dim}') for parse, what in DIM_FIELDS]
+    fields.append((_unsigned, 'number of errors'))
+
+    with open(fn, 'r', encoding='utf8') as job_file:
+        # the non-empty lines and their numbers, as the testbench skips whitespace
+        lines = filter(itemgetter(1), enumerate(map(str.strip, job_file), 1))
+        for first in lines:
+            job_lines = [first, *islice(lines, len(fields) - 1)]
+            if len(job_lines) < len(fields):
+                raise JobFileError(fn, first[0],
+                    f'truncated job, {fields[len(job_lines)][1]} missing')
+            values = _parse(fn, job_lines, fields)
+            job = Job(*values[:len(FIELDS)], line=first[0])
+            for dim in range(num_dims - 1):
+                job.dims.append(Dim(*values[len(FIELDS) + 3 * dim:len(FIELDS) + 3 * dim + 3]))
+
+            error_lines = list(islice(lines, values[-1]))
+            if len(error_lines) < values[-1]:
+                raise JobFileError(fn, first[0],
+                    f'truncated job, {values[-1] - len(error_lines)} of its errors missing')
+            job.errors = _parse(fn, error_lines, [(InjectedError.parse, 'error')] * values[-1])
+            yield job
+
+
+def format_job(job: Job) -> str:
+    """Returns the lines of a job in the job file format"""
+
+    lines = [
+        str(job.length),
+        f'0x{job.src_addr:x}',
+        f'0x{job.dst_addr:x}',
+        str(job.src_protocol),
+        str(job.dst_protocol),
+        str(job.max_src_len),
+        str(job.max_dst_len),
+        str(job.decouple_aw),
+        str(job.decouple_rw)
+    ]
+    for dim in job.dims:
+        lines += [str(dim.reps), f'0x{dim.src_stride:x}', f'0x{dim.dst_stride:x}']
+    lines.append(str(len(job.errors)))
+    lines += [str(error) for error in job.errors]
+    return '\n'.join(lines) + '\n'
+
+
+def write_jobs(out, jobs) -> int:
+    """Writes jobs to an open file as they come, returns their number"""
+
+    num_jobs = 0
+    for job in jobs:
+        out.write(format_job(job))
+        num_jobs += 1
+    return num_jobs
+
+
+def write_bin_jobs(out, jobs, num_dims: int = 1) -> int:
+    """Writes jobs to a file opened in binary mode as they come, returns their number"""
+
+    out.write(BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, num_dims))
+    num_jobs = 0
+    for job in jobs:
+        if len(job.dims) != num_dims - 1:
+            raise ValueError(f'job with {len(job.dims) + 1} dimensions in a file of {num_dims}')
+        out.write(BIN_JOB.pack(job.length, job.src_addr, job.dst_addr, job.src_protocol,
+            job.dst_protocol, job.decouple_aw | job.decouple_rw << 1, job.max_src_len,
+            job.max_dst_len, len(job.errors)))
+        for dim in job.dims:
+            out.write(BIN_DIM.pack(dim.reps, dim.src_stride, dim.dst_stride))
+        for error in job.errors:
+            out.write(BIN_ERROR.pack(error.is_read | (error.action == 'a') << 1, error.addr))
+        num_jobs += 1
+    return num_jobs
+
+
+def write_job_file(fn: str, jobs, num_dims: int = 1) -> int:
+    """Writes jobs to a job file, binary if it ends in `.bin`, returns their number"""
+
+    if fn.endswith('.bin'):
+        with open(fn, 'wb') as out:
+            return write_bin_jobs(out, jobs, num_dims)
+    with open(fn, 'w', encoding='utf8') as out:
+        return write_jobs(out, jobs)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Reports what job files exercise on a `jobs.json` variant, side by side.
+
+Without simulating, each job file is summarized in histograms of:
+
+  - the 1D lengths in power-of-two buckets,
+  - the alignment of source and destination addresses, up to a `DataWidth` word, and
+    whether both share their offset within a word,
+  - the protocol pairs, the burst limits, the decoupling flags and the injected errors,
+  - the jobs crossing a page boundary of their read or write protocol, and the bursts and
+    beats the legalizer splits them into, as `perf_bound.py` models it.
+
+ND jobs count once per histogram; their bursts, beats and bytes are those of the first 1D
+transfer times its repetitions. The coverage section classifies each job into a regime of
+length bucket, alignments, protocols, page crossings, decoupling and error kinds, and
+counts the regimes only one file covers. Values of the variant no file covers at all, e.g.
+an unused protocol pair or alignment, are listed last:
+
+    job_stats.py --db src/db/*.yml --variant rw_axi --job tiny medium error_mixed
+    job_stats.py --db src/db/*.yml --variant rw_axi --job-file soak.txt soak.bin
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter
+
+from tabulate import tabulate
+from mario.database import read_database
+from mario.util import prepare_ids
+from job_file import BURST_LEN, PROTOCOL_ENUM, InjectedError, Job, JobFileError, read_jobs
+from perf_bound import (DEFAULT_BURST_LEN, MAX_PAGE_ADDR_WIDTH, beats, page_width, protocol_db,
+                        split_transfer)
+from trace_splits import DIRECTIONS, beat_bucket
+
+# the histograms, in the order they are reported
+SECTIONS = ['summary', 'length', 'src alignment', 'dst alignment', 'relative alignment',
+    'protocols', 'page crossings', 'burst limits', 'decoupling', 'errors']
+
+DECOUPLING = ['coupled', 'R-AW', 'R-W', 'R-AW and R-W']
+ERROR_KINDS = [f'{dir} {action}' for dir in ['read', 'write'] for action in ['continue', 'abort']]
+
+
+def nd_transfers(job: Job) -> int:
+    """Returns the 1D transfers the ND midend issues for a job
+
+    A dimension of zero repetitions is bypassed, unless all are zero: then none is issued.
+    """
+    if job.dims and not any(dim.reps for dim in job.dims):
+        return 0
+    return math.prod(max(dim.reps, 1) for dim in job.dims)
+
+
+def length_bucket(length: int) -> str:
+    """Returns the power-of-two bucket of a length in bytes, e.g. 5-8"""
+    return '0' if not length else beat_bucket(length)
+
+
+def alignment(addr: int, strb_width: int) -> str:
+    """Returns the largest power of two up to a word an address is aligned to"""
+    align = min(addr & -addr, strb_width) if addr else strb_width
+    return 'word' if align == strb_width else f'{align} B'
+
+
+def error_kind(error: InjectedError) -> str:
+    """Returns the direction and action of an injected error, e.g. read abort"""
+    action = 'continue' if error.action == 'c' else 'abort'
+    return f'{"read" if error.is_read else "write"} {action}'
+
+
+def crosses_page(prot: dict, addr: int, length: int) -> bool:
+    """Whether a transfer crosses a page of a bursting protocol, or 4 KiB"""
+    if prot['bursts'] == 'not_supported' or not length:
+        return False
+    page_size = min(prot['page_size'], 1 << MAX_PAGE_ADDR_WIDTH)
+    return addr // page_size != (addr + length - 1) // page_size
+
+
+def _natural_key(key: str) -> list:
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', key)]
+
+
+class JobStats:
+    """Accumulates the histograms and coverage regimes of one job file"""
+
+    def __init__(self, database: dict, strb_width: int, page_addr_width: int,
+                 burst_len: int = DEFAULT_BURST_LEN):
+        self.database = database
+        self.strb_width = strb_width
+        self.page_addr_width = page_addr_width
+        self.burst_len = burst_len
+        self.counts = {section: Counter() for section in SECTIONS}
+        self.regimes = set()
+
+    def add(self, job: Job):
+        counts = self.counts
+        transfers = nd_transfers(job)
+        prots = [PROTOCOL_ENUM[job.src_protocol], PROTOCOL_ENUM[job.dst_protocol]]
+
+        counts['summary']['jobs'] += 1
+        counts['summary']['1D transfers'] += transfers
+        counts['summary']['bytes'] += job.length * transfers
+        counts['summary']['zero-length jobs'] += not job.length
+        counts['summary']['jobs with errors'] += bool(job.errors)
+
+        length = length_bucket(job.length)
+        counts['length'][length] += 1
+        aligns = [alignment(job.src_addr, self.strb_width),
+                  alignment(job.dst_addr, self.strb_width)]
+        counts['src alignment'][aligns[0]] += 1
+        counts['dst alignment'][aligns[1]] += 1
+        relative = 'same offset' if job.src_addr % self.strb_width == \
+            job.dst_addr % self.strb_width else 'different offset'
+        counts['relative alignment'][relative] += 1
+        counts['protocols'][f'{prots[0]} -> {prots[1]}'] += 1
+        for side, max_len in [('src', job.max_src_len), ('dst', job.max_dst_len)]:
+            counts['burst limits'][f'{side} {max_len}' if max_len != BURST_LEN
+                                   else f'{side} none'] += 1
+        decoupling = DECOUPLING[job.decouple_aw | job.decouple_rw << 1]
+        counts['decoupling'][decoupling] += 1
+        errors = [error_kind(error) for error in job.errors]
+        counts['errors'].update(errors)
+
+        # the page crossings and the bursts of the legalizer
+        crossings = []
+        for (dir, side), prot, bursts in zip(DIRECTIONS, prots,
+                split_transfer(job, self.database, self.strb_width, self.page_addr_width,
+                               self.burst_len)):
+            counts['summary'][f'{dir} bursts'] += len(bursts) * transfers
+            counts['summary'][f'{dir} beats'] += transfers * sum(
+                beats(addr, num_bytes, self.strb_width) for addr, num_bytes, _ in bursts)
+            crossed = crosses_page(protocol_db(self.database, getattr(job, f'{side}_protocol')),
+                getattr(job, f'{side}_addr'), job.length)
+            if crossed:
+                counts['page crossings'][f'{dir} {prot}'] += 1
+            crossings.append(crossed)
+
+        self.regimes.add((length, *aligns, relative, *prots, *crossings, decoupling,
+                          *sorted(set(errors))))
+
+
+def variant_values(database: dict, backend_id: str, params: dict) -> dict:
+    """Returns the values of each histogram a job file of the variant may cover"""
+
+    prot_info = prepare_ids([backend_id])[backend_id]
+    reads = [database[prot]['protocol_enum'] for prot in prot_info['ar']]
+    writes = [database[prot]['protocol_enum'] for prot in prot_info['aw']]
+    bursting = {database[prot]['protocol_enum'] for prot in prot_info['ar'] + prot_info['aw']
+                if database[prot]['bursts'] != 'not_supported'}
+    strb_width = params['DataWidth'] // 8
+    aligns = [f'{1 << i} B' for i in range(strb_width.bit_length() - 1)] + ['word']
+    return {
+        'src alignment': aligns,
+        'dst alignment': aligns,
+        'relative alignment': ['same offset', 'different offset'],
+        'protocols': [f'{read} -> {write}' for read in reads for write in writes],
+        'page crossings': [f'read {prot}' for prot in reads if prot in bursting] +
+                          [f'write {prot}' for prot in writes if prot in bursting],
+        'decoupling': DECOUPLING,
+        'errors': ERROR_KINDS if params.get('ErrorHandling', 0) else []
+    }
+
+
+def format_report(names: list, stats: list, expected: dict) -> str:
+    """Returns the histograms of several job files side by side, with their coverage"""
+
+    sections = []
+    for section in SECTIONS:
+        keys = list(dict.fromkeys(key for stat in stats for key in stat.counts[section]))
+        if section != 'summary':
+            keys.sort(key=_natural_key)
+        if not keys:
+            continue
+        sections.append(tabulate([[key, *[stat.counts[section][key] or None for stat in stats]]
+            for key in keys], headers=[section, *names], missingval='-'))
+
+    # regimes only one file covers, and those it shares with another file
+    rows = [['regimes', *[len(stat.regimes) for stat in stats]]]
+    if len(stats) > 1:
+        unique = []
+        for idx, stat in enumerate(stats):
+            others = set().union(*[other.regimes for i, other in enumerate(stats) if i != idx])
+            unique.append(len(stat.regimes - others))
+        rows += [['only in this file', *unique],
+                 ['also in another file', *[len(stat.regimes) - num
+                                            for stat, num in zip(stats, unique)]]]
+    sections.append(tabulate(rows, headers=['coverage', *names]))
+
+    # values of the variant no file covers
+    lengths = [key for stat in stats for key in stat.counts['length']]
+    if lengths:
+        largest = max(int(key.split('-')[-1]) for key in lengths)
+        expected = dict(expected, length=['0'] + [length_bucket(1 << i)
+            for i in range(largest.bit_length())])
+    gaps = [[section, ', '.join(value for value in values
+                                if not any(stat.counts[section][value] for stat in stats))]
+            for section, values in expected.items()]
+    gaps = [gap for gap in gaps if gap[1]]
+    if gaps:
+        sections.append('Not covered by any file:\n' + tabulate(gaps, tablefmt='plain'))
+    return '\n\n'.join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='job_stats',
+        description='Reports what job files exercise on a backend variant'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True,
+        help='Protocol database files')
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', required=True,
+        help='Backend variant in jobs.json supplying the id and parameters')
+    parser.add_argument('--job', dest='job', nargs='*', default=[],
+        help='Names of the variant\'s job files in jobs.json, all if none are given')
+    parser.add_argument('--job-file', dest='job_file', nargs='*', default=[],
+        help='Paths of job files not listed in jobs.json')
+    parser.add_argument('--param', dest='param', nargs='*', default=[], metavar='NAME=VALUE',
+        help='Override parameters of the variant, e.g. DataWidth')
+    args = parser.parse_args()
+
+    database = read_database(args.db)
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    if args.variant not in variants:
+        parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+    variant = variants[args.variant]
+    params = dict(variant['params'])
+    for override in args.param:
+        name, value = override.split('=', 1)
+        params[name] = int(value, 0)
+
+    # job files, relative to jobs.json if named
+    names = args.job or ([] if args.job_file else list(variant['jobs']))
+    for name in names:
+        if name not in variant['jobs']:
+            parser.error(f'{args.variant} has no job {name}, only {", ".join(variant["jobs"])}')
+    files = {name: os.path.join(os.path.dirname(args.jobs), variant['jobs'][name])
+             for name in names}
+    files.update({path: path for path in args.job_file})
+
+    strb_width = params['DataWidth'] // 8
+    page_addr_width = page_width(database,
+        prepare_ids([variant['proc_id']])[variant['proc_id']]['used'], strb_width)
+    stats = []
+    for name, path in files.items():
+        stat = JobStats(database, strb_width, page_addr_width,
+                        params.get('BurstLen', DEFAULT_BURST_LEN))
+        try:
+            for job in read_jobs(path, params.get('NumDim', 1)):
+                stat.add(job)
+        except (JobFileError, ValueError) as err:
+            print(f'{path}: {err}', file=sys.stderr)
+            return 1
+        stats.append(stat)
+
+    print(format_report(list(files), stats,
+        variant_values(database, variant['proc_id'], params)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Vectorized golden model of the burst splitting of the hardware legalizer.
+
+The model follows `idma_legalizer.sv.tpl`, `idma_legalizer_page_splitter.sv` and
+`idma_legalizer_pow2_splitter.sv` bit by bit, including the widths the RTL
+truncates to, for a backend id and its parameters. Each step emits the next
+read and write burst of all jobs at once; a job takes as many steps as its longer
+side has bursts. Every burst is given as its byte address, bytes, beats and the
+strobes of its first and last beat.
+
+Two deviations from the RTL are deliberate: zero-length jobs emit no bursts, as
+with `RejectZeroTransfers`, and the byte ratio of size-changing compute ops is not
+modelled. Requires NumPy, which is not a dependency of the other tools:
+
+    legalizer_model.py --db src/db/*.yml --variant rw_axi --job huge --outfile bursts.csv
+
+Given a trace of the run, the bursts on the address channels are compared to the
+model's for the requests the backend accepted:
+
+    legalizer_model.py --db src/db/*.yml --variant rw_axi --trace trace.txt
+
+`perf_bound.py` splits transfers one at a time in plain Python. The two ports of the
+splitters must agree burst by burst, which `--self-check` checks over every job file of
+the given variants, or of all variants with a backend id:
+
+    legalizer_model.py --db src/db/*.yml --self-check
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from operator import attrgetter
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit('legalizer_model.py requires NumPy: uv sync --extra models, or pip install numpy')
+
+from mario.database import read_database
+from mario.util import prepare_ids
+from job_file import BURST_LEN, PROTOCOL_ENUM, read_jobs
+from perf_bound import DEFAULT_BURST_LEN, MAX_PAGE_ADDR_WIDTH, clog2, page_width, split_transfer
+from trace_idma import extract_parameter, get_be_info, iter_trace
+from trace_splits import DIRECTIONS, bus_bursts, port_protocols
+from trace_to_jobs import request_job
+
+# how each protocol bursts, see the `bursts` key of the database
+BURSTS = ['split_at_page_boundary', 'only_pow2', 'not_supported']
+
+# fields of a job, as arrays
+JOB_FIELDS = ['length', 'src_addr', 'dst_addr', 'src_protocol', 'dst_protocol', 'max_src_len',
+    'max_dst_len', 'decouple_aw', 'decouple_rw']
+
+
+class Legalizer:
+    """The burst splitting of the legalizer of one backend id
+
+    `params` are the backend parameters as in `jobs.json`; of those, `DataWidth`
+    and `BurstLen`, 8 if not given, shape the splitting.
+    """
+
+    def __init__(self, database: dict, backend_id: str, params: dict):
+        prot_info = prepare_ids([backend_id])[backend_id]
+        read_prots = prot_info['ar']
+        write_prots = prot_info['aw']
+
+        self.strb_width = params['DataWidth'] // 8
+        self.offset_width = clog2(self.strb_width)
+        self.burst_len = params.get('BurstLen', DEFAULT_BURST_LEN)
+
+        # the largest page of all protocols sets the width of the splitters' lengths
+        self.page_addr_width = page_width(database, prot_info['used'], self.strb_width)
+        self.len_mask = (1 << (self.page_addr_width + 1)) - 1
+
+        # per side, tables indexed by the protocol of a job
+        self.sides = {}
+        for side, prots, is_write in [('src', read_prots, False), ('dst', write_prots, True)]:
+            num = len(PROTOCOL_ENUM)
+            table = {
+                'used': np.zeros(num, dtype=bool),
+                'bursts': np.zeros(num, dtype=np.int64),
+                'decouple': np.zeros(num, dtype=bool),
+                'pow2_width': np.zeros(num, dtype=np.int64),
+                'page_size': np.zeros(num, dtype=np.int64),
+                'tltoaxi4': np.zeros(num, dtype=bool)
+            }
+            for name in prots:
+                prot = database[name]
+                idx = PROTOCOL_ENUM.index(prot['protocol_enum'])
+                tltoaxi4 = prot.get('tltoaxi4_compatibility_mode') == 'true'
+                table['used'][idx] = True
+                table['bursts'][idx] = BURSTS.index(prot['bursts'])
+                table['decouple'][idx] = prot['bursts'] == 'not_supported' or \
+                    prot.get('legalizer_force_decouple') == 'true'
+                if prot['bursts'] == 'only_pow2':
+                    pow2_page = prot['page_size']
+                    if is_write and tltoaxi4:
+                        pow2_page = min(32 * self.strb_width, pow2_page)
+                    table['pow2_width'][idx] = clog2(pow2_page)
+                    table['page_size'][idx] = prot['page_size']
+                    table['tltoaxi4'][idx] = tltoaxi4
+            self.sides[side] = table
+
+    @staticmethod
+    def _floor_pow2(value, max_width: int):
+        """Returns the largest power of two of at most max_width bits not above each value"""
+        res = np.zeros_like(value)
+        for i in range(max_width + 1):
+            res = np.where(value >= (1 << i), 1 << i, res)
+        return res
+
+    def _page_split(self, addr, reduce_len, max_llen, not_bursting):
+        """idma_legalizer_page_splitter: the bytes to the end of the (virtual) page"""
+        width = np.where(not_bursting, self.offset_width, np.minimum(
+            self.offset_width + np.where(reduce_len, max_llen, self.burst_len),
+            MAX_PAGE_ADDR_WIDTH))
+        page_size = (1 << width) & self.len_mask
+        page_offset = addr & ((1 << np.minimum(width, self.page_addr_width)) - 1)
+        return (page_size - page_offset) & self.len_mask
+
+    def _pow2_split(self, addr, length, pow2_width, page_size, tltoaxi4):
+        """idma_legalizer_pow2_splitter: the bytes of the next power-of-two burst"""
+        paw = self.page_addr_width
+        length_i = np.where(tltoaxi4 & (length >> paw != 0),
+            (page_size - (addr & ((1 << paw) - 1))) & self.len_mask, length & self.len_mask)
+        larger = ~tltoaxi4 & (length >> (paw + 1) != 0)
+
+        word_left = self.strb_width - (addr & (self.strb_width - 1))
+        word_left = np.where(~larger & (word_left > length_i), length_i, word_left)
+        subword = self._floor_pow2(word_left, self.offset_width)
+        burst = self._floor_pow2(np.minimum(length_i, 1 << pow2_width), paw + 1)
+
+        aligned = (addr & (self.strb_width - 1)) == 0
+        return np.where(aligned, np.where(larger, 1 << pow2_width, burst), subword) & \
+            self.len_mask
+
+    def _bytes_to_pb(self, side: str, addr, length, prot, reduce_len, max_llen):
+        """The bytes one side may move in its next burst, by the protocol of each job"""
+        table = self.sides[side]
+        bursts = table['bursts'][prot]
+        page = self._page_split(addr, reduce_len, max_llen, bursts == BURSTS.index('not_supported'))
+        if not table['pow2_width'].any():
+            return page
+        pow2 = self._pow2_split(addr, length, table['pow2_width'][prot], table['page_size'][prot],
+            table['tltoaxi4'][prot])
+        return np.where(bursts == BURSTS.index('only_pow2'), pow2, page)
+
+    def _bursts(self, job, addr, num_bytes) -> dict:
+        """Packs the bursts of one side into arrays, with their beats and strobes"""
+        offset = addr & (self.strb_width - 1)
+        beats = (offset + num_bytes + self.strb_width - 1) >> self.offset_width
+        full = np.uint64((1 << self.strb_width) - 1)
+        last = (offset + num_bytes - 1) & (self.strb_width - 1)
+        first_strb = (full << offset.astype(np.uint64)) & full
+        last_strb = full >> (self.strb_width - 1 - last).astype(np.uint64)
+        first_strb = np.where(beats == 1, first_strb & last_strb, first_strb)
+        last_strb = np.where(beats == 1, first_strb, last_strb)
+        return {'job': job, 'addr': addr, 'bytes': num_bytes, 'beats': beats,
+            'first_strb': first_strb, 'last_strb': last_strb}
+
+    def split(self, jobs: dict) -> tuple:
+        """Returns the read and write bursts of the jobs, each a dict of arrays in job order"""
+
+        if self.strb_width > 64:
+            raise ValueError('strobes of more than 64 bytes do not fit the model\'s masks')
+        for side, key in [('src', 'src_protocol'), ('dst', 'dst_protocol')]:
+            unused = ~self.sides[side]['used'][jobs[key]]
+            if unused.any():
+                raise ValueError(f'job {int(np.argmax(unused))} uses a {side} protocol '
+                                 f'the backend does not have')
+
+        idx = np.arange(len(jobs['length']))
+        r_addr, w_addr = jobs['src_addr'].copy(), jobs['dst_addr'].copy()
+        r_len, w_len = jobs['length'].copy(), jobs['length'].copy()
+        decoupled = jobs['decouple_rw'].astype(bool) | \
+            self.sides['src']['decouple'][jobs['src_protocol']] | \
+            self.sides['dst']['decouple'][jobs['dst_protocol']]
+
+        # the request options of the testbench: the burst limit as 3 bit log2
+        reduce_len = {side: jobs[f'max_{side}_len'] != BURST_LEN for side in self.sides}
+        max_llen = {side: sum((jobs[f'max_{side}_len'] > (1 << i)).astype(np.int64)
+            for i in range(9)) & 0x7 for side in self.sides}
+
+        reads = []
+        writes = []
+        active = np.nonzero((r_len > 0) | (w_len > 0))[0]
+        while len(active):
+            a = active
+            r_pb = self._bytes_to_pb('src', r_addr[a], r_len[a], jobs['src_protocol'][a],
+                reduce_len['src'][a], max_llen['src'][a])
+            w_pb = self._bytes_to_pb('dst', w_addr[a], w_len[a], jobs['dst_protocol'][a],
+                reduce_len['dst'][a], max_llen['dst'][a])
+            coupled = np.minimum(r_pb, w_pb)
+            r_pb = np.where(decoupled[a], r_pb, coupled)
+            w_pb = np.where(decoupled[a], w_pb, coupled)
+
+            for pb, addr, length, out in [(r_pb, r_addr, r_len, reads),
+                                          (w_pb, w_addr, w_len, writes)]:
+                valid = length[a] > 0
+                num_bytes = np.where(length[a] > pb, pb, length[a] & self.len_mask)
+                if (valid & (num_bytes == 0)).any():
+                    raise ValueError(f'the legalizer makes no progress on job '
+                                     f'{int(a[np.argmax(valid & (num_bytes == 0))])}')
+                out.append((idx[a][valid], addr[a][valid], num_bytes[valid]))
+                addr[a] += np.where(valid, num_bytes, 0)
+                length[a] -= np.where(valid, num_bytes, 0)
+            active = a[(r_len[a] > 0) | (w_len[a] > 0)]
+
+        res = []
+        for out in [reads, writes]:
+            if not out:
+                out = [(idx[:0], idx[:0], idx[:0])]
+            job, addr, num_bytes = (np.concatenate(col) for col in zip(*out))
+            # emitted step by step, ordered by job
+            order = np.argsort(job, kind='stable')
+            res.append(self._bursts(job[order], addr[order], num_bytes[order]))
+        return tuple(res)
+
+
+def jobs_to_arrays(jobs) -> dict:
+    """Packs jobs, e.g. from job_file.read_jobs, into arrays"""
+    rows = list(map(attrgetter(*JOB_FIELDS), jobs))
+    cols = np.array(rows, dtype=np.int64).reshape(-1, len(JOB_FIELDS)).T
+    return dict(zip(JOB_FIELDS, cols))
+
+
+def traced_jobs(idma_trace, be_info: dict, database: dict) -> tuple:
+    """Returns the requests a trace's backend accepted as job arrays, and the bursts on its bus"""
+
+    params = None
+    jobs = []
+    bursts = {}
+    beats_left = {}
+    ports = port_protocols(be_info, database)
+    for ele in idma_trace:
+        if params is None:
+            params = extract_parameter([ele])
+        backend = ele['backend']
+        if backend['req_valid'] and backend['req_ready'] and backend['req_length']:
+            jobs.append(request_job(backend))
+        for dir, port, addr, num_beats in bus_bursts(ele['bus'], ports, beats_left,
+                                                     params['data_width'] // 8):
+            bursts.setdefault((dir, ports[(dir, port)]), []).append((addr, num_beats))
+    return jobs, bursts
+
+
+def compare_trace(legalizer: Legalizer, fn: str, database: dict) -> int:
+    """Compares the bursts on the address channels of a trace to the model's, returns mismatches"""
+
+    first = next(iter_trace(fn), None)
+    if first is None:
+        print(f'{fn} is empty', file=sys.stderr)
+        return 1
+    be_info = get_be_info(extract_parameter([first]), database)
+    jobs, traced = traced_jobs(iter_trace(fn), be_info, database)
+    arrays = jobs_to_arrays(jobs)
+    predicted = dict(zip([dir for dir, _ in DIRECTIONS], legalizer.split(arrays)))
+
+    mismatches = 0
+    for dir, side in DIRECTIONS:
+        model = predicted[dir]
+        for prot in np.unique(arrays[f'{side}_protocol']):
+            sel = arrays[f'{side}_protocol'][model['job']] == prot
+            expected = list(zip((model['addr'][sel] // legalizer.strb_width).tolist(),
+                model['beats'][sel].tolist()))
+            seen = [(addr // legalizer.strb_width, num_beats)
+                for addr, num_beats in traced.get((dir, int(prot)), [])]
+            differ = next((idx for idx, (e, s) in enumerate(zip(expected, seen)) if e != s),
+                None)
+            status = 'match'
+            if differ is not None or len(expected) != len(seen):
+                mismatches += 1
+                differ = min(len(expected), len(seen)) if differ is None else differ
+                status = f'first difference at burst {differ}'
+            print(f'{dir} {PROTOCOL_ENUM[prot]}: {len(expected)} bursts modelled, '
+                  f'{len(seen)} traced, {status}')
+    return mismatches
+
+
+def self_check(database: dict, backend_id: str, params: dict, fn: str) -> bool:
+    """Compares the bursts of a job file to those of perf_bound's split_transfer"""
+
+    jobs = list(read_jobs(fn, params.get('NumDim', 1)))
+    legalizer = Legalizer(database, backend_id, params)
+    try:
+        bursts = legalizer.split(jobs_to_arrays(jobs))
+    except ValueError as err:
+        print(f'{fn}: {err}')
+        return False
+    modelled = [list(zip(*(side[col].tolist() for col in ['job', 'addr', 'bytes'])))
+                for side in bursts]
+
+    scalar = [[], []]
+    for idx, job in enumerate(jobs):
+        for out, side in zip(scalar, split_transfer(job, database, legalizer.strb_width,
+                                                    legalizer.page_addr_width,
+                                                    legalizer.burst_len)):
+            out.extend((idx, addr, num_bytes) for addr, num_bytes, _ in side)
+
+    match = True
+    for name, model, ref in zip(['read', 'write'], modelled, scalar):
+        differ = next((idx for idx, (m, r) in enumerate(zip(model, ref)) if m != r), None)
+        status = 'match'
+        if differ is not None or len(model) != len(ref):
+            match = False
+            differ = min(len(model), len(ref)) if differ is None else differ
+            job = (model if differ < len(model) else ref)[differ][0]
+            status = f'first difference at burst {differ} of job {job}'
+        print(f'{fn}: {len(model)} {name} bursts modelled, {len(ref)} split, {status}')
+    return match
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='legalizer_model',
+        description='Golden model of the burst splitting of the legalizer'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True,
+        help='Protocol database files')
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', nargs='*', default=[],
+        help='Backend variant in jobs.json supplying the id and parameters, several with '
+             '--self-check')
+    parser.add_argument('--job', dest='job',
+        help='Name of the variant\'s job file in jobs.json')
+    parser.add_argument('--job-file', dest='job_file',
+        help='Path of a job file not listed in jobs.json')
+    parser.add_argument('--param', dest='param', nargs='*', default=[], metavar='NAME=VALUE',
+        help='Override parameters of the variant, e.g. DataWidth or BurstLen')
+    parser.add_argument('--outfile', dest='outfile',
+        help='Write the bursts as CSV')
+    parser.add_argument('--trace', dest='trace_file',
+        help='Compare the bursts of a trace of the run to the model')
+    parser.add_argument('--self-check', dest='self_check', action='store_true',
+        help='Compare the model to perf_bound.py on all job files of the variants')
+    args = parser.parse_args()
+
+    database = read_database(args.db)
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    for name in args.variant:
+        if name not in variants:
+            parser.error(f'unknown variant {name}, one of {", ".join(variants)}')
+    overrides = dict(override.split('=', 1) for override in args.param)
+
+    if args.self_check:
+        names = args.variant or [name for name, variant in variants.items()
+                                 if variant.get('proc_id', 'none') != 'none']
+        failed = 0
+        for name in names:
+            variant = variants[name]
+            params = dict(variant['params'])
+            params.update({key: int(value, 0) for key, value in overrides.items()})
+            for job in variant['jobs'].values():
+                failed += not self_check(database, variant['proc_id'], params,
+                                         os.path.join(os.path.dirname(args.jobs), job))
+        print(f'{failed} job files differ' if failed else 'all job files match')
+        return 1 if failed else 0
+
+    if len(args.variant) != 1:
+        parser.error('exactly one --variant is required')
+    variant = variants[args.variant[0]]
+    params = dict(variant['params'])
+    params.update({key: int(value, 0) for key, value in overrides.items()})
+    legalizer = Legalizer(database, variant['proc_id'], params)
+
+    if args.trace_file:
+        return 1 if compare_trace(legalizer, args.trace_file, database) else 0
+
+    # job file, relative to jobs.json if named
+    if args.job:
+        job_file = os.path.join(os.path.dirname(args.jobs), variant['jobs'][args.job])
+    elif args.job_file:
+        job_file = args.job_file
+    else:
+        parser.error('either --job, --job-file or --trace is required')
+
+    jobs = jobs_to_arrays(read_jobs(job_file))
+    start = time.perf_counter()
+    reads, writes = legalizer.split(jobs)
+    elapsed = time.perf_counter() - start
+
+    num_jobs = len(jobs['length'])
+    print(f'{num_jobs} jobs, {len(reads["job"])} read and {len(writes["job"])} write bursts, '
+          f'{elapsed * 1e3:.1f} ms ({num_jobs / max(elapsed, 1e-9):.0f} jobs/s)',
+          file=sys.stderr)
+
+    if args.outfile:
+        with open(args.outfile, 'w', encoding='utf8') as out:
+            out.write('side,job,addr,bytes,beats,first_strb,last_strb\n')
+            for name, bursts in [('read', reads), ('write', writes)]:
+                for row in zip(*(bursts[col].tolist() for col in
+                                 ['job', 'addr', 'bytes', 'beats', 'first_strb', 'last_strb'])):
+                    out.write(f'{name},{row[0]},0x{row[1]:x},{row[2]},{row[3]},'
+                              f'0x{row[4]:x},0x{row[5]:x}\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,7 @@
 
 """ MARIO tracer interaction"""
 from mako.template import Template
+from mario.util import compute_eligible
 
 
 def _flatten_dict(d, parent_key='', delimiter='_'):
@@ -23,6 +24,12 @@ def _flatten_dict(d, parent_key='', delimiter='_'):
     return dict(items)
 
 
+def _head_path(path: str, head: int) -> str:
+    """Index the port of a signal path with a head, e.g. axi_read_req_o[1].r_ready"""
+    port, _, field = path.partition('.')
+    return f'{port}[{head}].{field}'
+
+
 TRACER_BODY = '''
 // The tracer for the ${identifier} iDMA
 `define IDMA_TRACER_${identifier_cap}(__backend_inst, __out_f) <%text>\\</%text>
@@ -35,6 +42,11 @@ TRACER_BODY = '''
         automatic `IDMA_TRACER_MAX_TYPE backend [string]; <%text>\\</%text>
         automatic `IDMA_TRACER_MAX_TYPE busy [string]; <%text>\\</%text>
         automatic `IDMA_TRACER_MAX_TYPE bus [string]; <%text>\\</%text>
+        automatic `IDMA_TRACER_MAX_TYPE buffer [string]; <%text>\\</%text>
+        automatic `IDMA_TRACER_MAX_TYPE coupler [string]; <%text>\\</%text>
+% if compute:
+        automatic `IDMA_TRACER_MAX_TYPE compute [string]; <%text>\\</%text>
+% endif
         automatic string trace; <%text>\\</%text>
 `ifndef VERILATOR <%text>\\</%text>
         #0; <%text>\\</%text>
@@ -66,17 +78,32 @@ TRACER_BODY = '''
                     "hardware_legalizer" : __backend_inst``.HardwareLegalizer, <%text>\\</%text>
                     "reject_zero_tfs"    : __backend_inst``.RejectZeroTransfers, <%text>\\</%text>
                     "error_cap"          : __backend_inst``.ErrorCap, <%text>\\</%text>
+% if compute:
+                    "enable_compute"     : __backend_inst``.EnableCompute, <%text>\\</%text>
+                    "compute_ops"        : __backend_inst``.ComputeOps, <%text>\\</%text>
+                    "compute_tuning"     : __backend_inst``.ComputeTuning, <%text>\\</%text>
+% endif
                     "print_fifo_info"    : __backend_inst``.PrintFifoInfo <%text>\\</%text>
                 }; <%text>\\</%text>
                 meta = '{ <%text>\\</%text>
                     "time" : $time() <%text>\\</%text>
                 }; <%text>\\</%text>
                 backend = '{ <%text>\\</%text>
-                    "req_valid"  : __backend_inst``.req_valid_i, <%text>\\</%text>
-                    "req_ready"  : __backend_inst``.req_ready_o, <%text>\\</%text>
-                    "rsp_valid"  : __backend_inst``.rsp_valid_o, <%text>\\</%text>
-                    "rsp_ready"  : __backend_inst``.rsp_ready_i, <%text>\\</%text>
-                    "req_length" : __backend_inst``.idma_req_i.length <%text>\\</%text>
+                    "req_valid"          : __backend_inst``.req_valid_i, <%text>\\</%text>
+                    "req_ready"          : __backend_inst``.req_ready_o, <%text>\\</%text>
+                    "rsp_valid"          : __backend_inst``.rsp_valid_o, <%text>\\</%text>
+                    "rsp_ready"          : __backend_inst``.rsp_ready_i, <%text>\\</%text>
+                    "req_length"         : ${req}.length, <%text>\\</%text>
+                    "req_src_addr"       : ${req}.src_addr, <%text>\\</%text>
+                    "req_dst_addr"       : ${req}.dst_addr, <%text>\\</%text>
+                    "req_src_protocol"   : ${req}.opt.src_protocol, <%text>\\</%text>
+                    "req_dst_protocol"   : ${req}.opt.dst_protocol, <%text>\\</%text>
+                    "req_decouple_aw"    : ${req}.opt.beo.decouple_aw, <%text>\\</%text>
+                    "req_decouple_rw"    : ${req}.opt.beo.decouple_rw, <%text>\\</%text>
+                    "req_src_max_llen"   : ${req}.opt.beo.src_max_llen, <%text>\\</%text>
+                    "req_dst_max_llen"   : ${req}.opt.beo.dst_max_llen, <%text>\\</%text>
+                    "req_src_reduce_len" : ${req}.opt.beo.src_reduce_len, <%text>\\</%text>
+                    "req_dst_reduce_len" : ${req}.opt.beo.dst_reduce_len <%text>\\</%text>
                 }; <%text>\\</%text>
                 busy = '{ <%text>\\</%text>
                     "buffer"      : __backend_inst``.busy_o.buffer_busy, <%text>\\</%text>
@@ -88,6 +115,36 @@ TRACER_BODY = '''
                     "eh_cnt"      : __backend_inst``.busy_o.eh_cnt_busy, <%text>\\</%text>
                     "raw_coupler" : __backend_inst``.busy_o.raw_coupler_busy <%text>\\</%text>
                 }; <%text>\\</%text>
+                /* per-lane handshakes of the buffer, its fill level follows */ <%text>\\</%text>
+                buffer = '{ <%text>\\</%text>
+                    "in_valid"  : ${dataflow}.valid_i, <%text>\\</%text>
+                    "in_ready"  : ${dataflow}.ready_o, <%text>\\</%text>
+                    "out_valid" : ${dataflow}.valid_o, <%text>\\</%text>
+                    "out_ready" : ${dataflow}.ready_i <%text>\\</%text>
+                }; <%text>\\</%text>
+                /* AWs entering and leaving the R-AW coupler, first W beats */ <%text>\\</%text>
+                coupler = '{ <%text>\\</%text>
+                    "aw_in_valid"  : __backend_inst``.w_valid, <%text>\\</%text>
+                    "aw_in_ready"  : __backend_inst``.aw_ready, <%text>\\</%text>
+                    "aw_out_valid" : __backend_inst``.aw_valid_dp, <%text>\\</%text>
+                    "aw_out_ready" : __backend_inst``.aw_ready_dp, <%text>\\</%text>
+                    "w_valid"      : __backend_inst``.w_chan_valid, <%text>\\</%text>
+                    "w_ready"      : __backend_inst``.w_chan_ready, <%text>\\</%text>
+                    "w_first"      : __backend_inst``.w_chan_first <%text>\\</%text>
+                }; <%text>\\</%text>
+% if compute:
+                /* op of the write in flight, compute stage handshakes */ <%text>\\</%text>
+                compute = '{ <%text>\\</%text>
+                    "req_enable" : ${transport}.w_dp_req_i.compute.enable, <%text>\\</%text>
+                    "req_op"     : ${transport}.w_dp_req_i.compute.op, <%text>\\</%text>
+                    "active"     : ${transport}.compute_active, <%text>\\</%text>
+                    "in_valid"   : ${transport}.compute_in_valid, <%text>\\</%text>
+                    "in_ready"   : ${transport}.compute_in_ready, <%text>\\</%text>
+                    "out_valid"  : ${transport}.compute_out_valid, <%text>\\</%text>
+                    "out_ready"  : ${transport}.compute_out_ready, <%text>\\</%text>
+                    "cfg_stall"  : __backend_inst``.compute_cfg_stall <%text>\\</%text>
+                }; <%text>\\</%text>
+% endif
                 bus = '{ <%text>\\</%text>
 ${signals}
                 }; <%text>\\</%text>
@@ -96,6 +153,11 @@ ${signals}
                 `IDMA_TRACER_STR_ASSEMBLY(meta, 1); <%text>\\</%text>
                 `IDMA_TRACER_STR_ASSEMBLY(backend, 1); <%text>\\</%text>
                 `IDMA_TRACER_STR_ASSEMBLY(busy, 1); <%text>\\</%text>
+                `IDMA_TRACER_STR_ASSEMBLY(buffer, 1); <%text>\\</%text>
+                `IDMA_TRACER_STR_ASSEMBLY(coupler, 1); <%text>\\</%text>
+% if compute:
+                `IDMA_TRACER_STR_ASSEMBLY(compute, 1); <%text>\\</%text>
+% endif
                 `IDMA_TRACER_STR_ASSEMBLY(bus, 1); <%text>\\</%text>
                 `IDMA_TRACER_CLEAR_COND(first_iter); <%text>\\</%text>
                 /* Commit */ <%text>\\</%text>
@@ -107,10 +169,136 @@ ${signals}
 '''
 
 
+# The handshakes of each midend: its requests and responses upstream (in) and the
+# requests it emits and their responses downstream (out). The RT midend's upstream is its
+# bypass; the requests of its events are traced before they are arbitrated with the bypass
+# (event), with the events granted as a mask, and out_bypass tells the two apart downstream.
+# The mp_split midend accepts a job with its first split and emits the others while
+# splitting; only the ND midend has a busy
+MIDEND_SIGNALS = {
+    'nd_midend': {
+        'in_req_valid': 'nd_req_valid_i',
+        'in_req_ready': 'nd_req_ready_o',
+        'in_rsp_valid': 'nd_rsp_valid_o',
+        'in_rsp_ready': 'nd_rsp_ready_i',
+        'out_req_valid': 'burst_req_valid_o',
+        'out_req_ready': 'burst_req_ready_i',
+        'out_rsp_valid': 'burst_rsp_valid_i',
+        'out_rsp_ready': 'burst_rsp_ready_o',
+        'out_length': 'burst_req_o.length',
+        'out_src_addr': 'burst_req_o.src_addr',
+        'out_dst_addr': 'burst_req_o.dst_addr',
+        'busy': 'busy_o'
+    },
+    'rt_midend': {
+        'in_req_valid': 'nd_req_valid_i',
+        'in_req_ready': 'nd_req_ready_o',
+        'in_rsp_valid': 'burst_rsp_valid_o',
+        'in_rsp_ready': 'burst_rsp_ready_i',
+        'event_req_valid': 'nd_req_valid_int',
+        'event_req_ready': 'nd_req_ready_int',
+        'event_grant': 'cnt_load',
+        'event_length': 'idma_nd_req_int.burst_req.length',
+        'event_src_addr': 'idma_nd_req_int.burst_req.src_addr',
+        'event_dst_addr': 'idma_nd_req_int.burst_req.dst_addr',
+        'event_rsp_valid': 'int_valid',
+        'out_req_valid': 'nd_req_valid_o',
+        'out_req_ready': 'nd_req_ready_i',
+        'out_rsp_valid': 'burst_rsp_valid_i',
+        'out_rsp_ready': 'burst_rsp_ready_o',
+        'out_length': 'nd_req_o.burst_req.length',
+        'out_src_addr': 'nd_req_o.burst_req.src_addr',
+        'out_dst_addr': 'nd_req_o.burst_req.dst_addr',
+        'out_bypass': 'choice'
+    },
+    'mp_split_midend': {
+        'in_req_valid': 'idma_req_valid_i',
+        'in_req_ready': 'idma_req_ready_o',
+        'in_rsp_valid': 'idma_rsp_valid_o',
+        'in_rsp_ready': 'idma_rsp_ready_i',
+        'out_req_valid': 'idma_req_valid_o',
+        'out_req_ready': 'idma_req_ready_i',
+        'out_rsp_valid': 'idma_rsp_valid_i',
+        'out_rsp_ready': 'idma_rsp_ready_o',
+        'out_length': 'idma_req_o.length',
+        'out_src_addr': 'idma_req_o.src_addr',
+        'out_dst_addr': 'idma_req_o.dst_addr',
+        'splitting': 'state_q'
+    }
+}
+
+
+MIDEND_TRACER_BODY = '''
+// The tracer for the ${midend} iDMA midend
+`define IDMA_TRACER_${midend_cap}(__midend_inst, __out_f) <%text>\\</%text>
+`ifndef SYNTHESIS <%text>\\</%text>
+    initial begin : inital_tracer_${midend} <%text>\\</%text>
+        automatic bit first_iter = 1; <%text>\\</%text>
+        automatic integer tf; <%text>\\</%text>
+        automatic `IDMA_TRACER_MAX_TYPE cnst [string]; <%text>\\</%text>
+        automatic `IDMA_TRACER_MAX_TYPE meta [string]; <%text>\\</%text>
+        automatic `IDMA_TRACER_MAX_TYPE midend [string]; <%text>\\</%text>
+        automatic string trace; <%text>\\</%text>
+`ifndef VERILATOR <%text>\\</%text>
+        #0; <%text>\\</%text>
+`endif <%text>\\</%text>
+        tf = $fopen(__out_f, "w"); <%text>\\</%text>
+        $display("[iDMA Tracer] Logging %s to %s", `"__midend_inst`", __out_f); <%text>\\</%text>
+        forever begin <%text>\\</%text>
+            @(posedge __midend_inst``.clk_i); <%text>\\</%text>
+            if(__midend_inst``.rst_ni & ( <%text>\\</%text>
+% if 'busy' in signals:
+                    __midend_inst``.${signals['busy']} | <%text>\\</%text>
+% endif
+                    __midend_inst``.${signals['in_req_valid']} | <%text>\\</%text>
+                    __midend_inst``.${signals['in_rsp_valid']} | <%text>\\</%text>
+                    __midend_inst``.${signals['out_req_valid']} | <%text>\\</%text>
+                    __midend_inst``.${signals['out_rsp_valid']})) begin <%text>\\</%text>
+                /* Trace */ <%text>\\</%text>
+                trace = "{"; <%text>\\</%text>
+                /* Constants */ <%text>\\</%text>
+                cnst = '{ <%text>\\</%text>
+                    "inst"   : `"__midend_inst`", <%text>\\</%text>
+                    "midend" : "${midend}" <%text>\\</%text>
+                }; <%text>\\</%text>
+                meta = '{ <%text>\\</%text>
+                    "time" : $time() <%text>\\</%text>
+                }; <%text>\\</%text>
+                midend = '{ <%text>\\</%text>
+${fields}
+                }; <%text>\\</%text>
+                /* Assembly */ <%text>\\</%text>
+                `IDMA_TRACER_STR_ASSEMBLY(cnst, first_iter); <%text>\\</%text>
+                `IDMA_TRACER_STR_ASSEMBLY(meta, 1); <%text>\\</%text>
+                `IDMA_TRACER_STR_ASSEMBLY(midend, 1); <%text>\\</%text>
+                `IDMA_TRACER_CLEAR_COND(first_iter); <%text>\\</%text>
+                /* Commit */ <%text>\\</%text>
+                $fwrite(tf, $sformatf("%s}<%text>\\</%text>n", trace)); <%text>\\</%text>
+            end <%text>\\</%text>
+        end <%text>\\</%text>
+    end <%text>\\</%text>
+`endif
+'''
+
+
 def render_tracer_common(tpl_file: str) -> str:
-    """Generate the id-independent tracer helpers"""
+    """Generate the id-independent tracer helpers and the midend tracers"""
+
+    midend_tracers = ''
+    for midend, signals in MIDEND_SIGNALS.items():
+        fields = ''
+        for key, signal in signals.items():
+            if signal:
+                fields += f'                    "{key}" : __midend_inst``.{signal}, \\\n'
+
+        # post-processing
+        fields = fields[:-4] + ' \\'
+
+        midend_tracers += Template(MIDEND_TRACER_BODY).render(midend=midend,
+            midend_cap=midend.upper(), signals=signals, fields=fields)
+
     with open(tpl_file, 'r', encoding='utf-8') as templ_file:
-        return Template(templ_file.read()).render()
+        return Template(templ_file.read()).render(midend_tracers=midend_tracers)
 
 
 def render_tracer(prot_ids: dict, db: dict, tpl_file: str) -> str:
@@ -129,20 +317,20 @@ def render_tracer(prot_ids: dict, db: dict, tpl_file: str) -> str:
         # signals
         signals = ''
 
-        # direction-qualified: INIT is on both sides and would emit the key twice
-        for read_prot in prot_ids[prot_id]['ar']:
-            sig_dict = _flatten_dict(db[read_prot]['trace_signals']['read'])
-            for signal in sig_dict:
-                signals += '                    '
-                signals += f'"{read_prot}_read_{signal}": __backend_inst``.{sig_dict[signal]}'
-                signals += ', \\\n'
-
-        for write_prot in prot_ids[prot_id]['aw']:
-            sig_dict = _flatten_dict(db[write_prot]['trace_signals']['write'])
-            for signal in sig_dict:
-                signals += '                    '
-                signals += f'"{write_prot}_write_{signal}": __backend_inst``.{sig_dict[signal]}'
-                signals += ', \\\n'
+        # direction-qualified: INIT is on both sides and would emit the key twice;
+        # head-qualified: the ports of a multi-head protocol are arrays, one entry per head
+        for dir, prots, name in [('r', 'ar', 'read'), ('w', 'aw', 'write')]:
+            for prot in prot_ids[prot_id][prots]:
+                sig_dict = _flatten_dict(db[prot]['trace_signals'][name])
+                num_heads = prot_ids[prot_id]['multihead'][dir][prot]
+                for head in range(num_heads):
+                    port = f'{prot}_{name}' if num_heads == 1 else f'{prot}_{name}_h{head}'
+                    for signal in sig_dict:
+                        path = sig_dict[signal] if num_heads == 1 else \
+                            _head_path(sig_dict[signal], head)
+                        signals += '                    '
+                        signals += f'"{port}_{signal}": __backend_inst``.{path}'
+                        signals += ', \\\n'
 
         # post-processing
         signals = signals[:-4] + ' \\'
@@ -150,7 +338,11 @@ def render_tracer(prot_ids: dict, db: dict, tpl_file: str) -> str:
         context_body = {
             'identifier': prot_id,
             'identifier_cap': prot_id.upper(),
-            'signals': signals
+            'signals': signals,
+            'req': '__backend_inst``.idma_req_i',
+            'transport': '__backend_inst``.i_idma_transport_layer',
+            'dataflow': '__backend_inst``.i_idma_transport_layer.i_dataflow_element',
+            'compute': compute_eligible(prot_ids[prot_id]['ar'], prot_ids[prot_id]['aw'], db)
         }
 
         # render
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Shrinks a job file to a minimal subset of its jobs that still fails or runs slow.
+
+The testbench is built once by `run_vlt_sim.py`, which also checks the whole file
+reproduces. Subsets of the jobs are then searched by delta debugging (ddmin), each run
+by `run_vlt_sim.py` against that one simulation binary, `--jobs` of them in parallel.
+The result is 1-minimal: dropping any single job of it no longer reproduces.
+
+A subset reproduces a failure if its leg fails, and its output matches `--match` if given,
+e.g. `Mismatch!` to keep a mismatch from turning into another failure. With
+`--max-fraction`, it reproduces a slowdown instead: the leg passes, but achieves at most
+this fraction of the utilization `perf_model.py` predicts for the subset's jobs, and no more
+of it than the whole file does. The model counts the fixed latencies of the legalizer and the
+pipeline a bound leaves out, so a single short job is not slow merely for being short; its
+latencies are taken from `--latencies` if calibrated. Requires NumPy, as `perf_model.py`
+does.
+
+The arguments after `--` are those of `run_vlt_sim.py`, without `--dir`, `--tag` and the
+`+job_file` plusarg:
+
+    minimize_jobs.py --infile jobs/backend_rw_axi/huge.txt --outfile huge_min.txt \\
+        --dir scratch --match 'Mismatch!' -- --top tb_idma_backend_rw_axi \\
+        --flist target/sim/verilator/tb_idma_backend_rw_axi.f --token 'Launched all Transfers'
+    minimize_jobs.py --infile mixed.txt --outfile mixed_min.txt --dir scratch \\
+        --max-fraction 0.5 --db src/db/*.yml --variant rw_axi -- --top ...
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from mario.database import read_database
+from job_file import JobFileError, bin_num_dims, is_binary, read_jobs, write_job_file
+from perf_bound import trace_utilization
+
+RUN_VLT_SIM = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'run_vlt_sim.py')
+
+
+class Reproducer:
+    """Runs subsets of the jobs of a file and tells whether they reproduce"""
+
+    def __init__(self, args, sim_args: list, jobs: list, num_dims: int, binary: bool,
+                 variant: dict = None, latencies: dict = None):
+        self.args = args
+        self.sim_args = sim_args
+        self.jobs = jobs
+        self.num_dims = num_dims
+        self.binary = binary
+        self.simv = None
+        self.match = re.compile(args.match) if args.match else None
+        self.model = None
+        self.max_fraction = args.max_fraction
+        self.fractions = {}
+        if args.max_fraction is not None:
+            # NumPy is only needed to reproduce slowdowns
+            from legalizer_model import jobs_to_arrays
+            from perf_model import BackendModel
+            self.database = read_database(args.db)
+            self.model = BackendModel(self.database, variant['proc_id'], variant['params'],
+                                      variant.get('tb_params', {}), latencies)
+            self.jobs_to_arrays = jobs_to_arrays
+        self.results = {}
+        self.runs = 0
+
+    def _run(self, tag: str, subset: tuple, build: bool = False) -> bool:
+        """Runs one leg, returns whether it reproduces"""
+
+        workdir = os.path.join(os.path.abspath(self.args.dir), tag)
+        os.makedirs(workdir, exist_ok=True)
+        job_file = os.path.join(workdir, 'jobs.bin' if self.binary else 'jobs.txt')
+        trace_file = os.path.join(workdir, 'trace.txt')
+        write_job_file(job_file, [self.jobs[idx] for idx in subset], self.num_dims)
+
+        cmd = [sys.executable, RUN_VLT_SIM, *self.sim_args, '--dir', workdir, '--tag', tag,
+               f'--plusarg=+job_file={job_file}']
+        if self.model:
+            cmd.append(f'--plusarg=+trace_file={trace_file}')
+        if not build:
+            cmd += ['--binary', self.simv]
+        with open(os.path.join(workdir, 'leg.log'), 'w+', encoding='utf8',
+                  errors='replace') as log:
+            failed = subprocess.call(cmd, stdout=log, stderr=subprocess.STDOUT) != 0
+            log.seek(0)
+            output = log.read()
+        if build:
+            self.simv = os.path.join(workdir, f'obj_{tag}', 'simv')
+
+        if self.model:
+            if failed or not os.path.isfile(trace_file):
+                res = False
+            else:
+                modelled = self.model.run(self.jobs_to_arrays(
+                    [self.jobs[idx] for idx in subset]))['utilization']
+                _, achieved = trace_utilization(trace_file, self.database)
+                self.fractions[subset] = achieved[1] / max(modelled, 1e-9)
+                res = self.fractions[subset] <= self.max_fraction
+        else:
+            res = failed and (not self.match or bool(self.match.search(output)))
+
+        if not self.args.keep and not build:
+            shutil.rmtree(workdir, ignore_errors=True)
+        return res
+
+    def build(self) -> bool:
+        """Builds the testbench, returns whether the whole file reproduces
+
+        A slow subset must then fall at or below the fraction of the whole file, so the search
+        keeps the jobs of the slowdown rather than any that run below the fraction.
+        """
+        self.runs += 1
+        whole = tuple(range(len(self.jobs)))
+        res = self._run('build', whole, build=True)
+        if res and self.model:
+            self.max_fraction = self.fractions[whole]
+            print(f'The whole file achieves {self.max_fraction:.4f} of the modelled '
+                  'utilization', file=sys.stderr)
+        return res
+
+    def test(self, subsets: list) -> list:
+        """Runs the subsets not run before in parallel, returns whether each reproduces"""
+
+        pending = list(dict.fromkeys(subset for subset in subsets if subset not in self.results))
+        with ThreadPoolExecutor(self.args.jobs) as pool:
+            tags = [f'run{self.runs + idx}' for idx in range(len(pending))]
+            self.runs += len(pending)
+            for subset, res in zip(pending, pool.map(self._run, tags, pending)):
+                self.results[subset] = res
+        return [self.results[subset] for subset in subsets]
+
+
+def ddmin(reproducer: Reproducer, num_jobs: int) -> tuple:
+    """Returns a 1-minimal subset of the jobs that reproduces, by delta debugging"""
+
+    current = tuple(range(num_jobs))
+    num_parts = 2
+    while len(current) > 1:
+        size = len(current)
+        parts = [current[size * idx // num_parts:size * (idx + 1) // num_parts]
+                 for idx in range(num_parts)]
+        print(f'{size} jobs in {num_parts} parts', file=sys.stderr)
+
+        # a part on its own, then all but a part
+        res = reproducer.test(parts)
+        if any(res):
+            current = parts[res.index(True)]
+            num_parts = 2
+            continue
+        complements = [tuple(idx for other in parts if other is not part for idx in other)
+                       for part in parts]
+        res = reproducer.test(complements) if num_parts > 2 else [False]
+        if any(res):
+            current = complements[res.index(True)]
+            num_parts = max(num_parts - 1, 2)
+            continue
+        if num_parts >= size:
+            break
+        num_parts = min(num_parts * 2, size)
+    return current
+
+
+def main():
+    # the arguments of run_vlt_sim.py follow a --
+    argv = sys.argv[1:]
+    sim_args = argv[argv.index('--') + 1:] if '--' in argv else []
+    argv = argv[:argv.index('--')] if '--' in argv else argv
+
+    parser = argparse.ArgumentParser(
+        prog='minimize_jobs',
+        description='Shrinks a job file to a minimal subset that still fails or runs slow',
+        usage='%(prog)s [options] -- RUN_VLT_SIM_ARGS'
+    )
+    parser.add_argument('--infile', dest='infile', required=True,
+        help='Text or binary job file that fails or runs slow')
+    parser.add_argument('--outfile', dest='outfile', required=True,
+        help='Minimal job file to write, binary if it ends in .bin')
+    parser.add_argument('--num-dims', dest='num_dims', type=int, default=1,
+        help='NumDim of a text job file, the 1D transfer included')
+    parser.add_argument('--dir', dest='dir', required=True,
+        help='Scratch directory of the build and the runs')
+    parser.add_argument('--jobs', dest='jobs', type=int, default=os.cpu_count(),
+        help='Number of simulations run in parallel')
+    parser.add_argument('--match', dest='match',
+        help='Regular expression the output of a failing run must match')
+    parser.add_argument('--max-fraction', dest='max_fraction', type=float,
+        help='Reproduce a passing run achieving at most this fraction of the modelled '
+             'utilization instead')
+    parser.add_argument('--db', dest='db', nargs='*', default=[],
+        help='Protocol database files, for --max-fraction')
+    parser.add_argument('--jobs-json', dest='jobs_json', default='jobs/jobs.json',
+        help='The jobs.json holding the variant, for --max-fraction')
+    parser.add_argument('--variant', dest='variant',
+        help='Backend variant in jobs.json supplying the parameters, for --max-fraction')
+    parser.add_argument('--latencies', dest='latencies',
+        help='JSON file of the latencies perf_model.py calibrated, for --max-fraction')
+    parser.add_argument('--keep', dest='keep', action='store_true',
+        help='Keep the scratch directories of all runs')
+    args = parser.parse_args(argv)
+
+    if not sim_args:
+        parser.error('the arguments of run_vlt_sim.py are missing after --')
+    if args.max_fraction is not None and not (args.db and args.variant):
+        parser.error('--max-fraction requires --db and --variant')
+    variant = latencies = None
+    if args.max_fraction is not None:
+        with open(args.jobs_json, 'r', encoding='utf8') as jobs_json:
+            variants = json.load(jobs_json)
+        variants.pop('_verify', None)
+        if args.variant not in variants:
+            parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+        variant = variants[args.variant]
+        if args.latencies:
+            from perf_model import read_calibration
+            latencies = read_calibration(args.latencies, args.variant)[0]
+            if latencies is None:
+                parser.error(f'{args.latencies} holds no latencies of {args.variant}')
+
+    binary = is_binary(args.infile)
+    num_dims = bin_num_dims(args.infile) if binary else args.num_dims
+    try:
+        jobs = list(read_jobs(args.infile, num_dims))
+    except JobFileError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    reproducer = Reproducer(args, sim_args, jobs, num_dims, binary, variant, latencies)
+    print(f'Building and running all {len(jobs)} jobs', file=sys.stderr)
+    if not reproducer.build():
+        print(f'{args.infile} does not reproduce, see {os.path.join(args.dir, "build")}',
+              file=sys.stderr)
+        return 1
+
+    subset = ddmin(reproducer, len(jobs))
+    write_job_file(args.outfile, [jobs[idx] for idx in subset], num_dims)
+    print(f'Reduced {len(jobs)} jobs to {len(subset)} in {reproducer.runs} runs, '
+          f'written to {args.outfile}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
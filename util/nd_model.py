@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Vectorized model of the address expansion of the ND midend.
+
+The model follows `idma_nd_midend.sv`: the first 1D transfer of a job starts at its base
+addresses. After each transfer, the stride of the outermost dimension whose counter advances
+is added to the addresses, so a stride is the jump from the last transfer of the inner
+dimensions to the next one, not an offset from the base. A dimension of zero repetitions is
+bypassed, unless all are: then no transfer is issued. Addresses wrap at `AddrWidth`.
+
+The addresses of each transfer follow in closed form from its index, so jobs of millions of
+repetitions are expanded in chunks of `--chunk` transfers without a loop per transfer. Per
+job file, the jobs, 1D transfers and bytes are reported. With `--db`, the transfers are split
+into bursts by `legalizer_model.py`, giving the bursts and beats each transfer costs.
+Requires NumPy, which is not a dependency of the other tools:
+
+    nd_model.py --job linear_2d simple --outfile transfers.csv
+    nd_model.py --db src/db/*.yml --job-file conv.txt
+
+Given a trace of the ND midend (`IDMA_TRACER_ND_MIDEND`) running one job file, the requests
+it emitted are compared to the model's:
+
+    nd_model.py --job linear_2d --trace midend_trace.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit('nd_model.py requires NumPy: uv sync --extra models, or pip install numpy')
+
+from tabulate import tabulate
+from mario.database import read_database
+from job_file import Job, JobFileError, read_jobs
+from job_stats import nd_transfers
+from legalizer_model import JOB_FIELDS, Legalizer
+from trace_idma import iter_trace
+
+# transfers expanded at once
+DEFAULT_CHUNK = 1 << 20
+
+
+def expand(job: Job, addr_width: int, start: int = 0, stop: int = None) -> tuple:
+    """Returns the source and destination addresses of the transfers start to stop of a job"""
+
+    total = nd_transfers(job)
+    stop = total if stop is None else min(stop, total)
+    if total >> 64:
+        raise ValueError(f'{total} transfers do not fit the model\'s 64 bit indices')
+    idx = np.arange(start, max(start, stop), dtype=np.uint64)
+    src = np.full(len(idx), job.src_addr, dtype=np.uint64)
+    dst = np.full(len(idx), job.dst_addr, dtype=np.uint64)
+
+    # a dimension advances on every transfer its inner ones wrap at, but not when it wraps
+    inner = 1
+    for dim in job.dims:
+        reps = max(dim.reps, 1)
+        steps = idx // np.uint64(inner) - idx // np.uint64(inner * reps)
+        src += steps * np.uint64(dim.src_stride & ((1 << 64) - 1))
+        dst += steps * np.uint64(dim.dst_stride & ((1 << 64) - 1))
+        inner *= reps
+
+    mask = np.uint64((1 << addr_width) - 1)
+    return src & mask, dst & mask
+
+
+def iter_transfers(jobs, addr_width: int, chunk: int = DEFAULT_CHUNK):
+    """Yields the index, job and addresses of chunks of the 1D transfers of jobs, in order"""
+    for idx, job in enumerate(jobs):
+        total = nd_transfers(job)
+        for start in range(0, total, chunk):
+            yield (idx, job, *expand(job, addr_width, start, start + chunk))
+
+
+def transfer_arrays(job: Job, src, dst) -> dict:
+    """Returns 1D transfers of a job as the job arrays of `legalizer_model.py`"""
+    arrays = {field: np.full(len(src), getattr(job, field), dtype=np.int64)
+              for field in JOB_FIELDS}
+    arrays['src_addr'] = src.astype(np.int64)
+    arrays['dst_addr'] = dst.astype(np.int64)
+    return arrays
+
+
+class Expansion:
+    """Accumulates the 1D transfers of one job file, and their bursts if given a legalizer"""
+
+    def __init__(self, legalizer: Legalizer = None):
+        self.legalizer = legalizer
+        self.counts = {'jobs': 0, 'jobs without transfers': 0, '1D transfers': 0, 'bytes': 0,
+                       'most transfers of a job': 0}
+        if legalizer:
+            self.counts.update({'read bursts': 0, 'write bursts': 0, 'read beats': 0,
+                                'write beats': 0})
+        self.elapsed = 0.0
+
+    def add_job(self, job: Job):
+        transfers = nd_transfers(job)
+        self.counts['jobs'] += 1
+        self.counts['jobs without transfers'] += not transfers
+        self.counts['1D transfers'] += transfers
+        self.counts['bytes'] += transfers * job.length
+        self.counts['most transfers of a job'] = max(self.counts['most transfers of a job'],
+                                                     transfers)
+
+    def add_chunk(self, job: Job, src, dst):
+        if not self.legalizer:
+            return
+        start = time.perf_counter()
+        reads, writes = self.legalizer.split(transfer_arrays(job, src, dst))
+        self.elapsed += time.perf_counter() - start
+        for dir, bursts in [('read', reads), ('write', writes)]:
+            self.counts[f'{dir} bursts'] += len(bursts['job'])
+            self.counts[f'{dir} beats'] += int(bursts['beats'].sum())
+
+    def per_transfer(self) -> dict:
+        """Returns the bytes, bursts and beats of an average 1D transfer"""
+        transfers = self.counts['1D transfers']
+        keys = ['bytes'] + (['read bursts', 'write bursts', 'read beats', 'write beats']
+                            if self.legalizer else [])
+        return {key: self.counts[key] / transfers if transfers else None for key in keys}
+
+
+def format_report(names: list, expansions: list) -> str:
+    """Returns the totals and the per-transfer averages of job files side by side"""
+    rows = [[key, *[exp.counts[key] for exp in expansions]] for key in expansions[0].counts]
+    text = tabulate(rows, headers=['total', *names])
+    rows = [[key, *[exp.per_transfer()[key] for exp in expansions]]
+            for key in expansions[0].per_transfer()]
+    text += '\n\n' + tabulate(rows, headers=['per 1D transfer', *names], floatfmt='.2f',
+                              missingval='-')
+    return text
+
+
+def traced_requests(fn: str):
+    """Yields the source and destination address and length of the requests a midend emitted"""
+    for ele in iter_trace(fn):
+        midend = ele['midend']
+        if midend['out_req_valid'] and midend['out_req_ready']:
+            yield midend['out_src_addr'], midend['out_dst_addr'], midend['out_length']
+
+
+def compare_trace(jobs: list, fn: str, addr_width: int, chunk: int) -> int:
+    """Compares the requests of a midend trace to the model's, returns 1 on a mismatch"""
+
+    def modelled():
+        for _, job, src, dst in iter_transfers(jobs, addr_width, chunk):
+            for src_addr, dst_addr in zip(src.tolist(), dst.tolist()):
+                yield src_addr, dst_addr, job.length
+
+    num = 0
+    traced = traced_requests(fn)
+    for expected in modelled():
+        seen = next(traced, None)
+        if seen != expected:
+            print(f'request {num}: modelled {expected[2]} B 0x{expected[0]:x} -> '
+                  f'0x{expected[1]:x}, traced ' + ('none' if seen is None else
+                  f'{seen[2]} B 0x{seen[0]:x} -> 0x{seen[1]:x}'))
+            return 1
+        num += 1
+    extra = sum(1 for _ in traced)
+    if extra:
+        print(f'{extra} traced requests beyond the {num} modelled')
+        return 1
+    print(f'{num} requests modelled and traced, all match')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='nd_model',
+        description='Vectorized model of the address expansion of the ND midend'
+    )
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', default='4d_extension',
+        help='ND variant in jobs.json supplying the id and parameters')
+    parser.add_argument('--job', dest='job', nargs='*', default=[],
+        help='Names of the variant\'s job files in jobs.json, all if none are given')
+    parser.add_argument('--job-file', dest='job_file', nargs='*', default=[],
+        help='Paths of job files not listed in jobs.json')
+    parser.add_argument('--param', dest='param', nargs='*', default=[], metavar='NAME=VALUE',
+        help='Override parameters of the variant, e.g. AddrWidth or NumDim')
+    parser.add_argument('--db', dest='db', nargs='*', default=[],
+        help='Protocol database files, to split the transfers into bursts')
+    parser.add_argument('--chunk', dest='chunk', type=int, default=DEFAULT_CHUNK,
+        help='Number of transfers expanded at once')
+    parser.add_argument('--outfile', dest='outfile',
+        help='Write the 1D transfers of the first job file as CSV')
+    parser.add_argument('--trace', dest='trace_file',
+        help='Compare the requests of a midend trace running the first job file to the model')
+    args = parser.parse_args()
+
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    if args.variant not in variants:
+        parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+    variant = variants[args.variant]
+    params = dict(variant['params'])
+    for override in args.param:
+        name, value = override.split('=', 1)
+        params[name] = int(value, 0)
+    if params.get('NumDim', 1) < 2:
+        parser.error(f'{args.variant} is not an ND variant')
+    legalizer = Legalizer(read_database(args.db), variant['proc_id'], params) \
+        if args.db else None
+
+    # job files, relative to jobs.json if named
+    names = args.job or ([] if args.job_file else list(variant['jobs']))
+    for name in names:
+        if name not in variant['jobs']:
+            parser.error(f'{args.variant} has no job {name}, only {", ".join(variant["jobs"])}')
+    files = {name: os.path.join(os.path.dirname(args.jobs), variant['jobs'][name])
+             for name in names}
+    files.update({path: path for path in args.job_file})
+
+    expansions = []
+    for num, (name, path) in enumerate(files.items()):
+        try:
+            jobs = list(read_jobs(path, params['NumDim']))
+        except JobFileError as err:
+            print(err, file=sys.stderr)
+            return 1
+        if num == 0 and args.trace_file:
+            return compare_trace(jobs, args.trace_file, params['AddrWidth'], args.chunk)
+
+        expansion = Expansion(legalizer)
+        out = open(args.outfile, 'w', encoding='utf8') if num == 0 and args.outfile else None
+        if out:
+            out.write('job,src_addr,dst_addr,length\n')
+        start = time.perf_counter()
+        for job in jobs:
+            expansion.add_job(job)
+        for idx, job, src, dst in iter_transfers(jobs, params['AddrWidth'], args.chunk):
+            expansion.add_chunk(job, src, dst)
+            if out:
+                out.writelines(f'{idx},0x{src_addr:x},0x{dst_addr:x},{job.length}\n'
+                               for src_addr, dst_addr in zip(src.tolist(), dst.tolist()))
+        elapsed = time.perf_counter() - start
+        if out:
+            out.close()
+        transfers = expansion.counts['1D transfers']
+        print(f'{name}: {transfers} transfers, {elapsed * 1e3:.1f} ms '
+              f'({transfers / max(elapsed - expansion.elapsed, 1e-9):.0f} transfers/s expanded)',
+              file=sys.stderr)
+        expansions.append(expansion)
+
+    print(format_report(list(files), expansions))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
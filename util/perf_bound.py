@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Theoretical throughput bound of a job file on a backend variant.
+
+Each 1D transfer is split into bursts the way the hardware legalizer does, given
+the protocol database and the variant's parameters from `jobs.json`. A side, read
+or write, of a transfer takes at least as many cycles as the largest of:
+
+  - its beats, one per cycle,
+  - its bursts, one AX (or OBI request) per cycle,
+  - the sum of each burst's memory latency and beats divided by the bursts that may be
+    outstanding, `NumAxInFlight` or the testbench memory's `MemNumReqOutst` if lower.
+
+A transfer takes the longer of its sides; the job file, as reads and writes of
+consecutive transfers overlap, the longer of all reads and all writes. The bound
+is optimistic: it ignores the error handler, bus contention and the buffer. A
+`BufferDepth` below 3 may stall transfers with differing source and destination
+offsets; those are counted in the output.
+
+Given a trace of the run, the achieved fraction of the bound is reported:
+
+    perf_bound.py --db src/db/*.yml --variant rw_axi --job huge --trace trace.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from tabulate import tabulate
+from mario.database import read_database
+from mario.util import prepare_ids
+from job_file import BURST_LEN, PROTOCOL_ENUM, Job, read_jobs
+from trace_idma import Utilization, extract_parameter, get_be_info, iter_trace
+
+# the legalizer's page splitter never crosses a 4 KiB boundary
+MAX_PAGE_ADDR_WIDTH = 12
+
+# limits a burst may end at before its transfer does, see bytes_to_boundary
+SPLIT_REASONS = ['page boundary', 'pow2', 'job burst limit', 'max burst length', 'not bursting',
+    'coupled']
+
+# smallest BufferDepth that sustains misaligned transfers
+MIN_MISALIGNED_BUFFER_DEPTH = 3
+
+# width of the log2 burst limit of a request, `max_llen` of idma_pkg::backend_options_t
+MAX_LLEN_WIDTH = 3
+
+# the legalizer's `BurstLen`, the log2 burst limit in words if a request does not reduce it
+DEFAULT_BURST_LEN = 8
+
+
+def protocol_db(database: dict, index: int) -> dict:
+    """Returns the database entry of a protocol given its index in a job file"""
+    for prot in database.values():
+        if prot['protocol_enum'] == PROTOCOL_ENUM[index]:
+            return prot
+    raise ValueError(f'protocol {index} ({PROTOCOL_ENUM[index]}) is not in the database')
+
+
+def clog2(value: int) -> int:
+    """Returns the ceiled binary logarithm, as SystemVerilog's $clog2"""
+    return max(0, (value - 1).bit_length())
+
+
+def legalizer_page(prot: dict, strb_width: int) -> int:
+    """Returns the largest burst in bytes the legalizer's splitters let a protocol issue"""
+    if prot['bursts'] == 'not_supported':
+        return strb_width
+    if prot['bursts'] == 'only_pow2':
+        return prot['page_size']
+    return min(prot['page_size'], prot['max_beats_per_burst'] * strb_width)
+
+
+def page_width(database: dict, protocols: list, strb_width: int) -> int:
+    """Returns `PageAddrWidth` of the legalizer of a backend, set by the largest page of its
+    protocols, given by name as in `prepare_ids`
+    """
+    return clog2(max(legalizer_page(database[prot], strb_width) for prot in protocols))
+
+
+def job_burst_beats(max_len: int) -> int:
+    """Returns the beats a job's burst limit allows below BURST_LEN
+
+    The testbench requests `reduce_len` and `max_llen = $clog2(max_len)`, of which the legalizer
+    sees the lower MAX_LLEN_WIDTH bits.
+    """
+    return 1 << ((max_len - 1).bit_length() & ((1 << MAX_LLEN_WIDTH) - 1))
+
+
+def _floor_pow2(value: int, max_width: int) -> int:
+    """Returns the largest power of two of at most max_width bits not above value, or 0"""
+    return 1 << min(value.bit_length() - 1, max_width) if value else 0
+
+
+def pow2_bytes(prot: dict, addr: int, length: int, strb_width: int, page_addr_width: int,
+               is_write: bool) -> int:
+    """Returns the bytes of the next burst of idma_legalizer_pow2_splitter, e.g. of TileLink
+
+    The splitter's lengths are PageAddrWidth + 1 bits wide; an aligned burst is as long as the
+    remaining bytes allow, a misaligned one fills its word at most.
+    """
+
+    offset_width = strb_width.bit_length() - 1
+    len_mask = (1 << (page_addr_width + 1)) - 1
+    tltoaxi4 = prot.get('tltoaxi4_compatibility_mode') == 'true'
+    pow2_page = prot['page_size']
+    if is_write and tltoaxi4:
+        pow2_page = min(32 * strb_width, pow2_page)
+    pow2_width = clog2(pow2_page)
+
+    # TLToAXI4 bursts do not cross a page, others may move longer lengths in whole bursts
+    if tltoaxi4 and length >> page_addr_width:
+        length_i = (prot['page_size'] - addr % (1 << page_addr_width)) & len_mask
+    else:
+        length_i = length & len_mask
+    larger = not tltoaxi4 and length >> (page_addr_width + 1) != 0
+
+    if addr % strb_width:
+        word_left = strb_width - addr % strb_width
+        if not larger and word_left > length_i:
+            word_left = length_i
+        return _floor_pow2(word_left, offset_width) & len_mask
+    if larger:
+        return (1 << pow2_width) & len_mask
+    return _floor_pow2(min(length_i, 1 << pow2_width), page_addr_width + 1) & len_mask
+
+
+def bytes_to_boundary(prot: dict, addr: int, length: int, max_len: int, strb_width: int,
+                      is_write: bool, page_addr_width: int,
+                      burst_len: int = DEFAULT_BURST_LEN) -> tuple:
+    """Returns the bytes the legalizer may move in one burst from addr on and what limits them"""
+
+    offset_width = strb_width.bit_length() - 1
+
+    # one beat per burst
+    if prot['bursts'] == 'not_supported':
+        return strb_width - addr % strb_width, 'not bursting'
+
+    # power-of-two bursts, at most to the end of a page with TLToAXI4 compatibility
+    if prot['bursts'] == 'only_pow2':
+        num_bytes = pow2_bytes(prot, addr, length, strb_width, page_addr_width, is_write)
+        if not num_bytes:
+            raise ValueError(f'the legalizer makes no progress at 0x{addr:x}')
+        page_left = prot['page_size'] - addr % prot['page_size']
+        return num_bytes, 'page boundary' if num_bytes == page_left else 'pow2'
+
+    # bursts up to a page or the maximum burst length, whichever is smaller; page first on ties
+    job_limit = [(1 << min(offset_width + burst_len, MAX_PAGE_ADDR_WIDTH), 'max burst length')] \
+        if max_len == BURST_LEN else [(job_burst_beats(max_len) << offset_width, 'job burst limit')]
+    page_size, reason = min([
+        (prot['page_size'], 'page boundary'),
+        (1 << MAX_PAGE_ADDR_WIDTH, 'page boundary'),
+        *job_limit,
+        (prot['max_beats_per_burst'] * strb_width, 'max burst length')
+    ], key=lambda limit: limit[0])
+    return page_size - addr % page_size, reason
+
+
+def force_decouple(prot: dict) -> bool:
+    """Whether the legalizer splits read and write independently for a protocol"""
+    return prot['bursts'] == 'not_supported' or prot.get('legalizer_force_decouple') == 'true'
+
+
+def split_transfer(job: Job, database: dict, strb_width: int, page_addr_width: int,
+                   burst_len: int = DEFAULT_BURST_LEN) -> tuple:
+    """Returns the (address, bytes, reason) bursts of the read and write side of a 1D transfer
+
+    The reason is the limit a burst ends at before its side of the transfer does, one of
+    SPLIT_REASONS, and None for the last burst. `page_addr_width` is that of the backend, see
+    page_width, `burst_len` the legalizer's `BurstLen`.
+    """
+
+    src_prot = protocol_db(database, job.src_protocol)
+    dst_prot = protocol_db(database, job.dst_protocol)
+    decoupled = job.decouple_rw or force_decouple(src_prot) or force_decouple(dst_prot)
+
+    reads = []
+    writes = []
+    r_addr, r_len = job.src_addr, job.length
+    w_addr, w_len = job.dst_addr, job.length
+    while r_len or w_len:
+        # decoupled, one side may be done before the other
+        r_pb, r_reason = bytes_to_boundary(src_prot, r_addr, r_len, job.max_src_len,
+            strb_width, False, page_addr_width, burst_len) if r_len else (0, None)
+        w_pb, w_reason = bytes_to_boundary(dst_prot, w_addr, w_len, job.max_dst_len,
+            strb_width, True, page_addr_width, burst_len) if w_len else (0, None)
+        if not decoupled:
+            if r_pb > w_pb:
+                r_pb, r_reason = w_pb, 'coupled'
+            elif w_pb > r_pb:
+                w_pb, w_reason = r_pb, 'coupled'
+        if r_len:
+            num_bytes = min(r_len, r_pb)
+            reads.append((r_addr, num_bytes, r_reason if num_bytes < r_len else None))
+            r_addr, r_len = r_addr + num_bytes, r_len - num_bytes
+        if w_len:
+            num_bytes = min(w_len, w_pb)
+            writes.append((w_addr, num_bytes, w_reason if num_bytes < w_len else None))
+            w_addr, w_len = w_addr + num_bytes, w_len - num_bytes
+
+    return reads, writes
+
+
+def beats(addr: int, length: int, strb_width: int) -> int:
+    """Returns the bus beats a burst occupies"""
+    return -(-(addr % strb_width + length) // strb_width)
+
+
+def side_cycles(bursts: list, strb_width: int, latency: int, in_flight: int) -> tuple:
+    """Returns the beats and the least cycles of one side of a transfer"""
+
+    side_beats = [beats(addr, length, strb_width) for addr, length, _ in bursts]
+    occupancy = sum(latency + num_beats for num_beats in side_beats)
+    return sum(side_beats), max(sum(side_beats), len(bursts), -(-occupancy // in_flight))
+
+
+def memory_limits(prot: dict, params: dict, tb_params: dict) -> tuple:
+    """Returns the memory latency and outstanding bursts of a protocol's testbench memory"""
+
+    enum = prot['protocol_enum']
+    in_flight = params['NumAxInFlight']
+    if not tb_params.get(f'{enum}_IdealMemory', 1):
+        return (tb_params.get(f'{enum}_MemLatency', 0),
+                min(in_flight, tb_params.get(f'{enum}_MemNumReqOutst', 1)))
+    return 0, in_flight
+
+
+def transfer_bound(job: Job, database: dict, params: dict, tb_params: dict,
+                   page_addr_width: int) -> dict:
+    """Returns the best-case bus cycles of one 1D transfer"""
+
+    strb_width = params['DataWidth'] // 8
+    reads, writes = split_transfer(job, database, strb_width, page_addr_width,
+                                   params.get('BurstLen', DEFAULT_BURST_LEN))
+    src_prot = protocol_db(database, job.src_protocol)
+    dst_prot = protocol_db(database, job.dst_protocol)
+
+    read_beats, read_cycles = side_cycles(reads, strb_width,
+        *memory_limits(src_prot, params, tb_params))
+    write_beats, write_cycles = side_cycles(writes, strb_width,
+        *memory_limits(dst_prot, params, tb_params))
+
+    return {
+        'length': job.length,
+        'read_bursts': len(reads),
+        'write_bursts': len(writes),
+        'read_beats': read_beats,
+        'write_beats': write_beats,
+        'read_cycles': read_cycles,
+        'write_cycles': write_cycles,
+        'cycles': max(1, read_cycles, write_cycles),
+        'misaligned': job.src_addr % strb_width != job.dst_addr % strb_width
+    }
+
+
+def file_bound(jobs, database: dict, backend_id: str, params: dict, tb_params: dict) -> tuple:
+    """Returns the per-transfer bounds and the bound of a whole job file on a backend id"""
+
+    page_addr_width = page_width(database, prepare_ids([backend_id])[backend_id]['used'],
+                                 params['DataWidth'] // 8)
+    transfers = [transfer_bound(job, database, params, tb_params, page_addr_width)
+                 for job in jobs]
+    cycles = max(1, sum(t['read_cycles'] for t in transfers),
+                 sum(t['write_cycles'] for t in transfers))
+    max_data = cycles * params['DataWidth'] // 8
+
+    return transfers, {
+        'transfers': len(transfers),
+        'bytes': sum(t['length'] for t in transfers),
+        'cycles': cycles,
+        'read_utilization': sum(t['read_beats'] for t in transfers) / cycles,
+        'write_utilization': sum(t['length'] for t in transfers) / max_data,
+        'misaligned': sum(t['misaligned'] for t in transfers)
+    }
+
+
+def trace_utilization(fn: str, database: dict) -> tuple:
+    """Returns the parameters and the achieved [read, write] utilization of a trace"""
+
+    idma_trace = iter_trace(fn)
+    first = next(idma_trace, None)
+    params = extract_parameter([first] if first else [])
+    utilization = Utilization(params, get_be_info(params, database))
+    if first:
+        utilization.update(first)
+    for ele in idma_trace:
+        utilization.update(ele)
+
+    return params, utilization.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='perf_bound',
+        description='Calculates the theoretical throughput bound of a job file'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True,
+        help='Protocol database files')
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', required=True,
+        help='Backend variant in jobs.json supplying the parameters')
+    parser.add_argument('--job', dest='job',
+        help='Name of the variant\'s job file in jobs.json')
+    parser.add_argument('--job-file', dest='job_file',
+        help='Path of a job file not listed in jobs.json')
+    parser.add_argument('--param', dest='param', nargs='*', default=[], metavar='NAME=VALUE',
+        help='Override parameters or testbench parameters of the variant')
+    parser.add_argument('--trace', dest='trace_file',
+        help='Trace of the run, report the achieved fraction of the bound')
+    parser.add_argument('--per-transfer', dest='per_transfer', action='store_true',
+        help='Print the bound of every transfer')
+    parser.add_argument('--min-utilization', dest='min_utilization', type=float,
+        help='Fail a trace below this write utilization, defaults to the job\'s in jobs.json')
+    args = parser.parse_args()
+
+    database = read_database(args.db)
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    if args.variant not in variants:
+        parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+    variant = variants[args.variant]
+    params = dict(variant['params'])
+    tb_params = dict(variant.get('tb_params', {}))
+    for override in args.param:
+        name, value = override.split('=', 1)
+        # testbench parameters are prefixed with their protocol, e.g. AXI_MemLatency
+        (tb_params if '_' in name else params)[name] = int(value, 0)
+
+    # job file, relative to jobs.json if named
+    if args.job:
+        job_file = os.path.join(os.path.dirname(args.jobs), variant['jobs'][args.job])
+    elif args.job_file:
+        job_file = args.job_file
+    else:
+        parser.error('either --job or --job-file is required')
+
+    transfers, bound = file_bound(read_jobs(job_file), database, variant['proc_id'], params,
+                                  tb_params)
+
+    if args.per_transfer:
+        print(tabulate([[idx, *t.values()] for idx, t in enumerate(transfers)],
+            headers=['transfer', *transfers[0].keys()] if transfers else []))
+        print()
+
+    rows = [
+        ['transfers', bound['transfers']],
+        ['bytes', bound['bytes']],
+        ['bound cycles', bound['cycles']],
+        ['read utilization bound', f'{bound["read_utilization"]:.4f}'],
+        ['write utilization bound', f'{bound["write_utilization"]:.4f}'],
+    ]
+
+    # the expected utilization of a performance suite, see gen_perf_suites.py
+    expected = args.min_utilization
+    if expected is None and args.job:
+        expected = variant.get('perf', {}).get(args.job)
+
+    achieved = None
+    if args.trace_file:
+        trace_params, achieved = trace_utilization(args.trace_file, database)
+        if trace_params['data_width'] != params['DataWidth']:
+            print(f'Trace has DataWidth {trace_params["data_width"]}, the variant '
+                  f'{params["DataWidth"]}', file=sys.stderr)
+            return 1
+        rows += [
+            ['read utilization achieved', f'{achieved[0]:.4f}'],
+            ['write utilization achieved', f'{achieved[1]:.4f}'],
+            ['fraction of bound', f'{achieved[1] / max(bound["write_utilization"], 1e-9):.4f}'],
+        ]
+        if expected is not None:
+            rows.append(['expected write utilization', f'{expected:.4f}'])
+    print(tabulate(rows, disable_numparse=True))
+
+    if bound['misaligned'] and params['BufferDepth'] < MIN_MISALIGNED_BUFFER_DEPTH:
+        print(f'{bound["misaligned"]} misaligned transfer(s) may stall on BufferDepth '
+              f'{params["BufferDepth"]}, their bound is optimistic', file=sys.stderr)
+
+    if achieved and expected is not None and achieved[1] < expected:
+        print(f'Write utilization {achieved[1]:.4f} is below the expected {expected:.4f}',
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Cycle-approximate performance model of the backend.
+
+Predicts the cycles a job file takes on a `jobs.json` variant in milliseconds
+instead of a Verilator run. The bursts come from the golden model of the legalizer,
+`legalizer_model.py`; their timing follows a recurrence over the bursts in the order
+they move data:
+
+  - the legalizer emits one burst per side and cycle, and takes the next request
+    once both sides of the current one are emitted,
+  - an AR waits for a free entry of the read datapath FIFO (`NumAxInFlight`) and the
+    memory's read credits (`MemNumReqOutst` of the testbench),
+  - an AW waits for the write datapath FIFO (`NumAxInFlight`), the memory's write
+    credits, the write meta FIFO (`BufferDepth + NumAxInFlight + MemSysDepth` bursts
+    up to their B) and, unless `decouple_aw` is set, for the R-AW coupler to see the
+    burst's first data in the buffer,
+  - R and W beats move one per cycle, reads stall once `BufferDepth` words are buffered,
+    and the write response FIFO (`NumAxInFlight`) holds W until older B responses return,
+  - the memory's `MemLatency` cuts add a cycle per cut on the way out and back.
+
+The remaining constants, the latencies of the legalizer, the memory, the buffer and
+the response path, are fitted against traces of real runs with `--calibrate` and
+stored per variant in a JSON file for `--latencies`, with the largest relative error
+of the predicted cycles of a traced run. Lists of parameter values explore the
+design space, one result per combination:
+
+    perf_model.py --db src/db/*.yml --variant rw_axi --job huge --param NumAxInFlight=2,4,8
+
+The model ignores bus contention between heads, the error handler and compute
+stages changing the size of a transfer. Requires NumPy, as `legalizer_model.py` does.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit('perf_model.py requires NumPy: uv sync --extra models, or pip install numpy')
+
+from tabulate import tabulate
+from mario.database import read_database
+from legalizer_model import Legalizer, jobs_to_arrays
+from job_file import read_jobs
+from perf_bound import memory_limits, protocol_db
+from trace_idma import extract_parameter, iter_trace
+from trace_to_jobs import request_job
+
+# latencies in cycles not set by a parameter, fitted by --calibrate
+LATENCIES = {
+    'legalizer': 1,  # accepted request to its first burst
+    'read': 1,       # AR to the first R beat, besides the memory's cuts
+    'buffer': 1,     # R beat to the earliest W beat carrying its bytes
+    'write': 1,      # last W beat to the B response, besides the memory's cuts
+    'response': 1    # last B response of a transfer to its response
+}
+
+# values tried per latency when calibrating, and the uniform latencies it starts from
+CALIBRATION_RANGE = range(0, 17)
+CALIBRATION_STARTS = [0, 2, 4, 8]
+
+
+class BackendModel:
+    """The timing of a backend variant, given its parameters and those of its testbench"""
+
+    def __init__(self, database: dict, backend_id: str, params: dict, tb_params: dict,
+                 latencies: dict = None):
+        self.legalizer = Legalizer(database, backend_id, params)
+        self.latencies = dict(LATENCIES, **(latencies or {}))
+        self.strb_width = params['DataWidth'] // 8
+        self.buffer_bytes = params['BufferDepth'] * self.strb_width
+        self.in_flight = params['NumAxInFlight']
+        self.meta_depth = params['BufferDepth'] + params['NumAxInFlight'] + \
+            params.get('MemSysDepth', 0)
+        self.raw_coupling = bool(params.get('RAWCouplingAvail', 0))
+
+        # per protocol index: cycles of the memory's cuts and its outstanding bursts
+        self.memory = {}
+        for side in ['src', 'dst']:
+            for idx in np.nonzero(self.legalizer.sides[side]['used'])[0].tolist():
+                if idx not in self.memory:
+                    cuts, credits = memory_limits(protocol_db(database, idx), params, tb_params)
+                    self.memory[idx] = (2 * cuts, credits)
+        # non-bursting writes bypass the R-AW coupler
+        self.aw_decoupled = self.legalizer.sides['dst']['decouple'] & \
+            (self.legalizer.sides['dst']['bursts'] == 2)
+
+    def _legalizer_times(self, jobs: dict, reads: dict, writes: dict, arrival) -> tuple:
+        """Returns the acceptance cycle of each job and the cycle each burst leaves the legalizer"""
+
+        num_jobs = len(jobs['length'])
+        num_reads = np.bincount(reads['job'], minlength=num_jobs)
+        num_writes = np.bincount(writes['job'], minlength=num_jobs)
+        steps = np.maximum(np.maximum(num_reads, num_writes), 1).tolist()
+        arrival = [0] * num_jobs if arrival is None else arrival
+
+        accept = []
+        free = 0
+        for job in range(num_jobs):
+            accept.append(max(arrival[job], free))
+            free = accept[-1] + self.latencies['legalizer'] + steps[job]
+        accept_np = np.array(accept, dtype=np.int64)
+
+        def emitted(bursts):
+            first = np.searchsorted(bursts['job'], bursts['job'], side='left')
+            return (accept_np[bursts['job']] + self.latencies['legalizer'] +
+                np.arange(len(bursts['job'])) - first).tolist()
+        return accept, emitted(reads), emitted(writes)
+
+    def run(self, jobs: dict, arrival: list = None) -> dict:
+        """Returns the acceptance and response cycle of each job, and the cycles of all
+
+        `arrival` holds the earliest cycle each job may be accepted, all are available at
+        cycle 0 if not given.
+        """
+
+        reads, writes = self.legalizer.split(jobs)
+        accept, r_emit, w_emit = self._legalizer_times(jobs, reads, writes, arrival)
+        strb = self.strb_width
+        lat = self.latencies
+
+        # position of each burst in the byte stream through the buffer
+        r_pos = (np.cumsum(reads['bytes']) - reads['bytes']).tolist()
+        w_pos = (np.cumsum(writes['bytes']) - writes['bytes']).tolist()
+        r_off = (reads['addr'] % strb).tolist()
+        w_off = (writes['addr'] % strb).tolist()
+        r_bytes = reads['bytes'].tolist()
+        w_bytes = writes['bytes'].tolist()
+        w_beats = writes['beats'].tolist()
+        r_prot = jobs['src_protocol'][reads['job']].tolist()
+        w_prot = jobs['dst_protocol'][writes['job']].tolist()
+        w_coupled = (self.raw_coupling & (jobs['decouple_aw'][writes['job']] == 0) &
+            ~self.aw_decoupled[jobs['dst_protocol'][writes['job']]]).tolist()
+
+        r_start = []
+        r_end = []
+        w_start = []
+        w_end = {}
+
+        def w_time_at(pos: int) -> int:
+            """The cycle after the W beat holding the byte at pos, by the start of its burst"""
+            if pos < 0 or not w_start:
+                return 0
+            k = min(bisect_right(w_pos, pos), len(w_start)) - 1
+            return w_start[k] + (w_off[k] + pos - w_pos[k]) // strb + 1
+
+        def r_time_at(pos: int) -> int:
+            """The cycle after the R beat holding the byte at pos, stalled on a full buffer"""
+            b = bisect_right(r_pos, pos) - 1
+            beat_end = pos + strb - 1 - (r_off[b] + pos - r_pos[b]) % strb
+            return max(r_start[b] + (r_off[b] + pos - r_pos[b]) // strb + 1,
+                       w_time_at(beat_end - self.buffer_bytes) + 1)
+
+        def write_end(k: int) -> int:
+            if k not in w_end:
+                w_end[k] = max(w_start[k] + w_beats[k],
+                    r_time_at(w_pos[k] + w_bytes[k] - 1) + lat['buffer'])
+            return w_end[k]
+
+        def b_time(k: int) -> int:
+            return write_end(k) + self.memory[w_prot[k]][0] + lat['write']
+
+        r_last = {}
+        w_last = {}
+        last_ar = last_aw = -1
+        kw = 0
+        for b in range(len(r_pos)):
+            cuts, credits = self.memory[r_prot[b]]
+            same = r_last.setdefault(r_prot[b], [])
+            ar = max(r_emit[b], last_ar + 1)
+            if b >= self.in_flight:
+                ar = max(ar, r_end[b - self.in_flight])
+            if len(same) >= credits:
+                ar = max(ar, r_end[same[-credits]])
+            same.append(b)
+            last_ar = ar
+            r_start.append(max(ar + cuts + lat['read'], r_end[-1] if b else 0))
+
+            # start the writes whose first beat is read by now
+            end_pos = r_pos[b] + r_bytes[b]
+            while kw < len(w_pos) and \
+                    w_pos[kw] + min(w_bytes[kw], strb - w_off[kw]) <= end_pos:
+                k = kw
+                first_data = r_time_at(w_pos[k] + min(w_bytes[k], strb - w_off[k]) - 1) + \
+                    lat['buffer']
+                _, credits = self.memory[w_prot[k]]
+                same = w_last.setdefault(w_prot[k], [])
+                aw = max(w_emit[k], last_aw + 1)
+                if k >= self.in_flight:
+                    aw = max(aw, write_end(k - self.in_flight))
+                if k >= self.meta_depth:
+                    aw = max(aw, b_time(k - self.meta_depth))
+                if len(same) >= credits:
+                    aw = max(aw, b_time(same[-credits]))
+                if w_coupled[k]:
+                    aw = max(aw, first_data)
+                same.append(k)
+                last_aw = aw
+                start = max(aw + 1, first_data, write_end(k - 1) if k else 0)
+                if k >= self.in_flight:
+                    start = max(start, b_time(k - self.in_flight))
+                w_start.append(start)
+                kw += 1
+            r_end.append(r_time_at(end_pos - 1))
+
+        # transfers respond in order once their last B returned
+        num_jobs = len(jobs['length'])
+        done = [0] * num_jobs
+        for k, job in enumerate(writes['job'].tolist()):
+            done[job] = max(done[job], b_time(k))
+        response = []
+        for job in range(num_jobs):
+            last = response[-1] + 1 if response else 0
+            response.append(max(last, done[job] + lat['response'],
+                accept[job] + lat['legalizer'] + lat['response']))
+
+        num_bytes = int(jobs['length'].sum())
+        cycles = max(response, default=0) + 1 - (accept[0] if accept else 0)
+        return {
+            'accept': accept,
+            'response': response,
+            'bytes': num_bytes,
+            'read_bursts': len(r_pos),
+            'write_bursts': len(w_pos),
+            'cycles': cycles,
+            'throughput': num_bytes / cycles,
+            'utilization': num_bytes / (cycles * strb)
+        }
+
+
+def traced_run(fn: str) -> tuple:
+    """Returns the parameters, jobs, acceptance and response cycles of a traced run"""
+
+    params = None
+    jobs = []
+    accept = []
+    response = []
+    period = None
+    prev = None
+    for ele in iter_trace(fn):
+        if params is None:
+            params = extract_parameter([ele])
+        now = ele['meta']['time']
+        if prev is not None and now > prev:
+            period = now - prev if period is None else min(period, now - prev)
+        prev = now
+        backend = ele['backend']
+        if backend['req_valid'] and backend['req_ready']:
+            jobs.append(request_job(backend))
+            accept.append(now)
+        if backend['rsp_valid'] and backend['rsp_ready']:
+            response.append(now)
+
+    # in cycles from the first request on
+    period = period or 1
+    start = accept[0] if accept else 0
+    return (params, jobs, [(t - start) // period for t in accept],
+            [(t - start) // period for t in response])
+
+
+def trace_error(model: BackendModel, runs: list) -> float:
+    """Returns the mean deviation in cycles of the predicted from the traced responses"""
+
+    total = 0
+    count = 0
+    for jobs, accept, response in runs:
+        predicted = model.run(jobs, accept)['response']
+        total += sum(abs(p - t) for p, t in zip(predicted, response))
+        count += min(len(predicted), len(response))
+    return total / count if count else 0.0
+
+
+def _descend(make_model, runs: list, latencies: dict) -> tuple:
+    """Sets each latency in turn to its best value until none improves"""
+
+    latencies = dict(latencies)
+    best = trace_error(make_model(latencies), runs)
+    improved = True
+    while improved:
+        improved = False
+        for name in LATENCIES:
+            for value in CALIBRATION_RANGE:
+                if value == latencies[name]:
+                    continue
+                error = trace_error(make_model(dict(latencies, **{name: value})), runs)
+                if error < best:
+                    best, latencies[name], improved = error, value, True
+    return latencies, best
+
+
+def calibrate(make_model, runs: list, latencies: dict) -> tuple:
+    """Fits the latencies to the traced runs, returns them and the remaining mean error
+
+    The error is not convex in the latencies, several of which trade against each other;
+    the descent starts from the given latencies and from CALIBRATION_STARTS.
+    """
+
+    starts = [latencies] + [dict.fromkeys(LATENCIES, value) for value in CALIBRATION_STARTS]
+    return min((_descend(make_model, runs, start) for start in starts),
+        key=lambda fit: fit[1])
+
+
+def cycle_error(model: BackendModel, runs: list) -> float:
+    """Returns the largest relative deviation of the predicted from the traced cycles of a run
+
+    The jobs are predicted as all available at cycle 0, as for a job file without a trace.
+    """
+
+    error = 0.0
+    for jobs, _, response in runs:
+        traced = response[-1] + 1 if response else 0
+        error = max(error, abs(model.run(jobs)['cycles'] - traced) / max(traced, 1))
+    return error
+
+
+def read_calibration(fn: str, variant: str) -> tuple:
+    """Returns the calibrated latencies and cycle error of a variant, None if not calibrated"""
+    with open(fn, 'r', encoding='utf8') as calibration_file:
+        entry = json.load(calibration_file).get(variant)
+    if entry is None:
+        return None, None
+    return dict(LATENCIES, **entry['latencies']), entry['cycle_error']
+
+
+def write_calibration(fn: str, variant: str, latencies: dict, error: float):
+    """Stores the calibrated latencies of a variant and their cycle error, keeping the others"""
+    calibration = {}
+    if os.path.isfile(fn):
+        with open(fn, 'r', encoding='utf8') as calibration_file:
+            calibration = json.load(calibration_file)
+    calibration[variant] = {'latencies': latencies, 'cycle_error': round(error, 4)}
+    with open(fn, 'w', encoding='utf8') as out:
+        json.dump(dict(sorted(calibration.items())), out, indent=4)
+        out.write('\n')
+
+
+def parse_params(overrides: list) -> dict:
+    """Returns the values of each overridden parameter, several separated by commas"""
+    res = {}
+    for override in overrides:
+        name, values = override.split('=', 1)
+        res[name] = [int(value, 0) for value in values.split(',')]
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='perf_model',
+        description='Cycle-approximate performance model of the backend'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True,
+        help='Protocol database files')
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', required=True,
+        help='Backend variant in jobs.json supplying the id and parameters')
+    parser.add_argument('--job', dest='job',
+        help='Name of the variant\'s job file in jobs.json')
+    parser.add_argument('--job-file', dest='job_file',
+        help='Path of a job file not listed in jobs.json')
+    parser.add_argument('--param', dest='param', nargs='*', default=[],
+        metavar='NAME=VALUE[,VALUE...]',
+        help='Override parameters or testbench parameters of the variant, '
+             'several values are explored in all combinations')
+    parser.add_argument('--latencies', dest='latencies',
+        help='JSON file of the latencies calibrated per variant')
+    parser.add_argument('--trace', dest='trace_files', nargs='*', default=[],
+        help='Traces of runs on the variant to compare the model to')
+    parser.add_argument('--calibrate', dest='calibrate',
+        help='Fit the latencies to the traces and store them in this JSON file')
+    args = parser.parse_args()
+
+    database = read_database(args.db)
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    if args.variant not in variants:
+        parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+    variant = variants[args.variant]
+    latencies = dict(LATENCIES)
+    if args.latencies:
+        calibrated = read_calibration(args.latencies, args.variant)[0]
+        if calibrated is None:
+            parser.error(f'{args.latencies} holds no latencies of {args.variant}')
+        latencies = calibrated
+
+    # all combinations of the given values; testbench parameters are prefixed with their
+    # protocol, e.g. AXI_MemLatency
+    overrides = parse_params(args.param)
+    configs = []
+    for values in itertools.product(*overrides.values()):
+        params = dict(variant['params'])
+        tb_params = dict(variant.get('tb_params', {}))
+        for name, value in zip(overrides, values):
+            (tb_params if '_' in name else params)[name] = value
+        configs.append((dict(zip(overrides, values)), params, tb_params))
+
+    def make_model(config: tuple, lat: dict) -> BackendModel:
+        return BackendModel(database, variant['proc_id'], config[1], config[2], lat)
+
+    if args.trace_files:
+        if len(configs) != 1:
+            parser.error('traces are compared to a single configuration')
+        runs = []
+        for fn in args.trace_files:
+            params, jobs, accept, response = traced_run(fn)
+            if params['data_width'] != configs[0][1]['DataWidth']:
+                print(f'{fn} has DataWidth {params["data_width"]}, the variant '
+                      f'{configs[0][1]["DataWidth"]}', file=sys.stderr)
+                return 1
+            runs.append((jobs_to_arrays(jobs), accept, response))
+
+        if args.calibrate:
+            latencies, error = calibrate(lambda lat: make_model(configs[0], lat), runs,
+                latencies)
+            cycles_error = cycle_error(make_model(configs[0], latencies), runs)
+            write_calibration(args.calibrate, args.variant, latencies, cycles_error)
+            print(f'Calibrated to a mean response error of {error:.1f} cycles and at most '
+                  f'{100 * cycles_error:.1f} % of the cycles of a run: {latencies}',
+                  file=sys.stderr)
+
+        model = make_model(configs[0], latencies)
+        rows = []
+        for fn, (jobs, accept, response) in zip(args.trace_files, runs):
+            res = model.run(jobs, accept)
+            traced = response[-1] + 1 if response else 0
+            error = sum(abs(p - t) for p, t in zip(res['response'], response))
+            rows.append([fn, len(response), traced, res['cycles'],
+                100 * (res['cycles'] - traced) / max(traced, 1),
+                error / max(len(response), 1)])
+        print(tabulate(rows, headers=['trace', 'transfers', 'traced cycles', 'model cycles',
+            'error %', 'mean response error'], floatfmt='.2f'))
+        return 0
+
+    # job file, relative to jobs.json if named
+    if args.job:
+        job_file = os.path.join(os.path.dirname(args.jobs), variant['jobs'][args.job])
+    elif args.job_file:
+        job_file = args.job_file
+    else:
+        parser.error('either --job, --job-file or --trace is required')
+    jobs = jobs_to_arrays(read_jobs(job_file))
+
+    rows = []
+    for config in configs:
+        start = time.perf_counter()
+        res = make_model(config, latencies).run(jobs)
+        elapsed = time.perf_counter() - start
+        rows.append([*config[0].values(), res['bytes'], res['read_bursts'],
+            res['write_bursts'], res['cycles'], res['throughput'], res['utilization'],
+            1e3 * elapsed])
+    print(tabulate(rows, headers=[*overrides, 'bytes', 'read bursts', 'write bursts', 'cycles',
+        'bytes/cycle', 'utilization', 'model ms'], floatfmt='.3f'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
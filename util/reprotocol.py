@@ -6,44 +6,161 @@
 # Authors:
 # - Thomas Benz <tbenz@iis.ee.ethz.ch>
 
-"""Allows to re-customize job files to use different protocols. For now, only support job files
-Without errors enabled"""
+"""Allows to re-customize job files to use different protocols.
+
+The source and destination protocol of every job are drawn from the given protocols, by name
+or index and weighted if given as `AXI=3`. Jobs may carry errors and, with `--num-dims`, the
+dimensions of the ND format. Only the protocol fields change, every other byte of the file is
+kept. Files are streamed, so their size does not matter, and may also be binary:
+
+    reprotocol.py --r_prots AXI=3 OBI=1 --w_prots 0 --infile in.txt --outfile out.txt
+
+Given directories, all job files below `--infile` are remapped in parallel into the same
+layout below `--outfile`. The ND files among them are told by the `NumDim` of the `jobs.json`
+variant referencing them:
+
+    reprotocol.py --r_prots OBI --w_prots AXI --infile jobs --outfile jobs_obi
+"""
+
 import argparse
+import json
+import multiprocessing
+import os
 import random
 import sys
 
-SUPP_PROTOCOLS = ['0', '1', '2', '3', '4', '5']
-
-# Parse Arguments
-parser = argparse.ArgumentParser(
-    prog='reprotocol',
-    description='Allows to re-customize job files to use different protocols'
-)
-parser.add_argument('--seed', dest='seed', default=1773)
-parser.add_argument('--r_prots', dest='rps', nargs='*', required=True, choices=SUPP_PROTOCOLS)
-parser.add_argument('--w_prots', dest='wps', nargs='*', required=True, choices=SUPP_PROTOCOLS)
-parser.add_argument('--infile', dest='infile', required=True)
-parser.add_argument('--outfile', dest='outfile', required=True)
-args = parser.parse_args()
-
-random.seed(args.seed)
-
-content = ''
-with open(args.infile) as f:
-    content = f.read().split('\n')[:-1]
-    f.close()
-
-if len(content) % 10 != 0:
-    print(len(content))
-    print('File error, only non-error files supported', file=sys.stderr)
-    sys.exit(-1)
-
-for i in range(0, len(content), 10):
-    content[i + 3] = args.rps[random.randrange(len(args.rps))]
-    content[i + 4] = args.wps[random.randrange(len(args.wps))]
-
-content = '\n'.join(content) + '\n'
-
-with open(args.outfile, 'w') as f:
-    content = f.write(content)
-    f.close()
+from gen_jobs import parse_weighted, protocol_index
+from job_file import JobFileError, is_binary, read_jobs, write_bin_jobs
+
+# non-empty lines of a job before its source and destination protocol
+PROTOCOL_FIELDS = {3: 'r', 4: 'w'}
+
+
+def _draw(rng: random.Random, values: list, weights: list) -> int:
+    # unweighted, the protocols are drawn as they always were for the same seed
+    if len(set(weights)) == 1:
+        return values[rng.randrange(len(values))]
+    return rng.choices(values, weights)[0]
+
+
+def reprotocol(infile: str, outfile: str, protocols: dict, rng: random.Random,
+               num_dims: int = 1) -> int:
+    """Rewrites the protocols of the jobs of a file, returns the number of jobs"""
+
+    if is_binary(infile):
+        def redrawn(jobs):
+            for job in jobs:
+                job.src_protocol = _draw(rng, *protocols['r'])
+                job.dst_protocol = _draw(rng, *protocols['w'])
+                yield job
+        with open(outfile, 'wb') as out:
+            return write_bin_jobs(out, redrawn(read_jobs(infile, num_dims)), num_dims)
+
+    num_jobs = 0
+    with open(infile, 'r', encoding='utf8', newline='') as raw, \
+            open(outfile, 'w', encoding='utf8', newline='') as out:
+        # the parser validates and finds the first line of each job, the lines are copied as is
+        lines = enumerate(raw, 1)
+        for job in read_jobs(infile, num_dims):
+            field = 0
+            for num, line in lines:
+                if num >= job.line and line.strip():
+                    if field in PROTOCOL_FIELDS:
+                        text = line.strip()
+                        pos = line.index(text)
+                        value = _draw(rng, *protocols[PROTOCOL_FIELDS[field]])
+                        line = f'{line[:pos]}{value}{line[pos + len(text):]}'
+                    field += 1
+                out.write(line)
+                if field > max(PROTOCOL_FIELDS):
+                    break
+            num_jobs += 1
+        for _, line in lines:
+            out.write(line)
+    return num_jobs
+
+
+def _job_dims(jobs_json: str) -> dict:
+    """Returns the NumDim of each job file a jobs.json references, relative to its directory"""
+    with open(jobs_json, 'r', encoding='utf8') as jobs_file:
+        variants = json.load(jobs_file)
+    res = {}
+    for variant in variants.values():
+        if not isinstance(variant, dict):
+            continue
+        for rel in variant.get('jobs', {}).values():
+            res[os.path.normpath(rel)] = variant.get('params', {}).get('NumDim', 1)
+    return res
+
+
+def _reprotocol_file(task: tuple) -> tuple:
+    rel, infile, outfile, protocols, seed, num_dims = task
+    os.makedirs(os.path.dirname(outfile) or '.', exist_ok=True)
+    try:
+        return rel, reprotocol(infile, outfile, protocols, random.Random(f'{seed}/{rel}'),
+                               num_dims), None
+    except JobFileError as err:
+        return rel, 0, str(err)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='reprotocol',
+        description='Allows to re-customize job files to use different protocols'
+    )
+    # a seed given on the command line seeds as a string, as it always did
+    parser.add_argument('--seed', dest='seed', default=1773)
+    parser.add_argument('--r_prots', dest='rps', nargs='+', required=True,
+        help='Source protocols by name or index, weighted as e.g. AXI=3')
+    parser.add_argument('--w_prots', dest='wps', nargs='+', required=True,
+        help='Destination protocols by name or index, weighted as e.g. AXI=3')
+    parser.add_argument('--infile', dest='infile', required=True,
+        help='Job file or directory of job files')
+    parser.add_argument('--outfile', dest='outfile', required=True,
+        help='Job file or directory to write')
+    parser.add_argument('--num-dims', dest='num_dims', type=int, default=1,
+        help='NumDim of the job files, unless a jobs.json in the directory tells')
+    parser.add_argument('--jobs', dest='jobs', type=int, default=os.cpu_count(),
+        help='Number of files remapped in parallel')
+    args = parser.parse_args()
+
+    try:
+        protocols = {'r': parse_weighted(','.join(args.rps), protocol_index),
+                     'w': parse_weighted(','.join(args.wps), protocol_index)}
+    except ValueError as err:
+        parser.error(str(err))
+
+    if not os.path.isdir(args.infile):
+        try:
+            num_jobs = reprotocol(args.infile, args.outfile, protocols, random.Random(args.seed),
+                                  args.num_dims)
+        except JobFileError as err:
+            print(err, file=sys.stderr)
+            return 1
+        print(f'Remapped {num_jobs} jobs to {args.outfile}', file=sys.stderr)
+        return 0
+
+    jobs_json = os.path.join(args.infile, 'jobs.json')
+    dims = _job_dims(jobs_json) if os.path.isfile(jobs_json) else {}
+    tasks = []
+    for root, _, files in os.walk(args.infile):
+        for name in sorted(files):
+            if name.endswith(('.txt', '.bin')):
+                rel = os.path.relpath(os.path.join(root, name), args.infile)
+                tasks.append((rel, os.path.join(args.infile, rel),
+                    os.path.join(args.outfile, rel), protocols, args.seed,
+                    dims.get(rel, args.num_dims)))
+
+    failed = 0
+    with multiprocessing.Pool(args.jobs) as pool:
+        for rel, num_jobs, err in pool.imap_unordered(_reprotocol_file, sorted(tasks)):
+            if err:
+                print(err, file=sys.stderr)
+                failed += 1
+            else:
+                print(f'Remapped {num_jobs} jobs of {rel}', file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
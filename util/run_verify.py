@@ -17,6 +17,15 @@ the workflow, and needed a drift checker to notice when they disagreed.
   run_verify.py --tb-tops               print the testbench tops bender knows of
   run_verify.py --prereqs mxneg         print the files that suite needs built
   run_verify.py --emit reg_variants     print a list the make recipes loop over
+  run_verify.py --perf rw_axi           run the performance suites of a variant
+  run_verify.py --perf rw_axi --calibrate jobs/perf_latencies.json
+                                        calibrate the model against their traces
+
+A performance suite passes when its run passes and perf_bound.py finds the
+traced write utilization at or above the expectation in the variant's `perf`
+map, which gen_perf_suites.py derives per regime from the performance model.
+Suites of a variant not yet calibrated have no expectation and are only run;
+with --calibrate, their traces fit the model's latencies instead.
 
 Testbench tops are asked of bender rather than listed by hand: it already owns
 the file set, so a testbench added to Bender.yml is elaborated without touching
@@ -24,6 +33,7 @@ this file, and one that is not in Bender.yml cannot hide behind a stale list.
 """
 
 import argparse
+import glob
 import json
 import os
 import re
@@ -33,6 +43,8 @@ import sys
 HERE = os.path.dirname(os.path.abspath(__file__))
 ROOT = os.path.dirname(HERE)
 DB = os.path.join(ROOT, 'jobs', 'jobs.json')
+PROTOCOL_DB = sorted(glob.glob(os.path.join(ROOT, 'src', 'db', '*.yml')))
+PERF_TOKEN = 'Launched all Transfers.'
 
 
 def load(path=None):
@@ -41,6 +53,11 @@ def load(path=None):
         jobs = json.load(handle)
     db = dict(jobs.pop('_verify', {}))
     db['suites'] = {}
+    # variants with performance suites, see gen_perf_suites.py
+    db['perf'] = {name: entry for name, entry in jobs.items()
+                  if any(job.startswith('perf_') for job in entry.get('jobs', {}))}
+    db['perf_variants'] = [{'variant': name, 'testbench': entry['testbench']}
+                           for name, entry in db['perf'].items()]
     for name, entry in jobs.items():
         if 'verify' not in entry:
             continue
@@ -157,6 +174,58 @@ def run_suite(name, db, args):
     return 1 if failures else 0
 
 
+def run_perf(name, db, args):
+    """Run every performance suite of a variant, and check or calibrate on its traces."""
+    variant = db['perf'][name]
+    vlt_dir = args.vlt_dir
+    run_dir = os.path.join(vlt_dir, 'perf')
+    top = variant['testbench']
+    params = dict(variant['params'], **variant.get('tb_params', {}))
+    suites = sorted(job for job in variant['jobs'] if job.startswith('perf_'))
+    expected = variant.get('perf', {})
+    failures = []
+    traces = []
+    binary = None
+    for suite in suites:
+        tag = '{}_{}'.format(name, suite)
+        job_file = os.path.join(os.path.dirname(os.path.abspath(args.db)),
+                                variant['jobs'][suite])
+        trace = os.path.join(run_dir, tag + '_trace.txt')
+        cmd = [sys.executable, os.path.join(HERE, 'run_vlt_sim.py'),
+               '--dir', run_dir, '--top', top, '--flist', os.path.join(vlt_dir, top + '.f'),
+               '--tag', tag, '--token', PERF_TOKEN,
+               '--plusarg', '+job_file=' + job_file, '--plusarg', '+trace_file=' + trace]
+        for key, value in params.items():
+            cmd += ['--param', '{}={}'.format(key, value)]
+        # the first suite builds the testbench, the others reuse its binary
+        if binary:
+            cmd += ['--binary', binary]
+        if args.verilator:
+            cmd += ['--verilator', args.verilator]
+        if args.makeflags:
+            cmd += ['--makeflags', args.makeflags]
+        if subprocess.call(cmd) != 0:
+            failures.append(suite)
+            continue
+        binary = binary or os.path.join(run_dir, 'obj_' + tag, 'simv')
+        traces.append(trace)
+        # perf_bound.py fails below the suite's expectation, and only reports without one
+        cmd = [sys.executable, os.path.join(HERE, 'perf_bound.py'),
+               '--db'] + args.protocol_db + ['--jobs', args.db, '--variant', name,
+               '--job', suite, '--trace', trace]
+        if subprocess.call(cmd) != 0 and not args.calibrate:
+            failures.append(suite)
+    if args.calibrate and not failures:
+        cmd = [sys.executable, os.path.join(HERE, 'perf_model.py'),
+               '--db'] + args.protocol_db + ['--jobs', args.db, '--variant', name,
+               '--trace'] + traces + ['--calibrate', args.calibrate]
+        if subprocess.call(cmd) != 0:
+            failures.append('calibration')
+    print('{}: ran {} performance suite(s), {} with an expectation, {} failed'.format(
+        name, len(suites), len([suite for suite in suites if suite in expected]), len(failures)))
+    return 1 if failures else 0
+
+
 def main():
     par = argparse.ArgumentParser(description=__doc__)
     par.add_argument('--db', default=DB)
@@ -164,8 +233,15 @@ def main():
     par.add_argument('--emit-matrix', choices=['suites'])
     par.add_argument('--list', action='store_true')
     par.add_argument('--emit', metavar='KEY',
-                     choices=['elab_shared_tops', 'multihead_ids', 'reg_variants', 'suites'],
+                     choices=['elab_shared_tops', 'multihead_ids', 'perf_variants',
+                              'reg_variants', 'suites'],
                      help='print a database list for a make recipe to loop over')
+    par.add_argument('--perf', metavar='VARIANT',
+                     help='run the performance suites of a variant against their expectations')
+    par.add_argument('--calibrate', metavar='JSON',
+                     help='with --perf, calibrate the performance model on the traces')
+    par.add_argument('--protocol-db', nargs='*', default=PROTOCOL_DB,
+                     help='protocol database files perf_bound.py reads')
     par.add_argument('--prereqs', metavar='SUITE',
                      help='files the suite needs built, so make needs no per-suite rule')
     par.add_argument('--tb-tops', action='store_true',
@@ -193,6 +269,9 @@ def main():
         if args.emit == 'reg_variants':
             for entry in entries:
                 print('{} {}'.format(entry['variant'], entry['module']))
+        elif args.emit == 'perf_variants':
+            for entry in entries:
+                print('{} {}'.format(entry['variant'], entry['testbench']))
         else:
             print(' '.join(str(e) for e in entries))
         return 0
@@ -226,7 +305,12 @@ def main():
             print('error: no suite named {}'.format(args.suite))
             return 1
         return run_suite(args.suite, db, args)
-    par.error('pass --suite, --emit-matrix or --list')
+    if args.perf:
+        if args.perf not in db['perf']:
+            print('error: {} has no performance suites'.format(args.perf), file=sys.stderr)
+            return 1
+        return run_perf(args.perf, db, args)
+    par.error('pass --suite, --perf, --emit-matrix or --list')
 
 
 if __name__ == '__main__':
@@ -20,6 +20,10 @@ was never printed. Every condition here is stated positively.
 A hang is a failure in its own right, including for a negative test: several
 testbenches in this repository hang rather than fail, so both stages run under a
 timeout and a timed-out leg can never be reported as a guard that fired.
+
+With --binary, the build is skipped and a simulation binary built before by
+another leg of the same top and parameters is run instead, e.g. to run many job
+files against one build.
 """
 
 import argparse
@@ -78,6 +82,8 @@ def parse_args():
     par.add_argument('--plusarg', action='append', default=[], metavar='+ARG')
     par.add_argument('--dpi', action='append', default=[], metavar='OBJ',
                      help='precompiled DPI object to link')
+    par.add_argument('--binary', default=None, metavar='SIMV',
+                     help='run this prebuilt simulation binary; skips the build')
     par.add_argument('--verilator', default=os.environ.get('VERILATOR', 'verilator'))
     par.add_argument('--makeflags', default=os.environ.get('IDMA_VLT_MAKEFLAGS', ''))
     par.add_argument('--define', action='append', default=[], metavar='NAME',
@@ -97,7 +103,7 @@ def main():
     workdir = os.path.abspath(args.dir)
     os.makedirs(workdir, exist_ok=True)
     objdir = os.path.join(workdir, 'obj_' + tag)
-    binary = os.path.join(objdir, 'simv')
+    binary = os.path.abspath(args.binary) if args.binary else os.path.join(objdir, 'simv')
     build_log = os.path.join(workdir, tag + '_build.log')
     run_log = os.path.join(workdir, tag + '_run.log')
 
@@ -117,16 +123,17 @@ def main():
         build += ['-LDFLAGS', ' '.join(os.path.abspath(d) for d in args.dpi)]
     build += args.vlt_arg
 
-    print('--- building {} [{}] ---'.format(args.top, tag), flush=True)
-    rc, secs, expired = run(build, build_log, workdir, args.build_timeout or None)
-    print('--- build {} rc={} ({:.1f} s) ---'.format(tag, rc, secs), flush=True)
-    if expired:
-        print('FAIL {}: build exceeded {} s (see {})'.format(
-            tag, args.build_timeout, build_log))
-        return 1
-    if rc != 0:
-        print('FAIL {}: verilator build failed (see {})'.format(tag, build_log))
-        return 1
+    if not args.binary:
+        print('--- building {} [{}] ---'.format(args.top, tag), flush=True)
+        rc, secs, expired = run(build, build_log, workdir, args.build_timeout or None)
+        print('--- build {} rc={} ({:.1f} s) ---'.format(tag, rc, secs), flush=True)
+        if expired:
+            print('FAIL {}: build exceeded {} s (see {})'.format(
+                tag, args.build_timeout, build_log))
+            return 1
+        if rc != 0:
+            print('FAIL {}: verilator build failed (see {})'.format(tag, build_log))
+            return 1
     if not os.path.isfile(binary):
         print('FAIL {}: no simulation binary at {}'.format(tag, binary))
         return 1
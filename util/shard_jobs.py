@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Runs the job files of a `jobs.json` variant as shards in parallel and merges their results.
+
+Each job file is split into `--shards` shards whose address ranges do not overlap on the
+same protocol, except for ranges only read: jobs writing a range another job reads or
+writes, through their ND repetitions included, stay together in their original order, so
+every overlap the testbench serializes in the full file still occurs in one shard. The
+groups of overlapping jobs are balanced over the shards by their beats.
+
+The testbench of the variant is built once by `run_vlt_sim.py` with the variant's
+parameters, and all shards of all job files run against that binary, `--parallel` at a
+time. Per job file, the results are merged into one report: the shards passing, the
+simulation wall time and, given `--db`, the metrics `trace_idma.py --summary` takes from the
+shards' traces, merged into one summary that `trace_idma.py --compare` accepts:
+
+    shard_jobs.py --variant rw_axi --job huge large mixed --shards 16 --dir scratch
+    shard_jobs.py --variant rw_axi --job huge --shards 16 --dir scratch --db src/db/*.yml
+    shard_jobs.py --variant rw_axi --job huge --shards 16 --dir scratch --split-only
+
+The shards run against memories of their own; cycles add up as if they ran back to back.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tabulate import tabulate
+from job_file import Job, JobFileError, extent, read_jobs, side_pitches, write_job_file
+from job_stats import nd_transfers
+from perf_bound import beats
+from trace_idma import merge_summaries
+
+UTIL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# cycles the testbench spends per 1D transfer besides its beats, to balance the shards
+TRANSFER_OVERHEAD = 8
+
+
+def footprints(job: Job) -> list:
+    """Returns the protocol, the first and last byte and whether it is written of the ranges
+    a job reads and writes"""
+
+    res = []
+    reps = [dim.reps for dim in job.dims]
+    for protocol, addr, side in [(job.src_protocol, job.src_addr, 'src'),
+                                 (job.dst_protocol, job.dst_addr, 'dst')]:
+        # strides are jumps from the last transfer of the inner dimensions, spans may be negative
+        first, last = extent(addr, max(job.length, 1), side_pitches(job.dims, side), reps)
+        res.append((protocol, first, last, side == 'dst'))
+    return res
+
+
+def overlap_groups(jobs: list) -> list:
+    """Returns the indices of the jobs in groups whose written ranges transitively overlap
+    ranges of another job; ranges only read may overlap across groups"""
+
+    parent = list(range(len(jobs)))
+
+    def find(idx):
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    # sweep the ranges of each protocol in address order
+    ranges = sorted((protocol, first, last, written, idx) for idx, job in enumerate(jobs)
+                    for protocol, first, last, written in footprints(job))
+    current = None
+    for protocol, first, last, written, idx in ranges:
+        if current != protocol:
+            current, active, written_end = protocol, [], None
+        # the ranges still reaching this one, and the written range reaching the farthest
+        while active and active[0][0] < first:
+            heapq.heappop(active)
+        if written_end and first <= written_end[0]:
+            parent[find(idx)] = find(written_end[1])
+        if written:
+            # a written range joins all ranges it overlaps, from then on they reach as one
+            for _, other in active:
+                parent[find(other)] = find(idx)
+            active = [max(active, default=(last, idx))]
+            if not written_end or last > written_end[0]:
+                written_end = (last, idx)
+        heapq.heappush(active, (last, idx))
+
+    groups = {}
+    for idx in range(len(jobs)):
+        groups.setdefault(find(idx), []).append(idx)
+    return list(groups.values())
+
+
+def job_weight(job: Job, strb_width: int) -> int:
+    """Returns the cycles a job roughly takes, to balance the shards"""
+    side_beats = max(beats(job.src_addr, job.length, strb_width),
+                     beats(job.dst_addr, job.length, strb_width))
+    return max(nd_transfers(job), 1) * (side_beats + TRANSFER_OVERHEAD)
+
+
+def shard(jobs: list, num_shards: int, strb_width: int) -> list:
+    """Returns the job indices of each shard, in their original order"""
+
+    groups = [(sum(job_weight(jobs[idx], strb_width) for idx in group), group)
+              for group in overlap_groups(jobs)]
+    groups.sort(key=lambda group: (-group[0], group[1][0]))
+    loads = [(0, idx) for idx in range(min(num_shards, len(groups)))]
+    shards = [[] for _ in loads]
+    for weight, group in groups:
+        load, idx = heapq.heappop(loads)
+        shards[idx] += group
+        heapq.heappush(loads, (load + weight, idx))
+    return [sorted(indices) for indices in shards]
+
+
+def run_shard(task: dict) -> dict:
+    """Runs one shard with run_vlt_sim.py, and summarizes its trace if asked"""
+
+    args = task['args']
+    cmd = [sys.executable, os.path.join(UTIL_DIR, 'run_vlt_sim.py'), '--dir', task['dir'],
+           '--top', task['top'], '--flist', task['flist'], '--tag', task['tag'],
+           '--token', args.token, '--timeout', str(args.timeout),
+           f'--plusarg=+job_file={task["job_file"]}']
+    if args.db:
+        cmd.append(f'--plusarg=+trace_file={task["trace"]}')
+    if task['build']:
+        cmd += [f'--param={name}={value}' for name, value in task['params'].items()]
+    else:
+        cmd += ['--binary', task['binary']]
+    if args.verilator:
+        cmd += ['--verilator', args.verilator]
+    if args.makeflags:
+        cmd += ['--makeflags', args.makeflags]
+
+    start = time.monotonic()
+    with open(os.path.join(task['dir'], f'{task["tag"]}.log'), 'w', encoding='utf8') as log:
+        passed = subprocess.call(cmd, stdout=log, stderr=subprocess.STDOUT) == 0
+    res = dict(task, passed=passed, secs=time.monotonic() - start, summary=None)
+
+    if args.db and passed and os.path.isfile(task['trace']):
+        summary = os.path.join(task['dir'], f'{task["tag"]}_summary.json')
+        if subprocess.call([sys.executable, os.path.join(UTIL_DIR, 'trace_idma.py'),
+                            '--db', *args.db, '--trace', task['trace'],
+                            '--summary', summary]) == 0:
+            with open(summary, 'r', encoding='utf8') as summary_file:
+                res['summary'] = json.load(summary_file)
+        if not args.keep_traces:
+            os.remove(task['trace'])
+    return res
+
+
+def format_report(name: str, results: list) -> str:
+    """Returns the results of the shards of one job file and their merged result"""
+
+    rows = []
+    for res in results:
+        metrics = res['summary']['metrics'] if res['summary'] else {}
+        rows.append([res['tag'], res['jobs'], res['bytes'],
+                     'PASS' if res['passed'] else 'FAIL', res['secs'], metrics.get('cycles'),
+                     metrics.get('write_utilization')])
+    summaries = [res['summary'] for res in results if res['summary']]
+    merged = merge_summaries(summaries)['metrics'] if summaries else {}
+    passed = sum(res['passed'] for res in results)
+    rows.append([f'{name} ({passed}/{len(results)} passed)',
+                 sum(res['jobs'] for res in results), sum(res['bytes'] for res in results),
+                 'PASS' if passed == len(results) else 'FAIL',
+                 max(res['secs'] for res in results), merged.get('cycles'),
+                 merged.get('write_utilization')])
+    return tabulate(rows, headers=['shard', 'jobs', 'bytes', 'result', 'wall s', 'cycles',
+        'write utilization'], floatfmt='.2f', missingval='-')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='shard_jobs',
+        description='Runs job files as shards in parallel and merges their results'
+    )
+    parser.add_argument('--jobs', dest='jobs', default='jobs/jobs.json',
+        help='The jobs.json holding the variant')
+    parser.add_argument('--variant', dest='variant', required=True,
+        help='Backend variant in jobs.json supplying the testbench and parameters')
+    parser.add_argument('--job', dest='job', nargs='+', required=True,
+        help='Names of the variant\'s job files in jobs.json')
+    parser.add_argument('--shards', dest='shards', type=int, default=os.cpu_count(),
+        help='Number of shards per job file')
+    parser.add_argument('--parallel', dest='parallel', type=int, default=os.cpu_count(),
+        help='Number of shards simulated at a time')
+    parser.add_argument('--dir', dest='dir', required=True,
+        help='Scratch directory of the shards, the build and the runs')
+    parser.add_argument('--split-only', dest='split_only', action='store_true',
+        help='Only write the shards, do not simulate them')
+    parser.add_argument('--db', dest='db', nargs='*', default=[],
+        help='Protocol database files, to trace the shards and merge their metrics')
+    parser.add_argument('--keep-traces', dest='keep_traces', action='store_true',
+        help='Keep the traces of the shards once summarized')
+    parser.add_argument('--vlt-dir', dest='vlt_dir', default='target/sim/verilator',
+        help='Directory holding the Verilator file list of the testbench')
+    parser.add_argument('--token', dest='token', default='Launched all Transfers.',
+        help='String the log of a passing shard must contain')
+    parser.add_argument('--timeout', dest='timeout', type=int, default=900,
+        help='Wall-clock budget of each shard in seconds')
+    parser.add_argument('--verilator', dest='verilator', default=os.environ.get('VERILATOR'))
+    parser.add_argument('--makeflags', dest='makeflags',
+        default=os.environ.get('IDMA_VLT_MAKEFLAGS'))
+    args = parser.parse_args()
+
+    with open(args.jobs, 'r', encoding='utf8') as jobs_json:
+        variants = json.load(jobs_json)
+    variants.pop('_verify', None)
+    if args.variant not in variants:
+        parser.error(f'unknown variant {args.variant}, one of {", ".join(variants)}')
+    variant = variants[args.variant]
+    params = dict(variant['params'], **variant.get('tb_params', {}))
+    num_dims = params.get('NumDim', 1)
+    workdir = os.path.abspath(args.dir)
+    top = variant['testbench']
+
+    # split every job file
+    tasks = {}
+    for name in args.job:
+        if name not in variant['jobs']:
+            parser.error(f'{args.variant} has no job {name}, only {", ".join(variant["jobs"])}')
+        path = os.path.join(os.path.dirname(args.jobs), variant['jobs'][name])
+        try:
+            jobs = list(read_jobs(path, num_dims))
+        except JobFileError as err:
+            print(err, file=sys.stderr)
+            return 1
+        os.makedirs(os.path.join(workdir, name), exist_ok=True)
+        ext = os.path.splitext(path)[1]
+        tasks[name] = []
+        for idx, indices in enumerate(shard(jobs, args.shards, params['DataWidth'] // 8)):
+            tag = f'{name}_shard{idx}'
+            job_file = os.path.join(workdir, name, f'{tag}{ext}')
+            write_job_file(job_file, [jobs[i] for i in indices], num_dims)
+            tasks[name].append({
+                'args': args, 'top': top, 'params': params, 'build': False,
+                'flist': os.path.abspath(os.path.join(args.vlt_dir, f'{top}.f')),
+                'dir': os.path.join(workdir, name), 'tag': tag, 'job_file': job_file,
+                'trace': os.path.join(workdir, name, f'{tag}_trace.txt'),
+                'jobs': len(indices), 'bytes': sum(jobs[i].length * nd_transfers(jobs[i])
+                                                   for i in indices)
+            })
+        print(f'Split {len(jobs)} jobs of {name} into {len(tasks[name])} shards', file=sys.stderr)
+    if args.split_only:
+        return 0
+
+    # the first shard builds the testbench, the others reuse its binary
+    first = tasks[args.job[0]][0]
+    first['build'] = True
+    print(f'Building {top} running {first["tag"]}', file=sys.stderr)
+    results = {first['tag']: run_shard(first)}
+    binary = os.path.join(first['dir'], f'obj_{first["tag"]}', 'simv')
+    if not os.path.isfile(binary):
+        print(f'Building {top} failed, see {os.path.join(first["dir"], first["tag"])}.log',
+              file=sys.stderr)
+        return 1
+    pending = [dict(task, binary=binary) for name in args.job for task in tasks[name]
+               if task is not first]
+    with ThreadPoolExecutor(args.parallel) as pool:
+        for res in pool.map(run_shard, pending):
+            results[res['tag']] = res
+            print(f'{res["tag"]}: {"PASS" if res["passed"] else "FAIL"} ({res["secs"]:.1f} s)',
+                  file=sys.stderr)
+
+    # one report and merged summary per job file
+    failed = 0
+    for name in args.job:
+        shard_results = [results[task['tag']] for task in tasks[name]]
+        print(format_report(name, shard_results))
+        print()
+        failed += not all(res['passed'] for res in shard_results)
+        summaries = [res['summary'] for res in shard_results if res['summary']]
+        if summaries and len(summaries) == len(shard_results):
+            with open(os.path.join(workdir, f'{name}_summary.json'), 'w',
+                      encoding='utf8') as summary:
+                json.dump(merge_summaries(summaries), summary, indent=4)
+                summary.write('\n')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Export of iDMA traces as Chrome/Perfetto trace-event JSON.
+
+The output opens in ui.perfetto.dev or chrome://tracing and holds, per backend:
+
+  - a `transfers` track with one slice per 1D transfer, from the accepted
+    request to the accepted response,
+  - one counter per port, or head of a multi-head port, with the bytes moved each cycle,
+  - one track per busy flag with a slice for every interval it is set.
+
+Events are written while the trace is read; only the open slices are kept.
+Counters are only emitted when their value changes. The tracer skips idle
+cycles, so a gap between two traced cycles longer than the clock period, taken
+as the smallest step seen, closes all busy intervals and zeroes all counters. The
+first cycles are held back until they give the period, so a gap among them is found.
+"""
+
+import json
+
+# trace-event timestamps are in microseconds
+TIME_UNITS = {
+    'ps': 1e-6,
+    'ns': 1e-3,
+    'us': 1.0,
+}
+
+BUSY_FLAGS = ['buffer', 'r_dp', 'w_dp', 'r_leg', 'w_leg', 'eh_fsm', 'eh_cnt', 'raw_coupler']
+
+# traced cycles held back to take the clock period from before events are written
+WARMUP_CYCLES = 16
+
+# thread ids of the tracks
+TID_TRANSFERS = 1
+TID_BUSY = 10
+
+
+def _decode(value: int) -> str:
+    """Decodes a string the tracer printed as a hex number"""
+    return bytes.fromhex(f'{value:x}').decode('ascii', errors='replace') if value else ''
+
+
+class TraceEventWriter:
+    """Streams the cycles of one backend's trace into a trace-event JSON file"""
+
+    def __init__(self, fn: str, params: dict, be_info: dict, time_unit: str = 'ns',
+                 pid: int = 1):
+        self.fh = open(fn, 'w', encoding='utf8')
+        self.params = params
+        self.be_info = be_info
+        self.scale = TIME_UNITS[time_unit]
+        self.pid = pid
+        self.num_events = 0
+        self._first = True
+        self._pending = []
+        self._busy_since = {flag: None for flag in BUSY_FLAGS}
+        self._counters = {}
+        self._time = None
+        self._period = None
+        self._warmup = []
+
+        self.fh.write('{"displayTimeUnit": "ns", "traceEvents": [\n')
+        name = _decode(params.get('inst', 0)) or 'idma_backend'
+        self._emit({'ph': 'M', 'name': 'process_name', 'pid': pid,
+                    'args': {'name': f'{name} ({be_info["id"]})'}})
+        self._emit({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': TID_TRANSFERS,
+                    'args': {'name': 'transfers'}})
+        for idx, flag in enumerate(BUSY_FLAGS):
+            self._emit({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': TID_BUSY + idx,
+                        'args': {'name': f'busy.{flag}'}})
+
+    def _emit(self, event: dict):
+        if not self._first:
+            self.fh.write(',\n')
+        self.fh.write(json.dumps(event, separators=(',', ':')))
+        self._first = False
+        self.num_events += 1
+
+    def _ts(self, time: int) -> float:
+        return time * self.scale
+
+    def _slice(self, name: str, tid: int, start: int, end: int, args: dict = None):
+        event = {'ph': 'X', 'name': name, 'pid': self.pid, 'tid': tid,
+                 'ts': self._ts(start), 'dur': self._ts(end - start)}
+        if args:
+            event['args'] = args
+        self._emit(event)
+
+    def _counter(self, name: str, time: int, value: int):
+        if self._counters.get(name) == value:
+            return
+        self._counters[name] = value
+        self._emit({'ph': 'C', 'name': name, 'pid': self.pid, 'ts': self._ts(time),
+                    'args': {'bytes': value}})
+
+    def update(self, ele: dict):
+        if self._warmup is None:
+            self._write(ele)
+            return
+        self._warmup.append(ele)
+        if len(self._warmup) == WARMUP_CYCLES:
+            self._flush_warmup()
+
+    def _flush_warmup(self):
+        """Takes the clock period from the held back cycles and writes them"""
+
+        times = [ele['meta']['time'] for ele in self._warmup]
+        steps = [later - earlier for earlier, later in zip(times, times[1:]) if later > earlier]
+        self._period = min(steps, default=None)
+        warmup, self._warmup = self._warmup, None
+        for ele in warmup:
+            self._write(ele)
+
+    def _write(self, ele: dict):
+        time = ele['meta']['time']
+        backend = ele['backend']
+        bus = ele['bus']
+
+        # the backend was idle since the previous traced cycle
+        if self._time is not None and time > self._time:
+            step = time - self._time
+            self._period = step if self._period is None else min(self._period, step)
+            if step > self._period:
+                self._idle(self._time + self._period)
+        self._time = time
+
+        # transfers complete in order: a response closes the oldest request
+        if backend['rsp_valid'] and backend['rsp_ready'] and self._pending:
+            start, length = self._pending.pop(0)
+            self._slice('transfer', TID_TRANSFERS, start, time, {'length': length})
+        if backend['req_valid'] and backend['req_ready']:
+            self._pending.append((time, backend['req_length']))
+
+        # bytes per port and cycle
+        for port in self.be_info['read_ports']:
+            beat = bus[f'{port}_rsp_valid'] and bus[f'{port}_rsp_ready']
+            self._counter(port, time, self.params['data_width'] // 8 if beat else 0)
+        for port in self.be_info['write_ports']:
+            beat = bus[f'{port}_req_valid'] and bus[f'{port}_req_ready']
+            strobe = bus[f'{port}_req_strobe']
+            self._counter(port, time, bin(strobe).count('1') if beat else 0)
+
+        # busy intervals
+        for idx, flag in enumerate(BUSY_FLAGS):
+            since = self._busy_since[flag]
+            if ele['busy'][flag] and since is None:
+                self._busy_since[flag] = time
+            elif not ele['busy'][flag] and since is not None:
+                self._slice(flag, TID_BUSY + idx, since, time)
+                self._busy_since[flag] = None
+
+    def _idle(self, time: int):
+        """Closes all busy intervals and zeroes all counters at the given time"""
+
+        for idx, flag in enumerate(BUSY_FLAGS):
+            if self._busy_since[flag] is not None:
+                self._slice(flag, TID_BUSY + idx, self._busy_since[flag], time)
+                self._busy_since[flag] = None
+        for name in self._counters:
+            self._counter(name, time, 0)
+
+    def close(self):
+        """Closes the intervals still open at the end of the trace and the file"""
+
+        if self._warmup is not None:
+            self._flush_warmup()
+        if self._time is not None:
+            self._idle(self._time + (self._period or 0))
+        for start, length in self._pending:
+            self._slice('transfer (incomplete)', TID_TRANSFERS, start, self._time or start,
+                        {'length': length})
+        self.fh.write('\n]}\n')
+        self.fh.close()
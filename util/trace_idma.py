@@ -6,13 +6,82 @@
 # Authors:
 # - Thomas Benz <tbenz@iis.ee.ethz.ch>
 
-"""Functions used to parse and evaluate iDMA trace files."""
+"""Functions used to parse and evaluate iDMA trace files.
+
+All reports are accumulated in a single pass over the trace, one cycle at a
+time, so a trace is never held in memory. With `--live`, the trace is a named
+pipe the tracer writes into while the simulation runs:
+
+    trace_idma.py --db ... --trace trace.fifo --live --report utilization windows stalls &
+    <simulation> +trace_file=trace.fifo
+
+The pipe is created if it does not exist. Progress is printed periodically to
+stderr, the reports once the simulation exits and closes the pipe.
+"""
 import argparse
 import ast
+import heapq
+import json
+import os
+import re
+import stat
 import sys
-from pprint import pprint as pp
+from itertools import chain
+from pprint import pformat
+from tabulate import tabulate
 from mario.database import read_database
 from mario.util import prepare_ids
+from trace_events import TIME_UNITS, TraceEventWriter
+from trace_store import CODECS, DEFAULT_BLOCK_LINES, iter_lines, write_store
+
+# causes a cycle is attributed to, in order of precedence; see get_stall_attribution
+STALL_CAUSES = ['transfer', 'error_handler', 'write_stall', 'raw_coupling', 'read_stall',
+    'legalizer', 'idle']
+
+REPORTS = ['utilization', 'windows', 'stalls', 'strobes', 'buffer', 'latency', 'heads',
+    'compute']
+
+LATENCY_PERCENTILES = [50, 90, 99, 100]
+
+# metrics a summary holds, and whether a higher value is better; stall shares are added per cause
+SUMMARY_METRICS = {
+    'cycles': False,
+    'read_utilization': True,
+    'write_utilization': True,
+    'window_write_min': True,
+    'window_write_mean': True,
+    **{f'latency_p{p}': False for p in LATENCY_PERCENTILES},
+    **{f'stall_{c}': False for c in STALL_CAUSES if c != 'transfer'},
+}
+
+# exit code of a comparison of runs that are not comparable
+EXIT_MISMATCH = 2
+
+# smallest legal BufferDepth, and the one handling misaligned transfers efficiently
+MIN_BUFFER_DEPTH = 2
+
+# classes of transfers by the offsets of their source and destination within a beat
+ALIGNMENT_CLASSES = ['aligned', 'same offset', 'src unaligned', 'dst unaligned',
+    'different offsets']
+
+# idma_pkg::compute_op_e, and the bytes read per byte written by each op
+COMPUTE_OPS = ['none', 'transpose', 'mxquant', 'mxquant_fp16', 'mxdequant', 'mxdequant_fp16']
+COMPUTE_RATIO = {
+    'mxquant': 128 / 33,
+    'mxquant_fp16': 64 / 33,
+    'mxdequant': 33 / 128,
+    'mxdequant_fp16': 33 / 64,
+}
+
+# fields of idma_pkg::compute_tuning_t, most significant first
+COMPUTE_TUNING_FIELDS = ['transpose_full_duplex']
+
+# what the compute stage does in a cycle it is active in, see ComputeThroughput
+COMPUTE_STATES = ['consume', 'backpressure', 'starved', 'engine']
+
+# sections of a trace line and their fields, all values are printed as hex
+SECTION_RE = re.compile(r"'(\w+)':\{([^}]*)\}")
+FIELD_RE = re.compile(r"'(\w+)': 0x([0-9a-fA-F]+),")
 
 
 def strb_to_bytes(strobe: int) -> int:
@@ -27,18 +96,32 @@ def strb_to_bytes(strobe: int) -> int:
     return res
 
 
-def read_trace(fn: str) -> list:
-    """Reads a trace file and returns it as a list of dict objects"""
+def parse_line(line: str) -> dict:
+    """Parses one trace line into a dict of sections"""
+
+    res = {}
+    for section, body in SECTION_RE.findall(line):
+        fields = FIELD_RE.findall(body)
+        # a value that is not plain hex (e.g. x or z): let the full parser report it
+        if len(fields) != body.count(','):
+            return ast.literal_eval(line)
+        res[section] = {key: int(val, 16) for key, val in fields}
+
+    return res if res else ast.literal_eval(line)
+
+
+def iter_trace(fn: str, time_window: tuple = None, cycle_window: tuple = None):
+    """Yields the cycles of a trace file or container as dict objects"""
+
+    # only decompressing the blocks of the window
+    for line in iter_lines(fn, time_window, cycle_window):
+        yield parse_line(line)
+
 
-    # resulting list of trace events
-    trace = []
-    # read and parse file
-    with open(fn, 'r', encoding='utf8') as tf:
-        for line in tf:
-            trace_dict = ast.literal_eval(line)
-            trace.append(trace_dict)
+def read_trace(fn: str, time_window: tuple = None, cycle_window: tuple = None) -> list:
+    """Reads a trace file or container and returns it as a list of dict objects"""
 
-    return trace
+    return list(iter_trace(fn, time_window, cycle_window))
 
 
 def extract_parameter(trace: list) -> dict:
@@ -51,29 +134,927 @@ def extract_parameter(trace: list) -> dict:
         sys.exit(0)
 
 
+def decode_string(value: int) -> str:
+    """Decodes a string the tracer printed as a hex number"""
+    return bytes.fromhex(f'{value:x}').decode('ASCII') if value else ''
+
+
+def get_be_info(params: dict, database: dict) -> dict:
+    """Fetches the protocols and trace signals of the backend the trace resulted from"""
+
+    # fetch and parse identifier
+    id = decode_string(params['identifier'])
+    prot_info = prepare_ids([id])[id]
+    read_prots = prot_info['ar']
+    write_prots = prot_info['aw']
+    read_sigs = [database[r]['trace_signals']['read'] for r in read_prots]
+    write_sigs = [database[w]['trace_signals']['write'] for w in write_prots]
+
+    # the trace keys of each port, one port per head of a multi-head protocol
+    def ports(prots: list, dir: str, name: str) -> list:
+        res = []
+        for prot in prots:
+            num_heads = prot_info['multihead'][dir][prot]
+            res += [f'{prot}_{name}'] if num_heads == 1 else \
+                [f'{prot}_{name}_h{head}' for head in range(num_heads)]
+        return res
+
+    # pack data
+    return {
+        'id': id,
+        'read_prots': read_prots,
+        'write_prots': write_prots,
+        'read_ports': ports(read_prots, 'r', 'read'),
+        'write_ports': ports(write_prots, 'w', 'write'),
+        'read_sigs': read_sigs,
+        'write_sigs': write_sigs
+    }
+
+
+def cycle_bytes(ele: dict, params: dict, be_info: dict) -> tuple:
+    """Returns the bytes read and written in one trace cycle"""
+
+    read_data = 0
+    write_data = 0
+
+    # add read contribution
+    for read_port in be_info['read_ports']:
+        if ele['bus'][f'{read_port}_rsp_ready'] and ele['bus'][f'{read_port}_rsp_valid']:
+            read_data += params['data_width'] // 8
+
+    # add write contribution
+    for write_port in be_info['write_ports']:
+        if ele['bus'][f'{write_port}_req_ready'] and ele['bus'][f'{write_port}_req_valid']:
+            write_data += strb_to_bytes(ele['bus'][f'{write_port}_req_strobe'])
+
+    return read_data, write_data
+
+
+class Utilization:
+    """Accumulates the global utilization [read, write] of the DMA"""
+
+    def __init__(self, params: dict, be_info: dict):
+        self.params = params
+        self.be_info = be_info
+        self.cycles = 0
+        self.read_data = 0  # in bytes
+        self.write_data = 0  # in bytes
+
+    def update(self, ele: dict):
+        read_data, write_data = cycle_bytes(ele, self.params, self.be_info)
+        self.cycles += 1
+        self.read_data += read_data
+        self.write_data += write_data
+
+    def result(self) -> list:
+        # calculate maximum possible amount of data
+        max_data = max(1, self.cycles * self.params['data_width'] // 8)
+        return [self.read_data / max_data, self.write_data / max_data]
+
+    def format(self) -> str:
+        return pformat(self.result())
+
+
+class WindowedThroughput:
+    """Accumulates the utilization [read, write] in windows of a fixed number of traced cycles"""
+
+    def __init__(self, params: dict, be_info: dict, window: int):
+        self.params = params
+        self.be_info = be_info
+        self.window = window
+        self.windows = []
+        self._current = None
+
+    def update(self, ele: dict):
+        if self._current is None:
+            self._current = Utilization(self.params, self.be_info)
+            self._t_first = ele['meta']['time']
+        self._current.update(ele)
+        self._t_last = ele['meta']['time']
+        if self._current.cycles == self.window:
+            self._close()
+
+    def _close(self):
+        self.windows.append([self._t_first, self._t_last, *self._current.result()])
+        self._current = None
+
+    def result(self) -> list:
+        # a trailing partial window is reported as is
+        if self._current is not None:
+            self._close()
+        return self.windows
+
+    def format(self) -> str:
+        windows = self.result()
+        rows = [['min', None, *[min(w[c] for w in windows) for c in (2, 3)]],
+            ['mean', None, *[sum(w[c] for w in windows) / len(windows) for c in (2, 3)]],
+            ['max', None, *[max(w[c] for w in windows) for c in (2, 3)]]] if windows else []
+        return tabulate(windows + rows, headers=['start', 'end', 'read', 'write'],
+            floatfmt='.3f', missingval='-')
+
+
 def get_global_utilization(trace: list, params: dict, be_info: dict) -> list:
     """Calculates the global utilization [read, write] of the DMA"""
 
-    read_data = 0  # in bytes
-    write_data = 0  # in bytes
+    utilization = Utilization(params, be_info)
+    for ele in trace:
+        utilization.update(ele)
+
+    return utilization.result()
+
+
+def _handshake(bus: dict, port: str) -> bool:
+    """Returns true if a port's valid and ready are both set"""
+    return bus[f'{port}_valid'] and bus[f'{port}_ready']
+
+
+def _stalled(bus: dict, port: str) -> bool:
+    """Returns true if a port presents valid without being accepted"""
+    return bus[f'{port}_valid'] and not bus[f'{port}_ready']
+
+
+def classify_cycle(ele: dict, be_info: dict) -> str:
+    """Attributes one trace cycle to the most likely cause that no data moved"""
+
+    bus = ele['bus']
+    busy = ele['busy']
+    read_ports = [f'{r}_rsp' for r in be_info['read_ports']]
+    write_ports = [f'{w}_req' for w in be_info['write_ports']]
+
+    # a beat on any port: the cycle did useful work
+    if any(_handshake(bus, p) for p in read_ports + write_ports):
+        return 'transfer'
+    # the error handler holds the datapath while it waits for a decision
+    if busy['eh_fsm']:
+        return 'error_handler'
+    # the destination refuses data, or read data waits since the buffer cannot drain
+    if any(_stalled(bus, p) for p in write_ports + read_ports):
+        return 'write_stall'
+    # an AW is held back until its W data is available
+    if busy['raw_coupler']:
+        return 'raw_coupling'
+    # the read datapath waits for the source to deliver data
+    if busy['r_dp']:
+        return 'read_stall'
+    # data is buffered or write responses are outstanding
+    if busy['w_dp'] or busy['buffer']:
+        return 'write_stall'
+    # the datapath is idle while the legalizer has not yet issued the next burst
+    if busy['r_leg'] or busy['w_leg']:
+        return 'legalizer'
+    # outstanding responses tracked by the error handler
+    if busy['eh_cnt']:
+        return 'error_handler'
+    # only front-end handshakes: request and response cycles
+    return 'idle'
 
+
+class StallAttribution:
+    """Accumulates the cycles attributed to each cause, see classify_cycle"""
+
+    def __init__(self, be_info: dict):
+        self.be_info = be_info
+        self.stalls = {cause: 0 for cause in STALL_CAUSES}
+
+    def update(self, ele: dict):
+        self.stalls[classify_cycle(ele, self.be_info)] += 1
+
+    def result(self) -> dict:
+        return self.stalls
+
+    def format(self) -> str:
+        return format_stall_attribution(self.stalls)
+
+
+def get_stall_attribution(trace: list, be_info: dict) -> dict:
+    """Counts the cycles attributed to each cause, see classify_cycle"""
+
+    stalls = StallAttribution(be_info)
     for ele in trace:
-        # add read contribution
-        for read_prot in be_info['read_prots']:
-            if (ele['bus'][f'{read_prot}_read_rsp_ready']
-                    and ele['bus'][f'{read_prot}_read_rsp_valid']):
-                read_data += params['data_width'] // 8
+        stalls.update(ele)
+
+    return stalls.result()
+
+
+def format_stall_attribution(stalls: dict) -> str:
+    """Renders the stall attribution as a table of cycles and percentages"""
+
+    total = sum(stalls.values())
+    stalled = total - stalls['transfer']
+    rows = []
+    for cause in STALL_CAUSES:
+        rows.append([cause, stalls[cause], 100 * stalls[cause] / total if total else 0.0,
+            100 * stalls[cause] / stalled if stalled and cause != 'transfer' else None])
+    rows.append(['total', total, 100.0 if total else 0.0, None])
+
+    return tabulate(rows, headers=['cause', 'cycles', '% of cycles', '% of stalls'],
+        floatfmt='.2f', missingval='-')
+
+
+def alignment_class(src_offset: int, dst_offset: int) -> str:
+    """Classifies a transfer by the beat offsets of its source and destination"""
+
+    if src_offset == dst_offset:
+        return 'same offset' if src_offset else 'aligned'
+    if not dst_offset:
+        return 'src unaligned'
+    if not src_offset:
+        return 'dst unaligned'
+    return 'different offsets'
+
+
+class StrobeEfficiency:
+    """Accumulates the fill of write beats and the bytes lost to unaligned transfers
+
+    The fill ratio and the strobe histogram are measured per write port. The
+    head and tail losses follow from each accepted request: a transfer of `length`
+    bytes at beat offset `offset` occupies `ceil((offset + length) / StrbWidth)`
+    beats on either side, whichever way the legalizer splits it, as bursts are
+    beat aligned. Transfers are matched to responses in order to time them.
+    """
+
+    def __init__(self, params: dict, be_info: dict):
+        self.strb_width = params['data_width'] // 8
+        self.be_info = be_info
+        self.histogram = {w: [0] * (self.strb_width + 1) for w in be_info['write_ports']}
+        self.classes = {c: {'transfers': 0, 'bytes': 0, 'head': 0, 'tail': 0, 'read_beats': 0,
+            'write_beats': 0, 'cycles': 0, 'timed': 0} for c in ALIGNMENT_CLASSES}
+        self._pending = []
+        self._time = None
+        self._period = None
+
+    def _beats(self, offset: int, length: int) -> int:
+        return -(-(offset + length) // self.strb_width)
+
+    def update(self, ele: dict):
+        bus = ele['bus']
+        backend = ele['backend']
+        time = ele['meta']['time']
+
+        # the clock period is the smallest step between two traced cycles
+        if self._time is not None and time > self._time:
+            step = time - self._time
+            self._period = step if self._period is None else min(self._period, step)
+        self._time = time
+
+        # strobe popcount of every write beat
+        for write_port in self.be_info['write_ports']:
+            if bus[f'{write_port}_req_valid'] and bus[f'{write_port}_req_ready']:
+                self.histogram[write_port][strb_to_bytes(bus[f'{write_port}_req_strobe'])] += 1
+
+        # transfers complete in order: a response closes the oldest request
+        if backend['rsp_valid'] and backend['rsp_ready'] and self._pending:
+            start, cls = self._pending.pop(0)
+            self.classes[cls]['cycles'] += time - start
+            self.classes[cls]['timed'] += 1
+
+        # traces of older tracers carry no addresses
+        if backend['req_valid'] and backend['req_ready'] and 'req_src_addr' in backend:
+            length = backend['req_length']
+            src_offset = backend['req_src_addr'] % self.strb_width
+            dst_offset = backend['req_dst_addr'] % self.strb_width
+            cls = alignment_class(src_offset, dst_offset)
+            write_beats = self._beats(dst_offset, length)
+            stats = self.classes[cls]
+            stats['transfers'] += 1
+            stats['bytes'] += length
+            stats['head'] += dst_offset if length else 0
+            stats['tail'] += write_beats * self.strb_width - dst_offset - length if length else 0
+            stats['read_beats'] += self._beats(src_offset, length)
+            stats['write_beats'] += write_beats
+            if length:
+                self._pending.append((time, cls))
+
+    def result(self) -> dict:
+        # transfer durations are kept in simulation time until here
+        period = self._period or 1
+        fill = {}
+        for write_port, hist in self.histogram.items():
+            beats = sum(hist)
+            fill[write_port] = sum(n * cnt for n, cnt in enumerate(hist)) / \
+                (beats * self.strb_width) if beats else None
+        classes = {}
+        for cls, stats in self.classes.items():
+            stats = dict(stats)
+            stats['cycles'] = stats['cycles'] / period
+            classes[cls] = stats
+        return {'strb_width': self.strb_width, 'fill': fill, 'histogram': self.histogram,
+            'classes': classes}
+
+    def format(self) -> str:
+        res = self.result()
+        width = res['strb_width']
+
+        # beat fill and strobe histogram per write port
+        ports = list(res['histogram'])
+        rows = [[f'{n}/{width}', *[res['histogram'][w][n] for w in ports]]
+            for n in range(width + 1)]
+        rows.append(['fill', *[f'{res["fill"][w]:.3f}' if res['fill'][w] is not None else '-'
+            for w in ports]])
+        text = tabulate(rows, headers=['strobe', *ports], disable_numparse=True)
+
+        # losses and achieved throughput per alignment class
+        rows = []
+        for cls, stats in res['classes'].items():
+            if not stats['transfers']:
+                continue
+            rows.append([cls, stats['transfers'], stats['bytes'], stats['head'], stats['tail'],
+                stats['bytes'] / (stats['read_beats'] * width) if stats['read_beats'] else None,
+                stats['bytes'] / (stats['write_beats'] * width) if stats['write_beats'] else None,
+                stats['bytes'] / (stats['cycles'] * width) if stats['cycles'] else None])
+        if rows:
+            text += '\n\n' + tabulate(rows, headers=['alignment', 'transfers', 'bytes',
+                'head loss', 'tail loss', 'read fill', 'write fill', 'achieved'],
+                floatfmt='.3f', missingval='-')
+
+        return text
+
+
+class BufferOccupancy:
+    """Accumulates the fill level of the dataflow buffer and the state of the R-AW coupler
+
+    The buffer is one FIFO of `BufferDepth` bytes per byte lane. The fill of
+    each lane follows from its traced handshakes; the buffer's fill in beats is
+    that of its fullest lane. The R-AW coupler holds an AW back until the first
+    W beat of its burst is ready; the AWs it holds follow from its handshakes.
+    """
+
+    def __init__(self, params: dict, tolerance: float):
+        self.strb_width = params['data_width'] // 8
+        self.depth = params['buffer_depth']
+        self.tolerance = tolerance
+        self.cycles = 0
+        self.lanes = [0] * self.strb_width
+        self.histogram = [0] * (self.depth + 1)
+        self.full = 0
+        self.blocked = 0
+        self.empty = 0
+        self.starved = 0
+        self.aw_held = 0
+        self.aw_histogram = {}
+        self.aw_waiting = 0
+        self.traced = True
+
+    def update(self, ele: dict):
+        # traces of older tracers carry no buffer handshakes
+        if 'buffer' not in ele:
+            self.traced = False
+            return
+        buf = ele['buffer']
+        self.cycles += 1
+
+        # the fill this cycle, before the handshakes take effect
+        fill = max(self.lanes)
+        self.histogram[min(fill, self.depth)] += 1
+        if fill >= self.depth:
+            self.full += 1
+        if fill == 0:
+            self.empty += 1
+            if ele['busy']['w_dp']:
+                self.starved += 1
+        # read data waiting for a full lane
+        if buf['in_valid'] & ~buf['in_ready']:
+            self.blocked += 1
+
+        pushed = buf['in_valid'] & buf['in_ready']
+        popped = buf['out_valid'] & buf['out_ready']
+        for lane in range(self.strb_width):
+            self.lanes[lane] += (pushed >> lane & 1) - (popped >> lane & 1)
+            self.lanes[lane] = max(0, self.lanes[lane])
 
-        # add write contribution
-        for write_prot in be_info['write_prots']:
-            if (ele['bus'][f'{write_prot}_write_req_ready']
-                    and ele['bus'][f'{write_prot}_write_req_valid']):
-                write_data += strb_to_bytes(ele['bus'][f'{write_prot}_write_req_strobe'])
+        # AWs held by the coupler, and cycles they wait for their first W beat
+        cpl = ele['coupler']
+        self.aw_histogram[self.aw_held] = self.aw_histogram.get(self.aw_held, 0) + 1
+        if self.aw_held and ele['busy']['raw_coupler'] and not cpl['aw_out_valid']:
+            self.aw_waiting += 1
+        self.aw_held += (cpl['aw_in_valid'] and cpl['aw_in_ready']) - \
+            (cpl['aw_out_valid'] and cpl['aw_out_ready'])
+        self.aw_held = max(0, self.aw_held)
 
-    # calculate maximum possible amount of data
-    max_data = len(trace) * params['data_width'] // 8
+    def recommend(self) -> tuple:
+        """Returns the smallest sufficient BufferDepth and the reason"""
 
-    return [read_data / max_data, write_data / max_data]
+        # a full buffer that blocks read data may be limiting throughput
+        if self.cycles and self.blocked / self.cycles > self.tolerance:
+            return self.depth, (f'read data blocked on a full buffer in '
+                f'{100 * self.blocked / self.cycles:.2f}% of cycles; trace a deeper buffer '
+                f'to tell whether BufferDepth limits throughput')
+
+        # the smallest depth the fill exceeded in at most the tolerated share of cycles
+        exceeded = self.cycles
+        for depth, count in enumerate(self.histogram):
+            exceeded -= count
+            if depth >= MIN_BUFFER_DEPTH and exceeded <= self.tolerance * self.cycles:
+                return depth, (f'fill exceeded {depth} beats in {exceeded} of {self.cycles} '
+                    f'cycles, never blocking read data beyond the tolerance')
+        return self.depth, 'the configured depth is used in full'
+
+    def result(self) -> dict:
+        return {
+            'depth': self.depth,
+            'cycles': self.cycles,
+            'histogram': self.histogram,
+            'full': self.full,
+            'blocked': self.blocked,
+            'empty': self.empty,
+            'starved': self.starved,
+            'aw_histogram': dict(sorted(self.aw_histogram.items())),
+            'aw_waiting': self.aw_waiting,
+            'recommended': self.recommend()
+        }
+
+    def format(self) -> str:
+        if not self.traced:
+            return 'The trace carries no buffer handshakes; regenerate the tracer'
+        res = self.result()
+        cycles = max(1, res['cycles'])
+
+        # fill histogram
+        rows = [[f'{fill}/{res["depth"]}', count, 100 * count / cycles]
+            for fill, count in enumerate(res['histogram'])]
+        text = tabulate(rows, headers=['fill (beats)', 'cycles', '%'], floatfmt='.2f')
+
+        # time at full and empty
+        rows = [['full', res['full']], ['full, read data blocked', res['blocked']],
+            ['empty', res['empty']], ['empty, write datapath busy', res['starved']],
+            ['AW held for its first W', res['aw_waiting']]]
+        rows = [[name, count, 100 * count / cycles] for name, count in rows]
+        text += '\n\n' + tabulate(rows, headers=['state', 'cycles', '%'], floatfmt='.2f')
+
+        # AWs held by the coupler
+        rows = [[held, count, 100 * count / cycles] for held, count in res['aw_histogram'].items()]
+        text += '\n\n' + tabulate(rows, headers=['AWs held', 'cycles', '%'], floatfmt='.2f')
+
+        depth, reason = res['recommended']
+        text += f'\n\nRecommended BufferDepth: {depth} (configured {res["depth"]}): {reason}'
+        return text
+
+
+def percentile(values: list, pct: float) -> float:
+    """Returns the nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[max(0, -(-len(values) * pct // 100) - 1)]
+
+
+class Latency:
+    """Accumulates the latency of each transfer, from accepted request to accepted response
+
+    Transfers complete in order. Latencies are kept in simulation time and
+    converted to cycles with the clock period, the smallest step between two
+    traced cycles, once the trace is read.
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.bytes = 0
+        self._pending = []
+        self._time = None
+        self._period = None
+
+    def update(self, ele: dict):
+        backend = ele['backend']
+        time = ele['meta']['time']
+        if self._time is not None and time > self._time:
+            step = time - self._time
+            self._period = step if self._period is None else min(self._period, step)
+        self._time = time
+
+        if backend['rsp_valid'] and backend['rsp_ready'] and self._pending:
+            self.latencies.append(time - self._pending.pop(0))
+        if backend['req_valid'] and backend['req_ready']:
+            self._pending.append(time)
+            self.bytes += backend['req_length']
+
+    def result(self) -> dict:
+        period = self._period or 1
+        latencies = sorted(lat / period for lat in self.latencies)
+        return {
+            'transfers': len(latencies),
+            'bytes': self.bytes,
+            **{f'p{p}': percentile(latencies, p) for p in LATENCY_PERCENTILES}
+        }
+
+    def format(self) -> str:
+        res = self.result()
+        rows = [[f'p{p}', res[f'p{p}']] for p in LATENCY_PERCENTILES]
+        return f'{res["transfers"]} transfers, {res["bytes"]} bytes\n' + \
+            tabulate(rows, headers=['percentile', 'cycles'], floatfmt='.1f', missingval='-')
+
+
+def jain_fairness(values: list) -> float:
+    """Returns Jain's fairness index of the values: 1 if all are equal, 1/n if one takes all"""
+    if not values or not any(values):
+        return None
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
+
+
+class HeadBandwidth:
+    """Accumulates the bytes moved per port and head of one or several backend instances
+
+    The traces of several instances are merged by time; a cycle any of them is
+    active in counts once. Bandwidth is given in bytes per cycle and relative to
+    the port's data width, fairness as Jain's index over the heads of each
+    direction.
+    """
+
+    def __init__(self, instances: list):
+        self.instances = instances
+        self.cycles = 0
+        self.bytes = [{port: 0 for port in be_info['read_ports'] + be_info['write_ports']}
+            for _, _, be_info in instances]
+        self._time = None
+
+    def update(self, ele: dict, inst: int = 0):
+        time = ele['meta']['time']
+        if time != self._time:
+            self.cycles += 1
+            self._time = time
+
+        _, params, be_info = self.instances[inst]
+        bus = ele['bus']
+        for port in be_info['read_ports']:
+            if bus[f'{port}_rsp_valid'] and bus[f'{port}_rsp_ready']:
+                self.bytes[inst][port] += params['data_width'] // 8
+        for port in be_info['write_ports']:
+            if bus[f'{port}_req_valid'] and bus[f'{port}_req_ready']:
+                self.bytes[inst][port] += strb_to_bytes(bus[f'{port}_req_strobe'])
+
+    def result(self) -> dict:
+        cycles = max(1, self.cycles)
+        res = {'cycles': self.cycles, 'heads': [], 'directions': {}}
+        for dir in ['read', 'write']:
+            heads = []
+            for (name, params, be_info), moved in zip(self.instances, self.bytes):
+                for port in be_info[f'{dir}_ports']:
+                    heads.append({'instance': name, 'port': port, 'bytes': moved[port],
+                        'bandwidth': moved[port] / cycles,
+                        'utilization': moved[port] / (cycles * params['data_width'] // 8)})
+            total = sum(h['bytes'] for h in heads)
+            for head in heads:
+                head['share'] = head['bytes'] / total if total else None
+            res['heads'] += heads
+            res['directions'][dir] = {
+                'bytes': total,
+                'bandwidth': total / cycles,
+                'fairness': jain_fairness([h['bytes'] for h in heads]) if len(heads) > 1 else None
+            }
+        return res
+
+    def format(self) -> str:
+        res = self.result()
+        rows = [[h['instance'], h['port'], h['bytes'], h['bandwidth'], h['utilization'],
+            h['share']] for h in res['heads']]
+        text = tabulate(rows, headers=['instance', 'port', 'bytes', 'bytes/cycle',
+            'utilization', 'share'], floatfmt='.3f', missingval='-')
+        rows = [[dir, d['bytes'], d['bandwidth'], d['fairness']]
+            for dir, d in res['directions'].items()]
+        text += f'\n\n{res["cycles"]} cycles\n' + tabulate(rows, headers=['direction',
+            'bytes', 'bytes/cycle', 'fairness'], floatfmt='.3f', missingval='-')
+        return text
+
+
+def compute_tuning(params: dict) -> str:
+    """Returns the ComputeTuning of a backend as its fields, None if it has no compute stage"""
+    if 'compute_tuning' not in params:
+        return None
+    value = params['compute_tuning']
+    width = len(COMPUTE_TUNING_FIELDS)
+    return ' '.join(f'{field}={value >> (width - 1 - idx) & 1}'
+        for idx, field in enumerate(COMPUTE_TUNING_FIELDS))
+
+
+class ComputeThroughput:
+    """Accumulates the throughput of the copy path per compute op
+
+    Each cycle the write datapath is busy is attributed to the op of the write in
+    flight, `none` for a plain copy. Throughput is given in source bytes per
+    cycle, so size-changing ops compare to a copy of the same data; the slowdown
+    of an op is the plain-copy throughput over its own. Without a plain copy in
+    the trace, the full data width per cycle is the baseline.
+
+    Each cycle the compute stage is active in is classified as it consuming an
+    input beat, its output being held by the write side (`backpressure`), it
+    waiting for read data (`starved`) or the engine being busy otherwise
+    (`engine`): filling or draining a tile or block.
+    """
+
+    def __init__(self, params: dict, be_info: dict):
+        self.params = params
+        self.be_info = be_info
+        self.cycles = {op: 0 for op in COMPUTE_OPS}
+        self.bytes = {op: 0.0 for op in COMPUTE_OPS}
+        self.states = {op: {state: 0 for state in COMPUTE_STATES} for op in COMPUTE_OPS}
+        self.cfg_stall = 0
+        self.traced = False
+
+    def update(self, ele: dict):
+        if 'compute' not in ele:
+            return
+        self.traced = True
+        compute = ele['compute']
+        op = COMPUTE_OPS[compute['req_op']] if compute['req_enable'] else 'none'
+        self.cfg_stall += compute['cfg_stall']
+
+        if ele['busy']['w_dp']:
+            self.cycles[op] += 1
+            self.bytes[op] += cycle_bytes(ele, self.params, self.be_info)[1] * \
+                COMPUTE_RATIO.get(op, 1)
+
+        if compute['active']:
+            if compute['in_valid'] and compute['in_ready']:
+                state = 'consume'
+            elif compute['out_valid'] and not compute['out_ready']:
+                state = 'backpressure'
+            elif not compute['in_valid']:
+                state = 'starved'
+            else:
+                state = 'engine'
+            self.states[op][state] += 1
+
+    def result(self) -> dict:
+        copy = self.bytes['none'] / self.cycles['none'] if self.cycles['none'] else None
+        baseline = copy or self.params['data_width'] // 8
+        ops = {}
+        for op in COMPUTE_OPS:
+            if not self.cycles[op]:
+                continue
+            throughput = self.bytes[op] / self.cycles[op]
+            ops[op] = {
+                'cycles': self.cycles[op],
+                'bytes': self.bytes[op],
+                'throughput': throughput,
+                'slowdown': baseline / throughput if throughput else None,
+                **self.states[op]
+            }
+        return {
+            'traced': self.traced,
+            'tuning': compute_tuning(self.params),
+            'baseline': baseline,
+            'ideal_baseline': copy is None,
+            'cfg_stall': self.cfg_stall,
+            'ops': ops
+        }
+
+    def format(self) -> str:
+        res = self.result()
+        if not res['traced']:
+            return 'The trace holds no compute stage'
+        rows = [[op, o['cycles'], o['bytes'], o['throughput'], o['slowdown'],
+            *[o[state] for state in COMPUTE_STATES]] for op, o in res['ops'].items()]
+        text = f'ComputeTuning: {res["tuning"]}\n'
+        text += tabulate(rows, headers=['op', 'cycles', 'source bytes', 'bytes/cycle',
+            'slowdown', *COMPUTE_STATES], floatfmt='.3f', missingval='-')
+        baseline = 'full data width' if res['ideal_baseline'] else 'plain copy'
+        text += f'\n\nBaseline: {res["baseline"]:.3f} bytes/cycle ({baseline}), '
+        text += f'{res["cfg_stall"]} cycles a request waited for the compute stage to drain'
+        return text
+
+
+def format_compute_tunings(instances: list, reports: list) -> str:
+    """Renders the slowdown of each op per ComputeTuning of several instances"""
+
+    rows = []
+    for (name, _, _), inst_reports in zip(instances, reports):
+        res = inst_reports['compute'].result()
+        if not res['traced']:
+            continue
+        for op, o in res['ops'].items():
+            if op != 'none':
+                rows.append([res['tuning'], op, name, o['throughput'], o['slowdown']])
+    rows.sort(key=lambda row: (COMPUTE_OPS.index(row[1]), row[0]))
+    return tabulate(rows, headers=['tuning', 'op', 'instance', 'bytes/cycle', 'slowdown'],
+        floatfmt='.3f', missingval='-')
+
+
+def instance_name(params: dict) -> str:
+    """Returns the hierarchical name of the backend instance a trace resulted from"""
+    return decode_string(params.get('inst', 0)) or 'idma_backend'
+
+
+def make_reports(names: list, params: dict, be_info: dict, args) -> dict:
+    """Creates the accumulator of each requested report"""
+
+    reports = {}
+    for name in names:
+        if name == 'utilization':
+            reports[name] = Utilization(params, be_info)
+        elif name == 'windows':
+            reports[name] = WindowedThroughput(params, be_info, args.window)
+        elif name == 'stalls':
+            reports[name] = StallAttribution(be_info)
+        elif name == 'strobes':
+            reports[name] = StrobeEfficiency(params, be_info)
+        elif name == 'buffer':
+            reports[name] = BufferOccupancy(params, args.tolerance)
+        elif name == 'latency':
+            reports[name] = Latency()
+        elif name == 'heads':
+            reports[name] = HeadBandwidth([(instance_name(params), params, be_info)])
+        elif name == 'compute':
+            reports[name] = ComputeThroughput(params, be_info)
+
+    return reports
+
+
+def print_progress(cycles: int, ele: dict, reports: dict):
+    """Prints a one-line summary of the reports accumulated so far to stderr"""
+
+    status = f'[iDMA Trace] {cycles} cycles, t={ele["meta"]["time"]}'
+    if 'utilization' in reports:
+        status += ', read {:.3f} write {:.3f}'.format(*reports['utilization'].result())
+    if 'windows' in reports and reports['windows'].windows:
+        status += ', last window read {:.3f} write {:.3f}'.format(
+            *reports['windows'].windows[-1][2:])
+    if 'stalls' in reports:
+        stalls = reports['stalls'].result()
+        worst = max((c for c in STALL_CAUSES if c != 'transfer'), key=lambda c: stalls[c])
+        status += f', top stall {worst} {100 * stalls[worst] / cycles:.1f}%'
+    print(status, file=sys.stderr, flush=True)
+
+
+def analyze(fn: str, database: dict, names: list, args) -> tuple:
+    """Streams a trace once through the requested reports and exports"""
+
+    # stream the trace, fetch parameters from its first cycle
+    idma_trace = iter_trace(fn, args.time_window, args.cycle_window)
+    first = next(idma_trace, None)
+    params = extract_parameter([first] if first else [])
+    be_info = get_be_info(params, database)
+
+    # accumulate all reports and exports in one pass
+    reports = make_reports(names, params, be_info, args)
+    exports = []
+    if args.export_events:
+        exports.append(TraceEventWriter(args.export_events, params, be_info, args.time_unit))
+    cycles = 0
+    for ele in chain([first], idma_trace):
+        for report in reports.values():
+            report.update(ele)
+        for export in exports:
+            export.update(ele)
+        cycles += 1
+        if args.progress and cycles % args.progress == 0:
+            print_progress(cycles, ele, reports)
+    for export in exports:
+        export.close()
+
+    return params, be_info, reports
+
+
+def analyze_merged(fns: list, database: dict, names: list, args) -> tuple:
+    """Streams the traces of several backend instances merged by time
+
+    Returns the reports of each instance and their joint per-head bandwidth.
+    """
+
+    # fetch the parameters of each instance from the first cycle of its trace
+    streams = []
+    instances = []
+    for fn in fns:
+        idma_trace = iter_trace(fn, args.time_window, args.cycle_window)
+        first = next(idma_trace, None)
+        params = extract_parameter([first] if first else [])
+        instances.append((instance_name(params), params, get_be_info(params, database)))
+        streams.append(chain([first], idma_trace))
+
+    # several traces of the same testbench carry the same instance name
+    names_seen = [name for name, _, _ in instances]
+    instances = [(f'{name}#{idx}' if names_seen.count(name) > 1 else name, params, be_info)
+        for idx, (name, params, be_info) in enumerate(instances)]
+
+    reports = [make_reports([n for n in names if n != 'heads'], params, be_info, args)
+        for _, params, be_info in instances]
+    heads = HeadBandwidth(instances)
+
+    def tagged(idx: int, stream):
+        for ele in stream:
+            yield idx, ele
+
+    merged = heapq.merge(*[tagged(idx, stream) for idx, stream in enumerate(streams)],
+        key=lambda item: item[1]['meta']['time'])
+    for idx, ele in merged:
+        for report in reports[idx].values():
+            report.update(ele)
+        heads.update(ele, idx)
+
+    return instances, reports, heads
+
+
+def summarize(fn: str, database: dict, args) -> dict:
+    """Returns the summarized metrics of a trace, or reads them if fn is a summary"""
+
+    if fn.endswith('.json'):
+        with open(fn, 'r', encoding='utf8') as summary:
+            return json.load(summary)
+
+    params, be_info, reports = analyze(fn, database,
+        ['utilization', 'windows', 'stalls', 'latency'], args)
+    utilization = reports['utilization']
+    windows = reports['windows'].result()
+    stalls = reports['stalls'].result()
+    latency = reports['latency'].result()
+
+    metrics = {
+        'cycles': utilization.cycles,
+        'read_utilization': utilization.result()[0],
+        'write_utilization': utilization.result()[1],
+        'window_write_min': min(w[3] for w in windows) if windows else 0.0,
+        'window_write_mean': sum(w[3] for w in windows) / len(windows) if windows else 0.0,
+        **{f'latency_p{p}': latency[f'p{p}'] for p in LATENCY_PERCENTILES},
+        **{f'stall_{c}': stalls[c] / max(1, utilization.cycles) for c in STALL_CAUSES
+            if c != 'transfer'},
+    }
+
+    return {
+        'id': be_info['id'],
+        'params': {k: v for k, v in params.items() if k not in ('inst', 'identifier')},
+        'transfers': latency['transfers'],
+        'bytes': latency['bytes'],
+        'window': args.window,
+        'metrics': metrics
+    }
+
+
+def compare_summaries(baseline: dict, candidate: dict, max_regression: float) -> tuple:
+    """Compares two summaries, returns the table rows and the regressed metrics
+
+    Utilizations, cycles and latencies regress by their relative change, stall
+    shares, being fractions of all cycles, by their absolute change.
+    """
+
+    rows = []
+    regressions = []
+    for metric, higher_is_better in SUMMARY_METRICS.items():
+        base = baseline['metrics'].get(metric)
+        cand = candidate['metrics'].get(metric)
+        if base is None or cand is None:
+            continue
+        change = cand - base
+        if metric.startswith('stall_'):
+            worse_by = change
+        else:
+            worse_by = change / base if base else (1.0 if change else 0.0)
+        if higher_is_better:
+            worse_by = -worse_by
+        regressed = worse_by > max_regression
+        if regressed:
+            regressions.append(metric)
+        rows.append([metric, base, cand, 100 * worse_by, 'REGRESSED' if regressed else ''])
+
+    return rows, regressions
+
+
+def merge_summaries(summaries: list) -> dict:
+    """Merges the summaries of runs of disjoint parts of one workload, e.g. of shards
+
+    The cycles add up as if the parts ran back to back. Utilizations, window means and stall
+    shares are weighted by the cycles of each part, window minima and latency percentiles are
+    those of the worst part.
+    """
+
+    cycles = sum(summary['metrics']['cycles'] for summary in summaries)
+    metrics = {'cycles': cycles}
+    for metric, higher_is_better in SUMMARY_METRICS.items():
+        values = [(summary['metrics'][metric], summary['metrics']['cycles'])
+                  for summary in summaries if metric in summary['metrics']]
+        if metric == 'cycles' or not values:
+            continue
+        if metric.startswith('latency_p') or metric == 'window_write_min':
+            metrics[metric] = (min if higher_is_better else max)(v for v, _ in values)
+        else:
+            metrics[metric] = sum(v * c for v, c in values) / max(1, cycles)
+
+    return {
+        **summaries[0],
+        'transfers': sum(summary['transfers'] for summary in summaries),
+        'bytes': sum(summary['bytes'] for summary in summaries),
+        'metrics': metrics
+    }
+
+
+def compare(args, database: dict) -> int:
+    """Compares a candidate run against a baseline, non-zero if it regressed"""
+
+    baseline = summarize(args.compare, database, args)
+    candidate = summarize(args.trace_file, database, args)
+
+    # only the same workload on the same backend can be compared
+    for key in ('id', 'params', 'transfers', 'bytes'):
+        if baseline[key] != candidate[key]:
+            print(f'Runs are not comparable: {key} differs: {baseline[key]} vs. {candidate[key]}',
+                file=sys.stderr)
+            return EXIT_MISMATCH
+
+    rows, regressions = compare_summaries(baseline, candidate, args.max_regression)
+    print(tabulate(rows, headers=['metric', 'baseline', 'candidate', 'worse by %', ''],
+        floatfmt='.4f', missingval='-'))
+    if regressions:
+        print(f'{len(regressions)} metric(s) regressed beyond {100 * args.max_regression:.2f}%: '
+              f'{", ".join(regressions)}')
+        return 1
+    print(f'No metric regressed beyond {100 * args.max_regression:.2f}%')
+    return 0
 
 
 def main():
@@ -83,33 +1064,105 @@ def main():
         description='Trace iDMA files to analyze them.'
     )
     parser.add_argument('--db', dest='db', nargs='*', required=True, help='Database files')
-    parser.add_argument('--trace', dest='trace_file', required=True, help='Trace file')
+    parser.add_argument('--trace', dest='trace_files', nargs='+', required=True, metavar='TRACE',
+        help='Trace file, or the traces of several backend instances to merge by time')
+    parser.add_argument('--report', dest='reports', nargs='*', choices=REPORTS,
+        default=['utilization'], help='Reports to emit')
+    parser.add_argument('--time-window', dest='time_window', nargs=2, type=int,
+        metavar=('START', 'END'), help='Only consider the simulation times START to END')
+    parser.add_argument('--cycle-window', dest='cycle_window', nargs=2, type=int,
+        metavar=('START', 'END'), help='Only consider the traced cycles START to END')
+    parser.add_argument('--pack', dest='pack', metavar='CONTAINER',
+        help='Store the (windowed) trace as a block-compressed container (.gz or .xz)')
+    parser.add_argument('--codec', dest='codec', choices=sorted(CODECS),
+        help='Container codec, derived from the extension if not given')
+    parser.add_argument('--block-lines', dest='block_lines', type=int,
+        default=DEFAULT_BLOCK_LINES, help='Trace lines per compressed block')
+    parser.add_argument('--extract', dest='extract', metavar='FILE',
+        help='Write the (windowed) trace as a plain trace file')
+    parser.add_argument('--window', dest='window', type=int, default=1000,
+        help='Traced cycles per window of the windows report')
+    parser.add_argument('--tolerance', dest='tolerance', type=float, default=0.0,
+        help='Share of cycles a recommendation may fall short in')
+    parser.add_argument('--live', dest='live', action='store_true',
+        help='The trace is a named pipe written by a running simulation')
+    parser.add_argument('--progress', dest='progress', type=int, default=0, metavar='CYCLES',
+        help='Print progress every CYCLES traced cycles, defaults to 100000 if live')
+    parser.add_argument('--export-events', dest='export_events', metavar='JSON',
+        help='Export the trace as Chrome/Perfetto trace-event JSON')
+    parser.add_argument('--time-unit', dest='time_unit', choices=sorted(TIME_UNITS),
+        default='ns', help='Unit of the simulation time the tracer logs')
+    parser.add_argument('--summary', dest='summary', metavar='JSON',
+        help='Write the summarized metrics a comparison uses')
+    parser.add_argument('--compare', dest='compare', metavar='BASELINE',
+        help='Compare against a baseline trace or summary, fail if the trace regressed')
+    parser.add_argument('--max-regression', dest='max_regression', type=float, default=0.01,
+        help='Largest tolerated regression of any compared metric, as a fraction')
     args = parser.parse_args()
 
+    # only the analysis merges several traces
+    args.trace_file = args.trace_files[0]
+    if len(args.trace_files) > 1 and (args.live or args.pack or args.extract or args.compare
+            or args.summary or args.export_events):
+        parser.error('--live, --pack, --extract, --compare, --summary and --export-events '
+                     'take a single trace')
+
+    # wait on a named pipe for the tracer to open it
+    if args.live:
+        if not os.path.exists(args.trace_file):
+            os.mkfifo(args.trace_file)
+        elif not stat.S_ISFIFO(os.stat(args.trace_file).st_mode):
+            print(f'{args.trace_file} is not a named pipe', file=sys.stderr)
+            return 1
+        args.progress = args.progress or 100000
+        print(f'[iDMA Trace] Waiting for the tracer on {args.trace_file}', file=sys.stderr)
+
+    # storage operations do not analyze the trace
+    if args.pack:
+        index = write_store(iter_lines(args.trace_file, args.time_window, args.cycle_window),
+            args.pack, args.codec, args.block_lines)
+        print(f'Packed {sum(b["lines"] for b in index["blocks"])} cycles into '
+              f'{len(index["blocks"])} blocks of {args.pack}')
+        return 0
+    if args.extract:
+        with open(args.extract, 'w', encoding='utf8') as out:
+            out.writelines(iter_lines(args.trace_file, args.time_window, args.cycle_window))
+        return 0
+
     # get database to fetch interface names
     database = read_database(args.db)
 
-    # read trace, fetch parameters
-    idma_trace = read_trace(args.trace_file)
-    params = extract_parameter(idma_trace)
+    # regression gate
+    if args.compare:
+        return compare(args, database)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf8') as summary:
+            json.dump(summarize(args.trace_file, database, args), summary, indent=4)
+            summary.write('\n')
+        return 0
 
-    # fetch and parse identifier
-    id = bytes.fromhex(hex(params['identifier'])[2:]).decode("ASCII")
-    read_prots = prepare_ids([id])[id]['ar']
-    write_prots = prepare_ids([id])[id]['aw']
-    read_sigs = [database[r]['trace_signals']['read'] for r in read_prots]
-    write_sigs = [database[w]['trace_signals']['write'] for w in write_prots]
+    # several instances: the reports of each, then their joint bandwidth per head
+    if len(args.trace_files) > 1:
+        instances, reports, heads = analyze_merged(args.trace_files, database, args.reports,
+            args)
+        for (inst, _, be_info), inst_reports in zip(instances, reports):
+            for name, report in inst_reports.items():
+                print(f'# {inst} ({be_info["id"]}): {name}')
+                print(report.format())
+        print('# heads')
+        print(heads.format())
+        if 'compute' in args.reports:
+            print('# compute per tuning')
+            print(format_compute_tunings(instances, reports))
+        return 0
 
-    # pack data
-    be_info = {
-        'read_prots': read_prots,
-        'write_prots': write_prots,
-        'read_sigs': read_sigs,
-        'write_sigs': write_sigs
-    }
+    _, _, reports = analyze(args.trace_file, database, args.reports, args)
 
-    # get utilization
-    pp(get_global_utilization(idma_trace, params, be_info))
+    # emit the reports in the order requested
+    for name, report in reports.items():
+        if len(reports) > 1:
+            print(f'# {name}')
+        print(report.format())
 
     # no issues
     return 0
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Evaluates traces of the ND, RT and mp_split midends.
+
+The midend tracers (`IDMA_TRACER_ND_MIDEND`, `IDMA_TRACER_RT_MIDEND` and
+`IDMA_TRACER_MP_SPLIT_MIDEND` in `idma/tracer.svh`) log every cycle the midend is
+busy, a job is presented to it, or a request or response is underway. From that,
+this reports:
+
+  - the issue rate: requests of jobs emitted downstream per cycle a job is presented,
+  - backpressure: cycles an emitted request waits for the backend,
+  - issue gaps: cycles a job is presented but the midend emits nothing,
+  - the gaps between consecutive emitted requests, and
+  - the completion time of each job, from being presented to its response.
+
+A job is presented from the first cycle its request is valid until it is
+accepted; the ND midend only accepts a job once its last 1D request is emitted,
+the mp_split midend with its first split, the others it emits while splitting
+count to that job. For the RT midend, jobs are those of its bypass; the requests
+its events issue are reported on their own, with their completion time from
+being accepted to their response.
+"""
+import argparse
+import sys
+from tabulate import tabulate
+from trace_idma import LATENCY_PERCENTILES, decode_string, iter_trace, percentile
+
+
+def _ratio(value: float) -> str:
+    return '-' if value is None else f'{value:.3f}'
+
+
+class MidendActivity:
+    """Accumulates issue rate, backpressure, gaps and job completion times of a midend"""
+
+    def __init__(self):
+        self.cycles = 0
+        self.presented = 0
+        self.backpressure = 0
+        self.issue_gaps = 0
+        self.requests = 0
+        self.bytes = 0
+        self.jobs = []
+        self.request_gaps = []
+        self.event_requests = 0
+        self.event_bytes = 0
+        self.event_grants = {}
+        self.events = []
+        self._event_issued = []
+        self._arrival = None
+        self._accepted = []
+        self._requests_of_job = 0
+        self._last_request = None
+        self._last_job = None
+        self._time = None
+        self._period = None
+
+    def update(self, ele: dict):
+        midend = ele['midend']
+        time = ele['meta']['time']
+        if self._time is not None and time > self._time:
+            step = time - self._time
+            self._period = step if self._period is None else min(self._period, step)
+        self._time = time
+        self.cycles += 1
+
+        # downstream: emitted requests and backpressure of the backend
+        if midend['out_req_valid']:
+            if midend['out_req_ready']:
+                self.requests += 1
+                self.bytes += midend['out_length']
+                # splits of the accepted job, or a request of an event of the RT midend
+                if midend.get('splitting') and self._last_job:
+                    self._last_job[1] += 1
+                elif midend.get('out_bypass', 1):
+                    self._requests_of_job += 1
+                if self._last_request is not None:
+                    self.request_gaps.append(time - self._last_request)
+                self._last_request = time
+            else:
+                self.backpressure += 1
+
+        # the requests of the RT midend's events, they complete in order
+        if midend.get('event_req_valid') and midend['event_req_ready']:
+            self.event_requests += 1
+            self.event_bytes += midend['event_length']
+            for event in range(midend['event_grant'].bit_length()):
+                if midend['event_grant'] >> event & 1:
+                    self.event_grants[event] = self.event_grants.get(event, 0) + 1
+            self._event_issued.append(time)
+        if midend.get('event_rsp_valid') and self._event_issued:
+            self.events.append(time - self._event_issued.pop(0))
+
+        # upstream: a job is presented until accepted, jobs complete in order
+        if midend['in_rsp_valid'] and midend['in_rsp_ready'] and self._accepted:
+            job = self._accepted.pop(0)
+            self.jobs.append((time - job[0], job))
+        if midend['in_req_valid']:
+            self.presented += 1
+            if self._arrival is None:
+                self._arrival = time
+            if not midend['out_req_valid']:
+                self.issue_gaps += 1
+            if midend['in_req_ready']:
+                self._last_job = [self._arrival, self._requests_of_job]
+                self._accepted.append(self._last_job)
+                self._arrival = None
+                self._requests_of_job = 0
+
+    def result(self) -> dict:
+        # times are kept in simulation time until here
+        period = self._period or 1
+        completion = sorted(cycles / period for cycles, _ in self.jobs)
+        gaps = sorted(gap / period for gap in self.request_gaps)
+        events = sorted(cycles / period for cycles in self.events)
+        return {
+            'cycles': self.cycles,
+            'presented': self.presented,
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'jobs': len(self.jobs),
+            'issue_rate':
+                (self.requests - self.event_requests) / self.presented if self.presented else None,
+            'backpressure': self.backpressure / self.presented if self.presented else None,
+            'issue_gaps': self.issue_gaps / self.presented if self.presented else None,
+            'requests_per_job':
+                sum(job[1] for _, job in self.jobs) / len(self.jobs) if self.jobs else None,
+            'event_requests': self.event_requests,
+            'event_bytes': self.event_bytes,
+            'event_grants': dict(sorted(self.event_grants.items())),
+            'completion': {f'p{p}': percentile(completion, p) for p in LATENCY_PERCENTILES},
+            'request_gap': {f'p{p}': percentile(gaps, p) for p in LATENCY_PERCENTILES},
+            'event_completion': {f'p{p}': percentile(events, p) for p in LATENCY_PERCENTILES}
+        }
+
+    def format(self) -> str:
+        res = self.result()
+        rows = [
+            ['traced cycles', res['cycles']],
+            ['cycles a job is presented', res['presented']],
+            ['requests emitted', res['requests']],
+            ['bytes emitted', res['bytes']],
+            ['jobs completed', res['jobs']],
+            ['requests per job', _ratio(res['requests_per_job'])],
+            ['issue rate (requests/cycle)', _ratio(res['issue_rate'])],
+            ['backpressure (share of cycles)', _ratio(res['backpressure'])],
+            ['issue gaps (share of cycles)', _ratio(res['issue_gaps'])],
+        ]
+        if res['event_requests']:
+            rows += [
+                ['event requests', res['event_requests']],
+                ['event bytes', res['event_bytes']],
+            ] + [[f'requests of event {event}', count]
+                 for event, count in res['event_grants'].items()]
+        text = tabulate(rows, disable_numparse=True)
+        headers = ['percentile', 'request gap', 'job completion']
+        columns = [res['request_gap'], res['completion']]
+        if res['event_requests']:
+            headers.append('event completion')
+            columns.append(res['event_completion'])
+        rows = [[f'p{p}'] + [column[f'p{p}'] for column in columns]
+            for p in LATENCY_PERCENTILES]
+        text += '\n\n' + tabulate(rows, headers=headers, floatfmt='.1f', missingval='-')
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='trace_midend',
+        description='Parse and evaluate midend trace files'
+    )
+    parser.add_argument('--trace', dest='trace_file', required=True, help='Midend trace file')
+    parser.add_argument('--time-window', dest='time_window', nargs=2, type=int,
+        metavar=('START', 'END'), help='Only consider the simulation times START to END')
+    args = parser.parse_args()
+
+    activity = MidendActivity()
+    first = True
+    for ele in iter_trace(args.trace_file, args.time_window):
+        if first:
+            cnst = ele.get('cnst', {})
+            print(f'# {decode_string(cnst.get("inst", 0))} '
+                  f'({decode_string(cnst.get("midend", 0))})')
+            first = False
+        activity.update(ele)
+    print(activity.format())
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
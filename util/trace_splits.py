@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Reports how the legalizer split the transfers of a traced run into bursts.
+
+The tracer logs the address channel of every port: AR and AW of AXI and AXI-Lite,
+the requests of OBI and the A channel of TileLink. Per protocol and direction, this
+reports the distribution of the emitted burst lengths in beats, the bursts each
+transfer was split into, and the reason of every split:
+
+  - `page boundary`: the burst would cross a page of the protocol or 4 KiB,
+  - `pow2`: TileLink only moves power-of-two sized, aligned bursts,
+  - `job burst limit`: the job reduced its maximum burst length,
+  - `max burst length`: the most beats a burst of the protocol or `BurstLen` allows,
+  - `not bursting`: the protocol moves one beat per request, e.g. OBI,
+  - `coupled`: read and write are split together and the other side's limit was hit.
+
+Bursts shorter than `--short-beats` that a page boundary split off are counted
+separately, as they cost a full address handshake and memory latency for little data.
+
+The reasons follow from the legalizer model of `perf_bound.py`, which splits as the
+RTL and `legalizer_model.py` do; each burst seen on the bus is matched to the model's
+burst of the oldest transfer in flight on its protocol. Bursts at another address than
+the model's are counted as deviating: a deviation means the model and the hardware
+disagree, or the error handler replayed bursts. All heads of a multi-head protocol
+share the transfers in flight.
+"""
+
+import argparse
+import sys
+from collections import deque
+
+from tabulate import tabulate
+from mario.database import read_database
+from job_file import PROTOCOL_ENUM
+from perf_bound import SPLIT_REASONS, page_width, split_transfer
+from trace_idma import extract_parameter, get_be_info, iter_trace
+from trace_to_jobs import request_job
+
+DIRECTIONS = [('read', 'src'), ('write', 'dst')]
+
+
+def beat_bucket(num_beats: int) -> str:
+    """Returns the power-of-two bucket of a burst length, e.g. 5-8"""
+    upper = 1 << (num_beats - 1).bit_length()
+    return str(upper) if upper <= 2 else f'{upper // 2 + 1}-{upper}'
+
+
+def bus_bursts(bus: dict, ports: dict, beats_left: dict, strb_width: int):
+    """Yields the direction, port, address and beats of each burst starting on a port
+
+    TileLink writes carry their data on the A channel: only the first beat of a
+    burst starts one, `beats_left` holds the beats still to come per port.
+    """
+
+    for dir, port in ports:
+        if f'{port}_ax_valid' not in bus:
+            continue
+        if not (bus[f'{port}_ax_valid'] and bus[f'{port}_ax_ready']):
+            continue
+        if beats_left.get(port):
+            beats_left[port] -= 1
+            continue
+        if f'{port}_ax_size' in bus:
+            num_beats = max(1, -(-(1 << bus[f'{port}_ax_size']) // strb_width))
+            if dir == 'write':
+                beats_left[port] = num_beats - 1
+        else:
+            num_beats = bus.get(f'{port}_ax_len', 0) + 1
+        yield dir, port, bus[f'{port}_ax_addr'], num_beats
+
+
+def port_protocols(be_info: dict, database: dict) -> dict:
+    """Returns the protocol index of each (direction, port) of a backend"""
+
+    res = {}
+    for dir, _ in DIRECTIONS:
+        for prot in be_info[f'{dir}_prots']:
+            for port in be_info[f'{dir}_ports']:
+                if port == f'{prot}_{dir}' or port.startswith(f'{prot}_{dir}_h'):
+                    res[(dir, port)] = PROTOCOL_ENUM.index(database[prot]['protocol_enum'])
+    return res
+
+
+class SplitEfficiency:
+    """Accumulates the bursts of each transfer and the reasons they were split at"""
+
+    def __init__(self, params: dict, be_info: dict, database: dict, short_beats: int):
+        self.database = database
+        self.strb_width = params['data_width'] // 8
+        self.short_beats = short_beats
+
+        # the protocol index of each port, per direction
+        self.ports = port_protocols(be_info, database)
+        self.page_addr_width = page_width(database,
+            list(dict.fromkeys(be_info['read_prots'] + be_info['write_prots'])), self.strb_width)
+
+        # per direction and protocol: the transfers in flight, and the statistics
+        self.pending = {}
+        self.stats = {}
+        self._beats_left = {}
+
+    def _side(self, dir: str, prot: int) -> dict:
+        if (dir, prot) not in self.stats:
+            self.pending[(dir, prot)] = deque()
+            self.stats[(dir, prot)] = {
+                'transfers': 0,
+                'bursts': 0,
+                'bursts_per_transfer': [],
+                'deviating': 0,
+                'unmatched': 0,
+                'beats': {},
+                'splits': {reason: 0 for reason in SPLIT_REASONS},
+                'short': {reason: 0 for reason in SPLIT_REASONS}
+            }
+        return self.stats[(dir, prot)]
+
+    def _accept(self, backend: dict):
+        """Queues the bursts the model splits an accepted transfer into"""
+        job = request_job(backend)
+        sides = split_transfer(job, self.database, self.strb_width, self.page_addr_width)
+        for (dir, side), bursts in zip(DIRECTIONS, sides):
+            if bursts:
+                prot = getattr(job, f'{side}_protocol')
+                self._side(dir, prot)
+                self.pending[(dir, prot)].append([bursts, 0, None])
+
+    def _burst(self, dir: str, port: str, addr: int, num_beats: int):
+        """Matches a burst seen on a port to the model's burst of the oldest transfer"""
+
+        prot = self.ports[(dir, port)]
+        stats = self._side(dir, prot)
+        pending = self.pending[(dir, prot)]
+
+        stats['bursts'] += 1
+        bucket = beat_bucket(num_beats)
+        stats['beats'][bucket] = stats['beats'].get(bucket, 0) + 1
+        if not pending:
+            stats['unmatched'] += 1
+            return
+
+        entry = pending[0]
+        bursts, seen, split_before = entry
+        model_addr, _, reason = bursts[seen]
+        if model_addr // self.strb_width != addr // self.strb_width:
+            stats['deviating'] += 1
+        if reason:
+            stats['splits'][reason] += 1
+
+        # a short burst split off by a page boundary, at its start or its end
+        if num_beats <= self.short_beats:
+            for cause in [split_before, reason]:
+                if cause == 'page boundary':
+                    stats['short'][cause] += 1
+                    break
+
+        entry[1] += 1
+        entry[2] = reason
+        if entry[1] == len(bursts):
+            pending.popleft()
+            stats['transfers'] += 1
+            stats['bursts_per_transfer'].append(len(bursts))
+
+    def update(self, ele: dict):
+        backend = ele['backend']
+        if backend['req_valid'] and backend['req_ready']:
+            self._accept(backend)
+        for burst in bus_bursts(ele['bus'], self.ports, self._beats_left, self.strb_width):
+            self._burst(*burst)
+
+    def result(self) -> dict:
+        res = {}
+        for (dir, prot), stats in sorted(self.stats.items()):
+            per_transfer = stats['bursts_per_transfer']
+            splits = sum(stats['splits'].values())
+            res[f'{dir} {PROTOCOL_ENUM[prot]}'] = {
+                'transfers': stats['transfers'],
+                'bursts': stats['bursts'],
+                'bursts_per_transfer':
+                    sum(per_transfer) / len(per_transfer) if per_transfer else None,
+                'max_bursts_per_transfer': max(per_transfer, default=None),
+                'split_transfers': sum(1 for num in per_transfer if num > 1),
+                'deviating': stats['deviating'],
+                'unmatched': stats['unmatched'],
+                'beats': stats['beats'],
+                'splits': {reason: {
+                    'count': stats['splits'][reason],
+                    'share': stats['splits'][reason] / splits if splits else None,
+                    'short': stats['short'][reason]
+                } for reason in SPLIT_REASONS if stats['splits'][reason]}
+            }
+        return res
+
+    def format(self) -> str:
+        sections = []
+        for side, res in self.result().items():
+            mean = res['bursts_per_transfer']
+            text = f'# {side}: {res["transfers"]} transfers, {res["bursts"]} bursts, '
+            text += f'{mean:.2f} bursts per transfer (max {res["max_bursts_per_transfer"]}), ' \
+                if mean is not None else ''
+            text += f'{res["split_transfers"]} transfers split'
+            if res['deviating'] or res['unmatched']:
+                text += f', {res["deviating"]} bursts deviating from the model and ' \
+                        f'{res["unmatched"]} without a transfer'
+            rows = sorted(res['beats'].items(), key=lambda item: int(item[0].split('-')[-1]))
+            text += '\n' + tabulate([[bucket, count, 100 * count / res['bursts']]
+                for bucket, count in rows], headers=['beats', 'bursts', '%'], floatfmt='.2f')
+            if res['splits']:
+                text += '\n\n' + tabulate([[reason, split['count'], 100 * split['share'],
+                    split['short'] if reason == 'page boundary' else None]
+                    for reason, split in res['splits'].items()],
+                    headers=['split reason', 'splits', '% of splits',
+                             f'bursts <= {self.short_beats} beats'],
+                    floatfmt='.2f', missingval='-')
+            sections.append(text)
+        return '\n\n'.join(sections) if sections else 'The trace holds no address channel'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='trace_splits',
+        description='Reports how the legalizer split the transfers of a traced run'
+    )
+    parser.add_argument('--db', dest='db', nargs='*', required=True, help='Database files')
+    parser.add_argument('--trace', dest='trace_file', required=True,
+        help='Trace file or container of the run')
+    parser.add_argument('--time-window', dest='time_window', nargs=2, type=int,
+        metavar=('START', 'END'), help='Only consider the simulation times START to END')
+    parser.add_argument('--short-beats', dest='short_beats', type=int, default=4,
+        help='Bursts of at most this many beats split off by a page boundary are short')
+    args = parser.parse_args()
+
+    database = read_database(args.db)
+    report = None
+    for ele in iter_trace(args.trace_file, args.time_window):
+        if report is None:
+            params = extract_parameter([ele])
+            report = SplitEfficiency(params, get_be_info(params, database), database,
+                args.short_beats)
+        report.update(ele)
+
+    if report is None:
+        print(f'{args.trace_file} is empty', file=sys.stderr)
+        return 1
+    print(report.format())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
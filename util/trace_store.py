@@ -0,0 +1,220 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Block-compressed, seekable storage of iDMA trace files.
+
+A container is a sequence of independently compressed blocks of trace lines.
+Each block is a complete gzip member or xz stream, so the container is itself a
+valid `.gz` or `.xz` file that `zcat` or `xzcat` decompresses in full.
+
+Next to the container, `<container>.idx` holds a JSON index:
+
+    {
+        "version": 1,
+        "codec":   "gzip",
+        "cnst":    "'cnst':{...},",
+        "blocks":  [{"offset": 0, "size": 8123, "cycle": 0, "lines": 65536,
+                     "t_first": 10000, "t_last": 665350}, ...]
+    }
+
+`cycle` counts traced cycles, i.e. trace lines: the tracer only logs cycles the
+backend is active in, so it is not a clock-cycle count. `cnst` is the constant
+section of the first line. It is re-attached to the first line of an extracted
+window, so a window is a trace file of its own.
+"""
+
+import gzip
+import json
+import lzma
+import re
+
+INDEX_VERSION = 1
+
+CODECS = {
+    'gzip': (gzip.compress, gzip.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+# codec selected by the container's extension
+CODEC_EXT = {
+    '.gz': 'gzip',
+    '.xz': 'lzma',
+}
+
+DEFAULT_BLOCK_LINES = 65536
+
+TIME_RE = re.compile(r"'time': (0x[0-9a-fA-F]+)")
+CNST_RE = re.compile(r"^\{('cnst':\{[^}]*\},)")
+
+
+def index_path(path: str) -> str:
+    """Returns the path of the sidecar index of a container"""
+    return f'{path}.idx'
+
+
+def codec_of(path: str) -> str:
+    """Returns the codec of a container given its path, None for a plain trace"""
+    for ext, codec in CODEC_EXT.items():
+        if path.endswith(ext):
+            return codec
+    return None
+
+
+def line_time(line: str) -> int:
+    """Returns the simulation time of a raw trace line without parsing all of it"""
+    match = TIME_RE.search(line)
+    if not match:
+        raise ValueError(f'trace line carries no time: {line[:80]}')
+    return int(match.group(1), 16)
+
+
+def write_store(lines, path: str, codec: str = None,
+                block_lines: int = DEFAULT_BLOCK_LINES) -> dict:
+    """Writes raw trace lines into a container and its index, returns the index"""
+
+    codec = codec or codec_of(path) or 'gzip'
+    compress = CODECS[codec][0]
+    index = {'version': INDEX_VERSION, 'codec': codec, 'cnst': None, 'blocks': []}
+
+    def flush(block: list, offset: int, cycle: int, out) -> int:
+        data = compress(''.join(block).encode('utf8'))
+        out.write(data)
+        index['blocks'].append({
+            'offset': offset,
+            'size': len(data),
+            'cycle': cycle,
+            'lines': len(block),
+            't_first': line_time(block[0]),
+            't_last': line_time(block[-1])
+        })
+        return len(data)
+
+    offset = 0
+    cycle = 0
+    block = []
+    with open(path, 'wb') as out:
+        for line in lines:
+            if not line.strip():
+                continue
+            if not line.endswith('\n'):
+                line += '\n'
+            if index['cnst'] is None:
+                match = CNST_RE.match(line)
+                index['cnst'] = match.group(1) if match else ''
+            block.append(line)
+            if len(block) == block_lines:
+                offset += flush(block, offset, cycle, out)
+                cycle += len(block)
+                block = []
+        if block:
+            flush(block, offset, cycle, out)
+
+    with open(index_path(path), 'w', encoding='utf8') as idx:
+        json.dump(index, idx, indent=1)
+        idx.write('\n')
+
+    return index
+
+
+def read_index(path: str) -> dict:
+    """Reads the index of a container"""
+
+    with open(index_path(path), 'r', encoding='utf8') as idx:
+        index = json.load(idx)
+    if index.get('version') != INDEX_VERSION:
+        raise ValueError(f'{index_path(path)}: unsupported index version {index.get("version")}')
+
+    return index
+
+
+def _attach_cnst(line: str, cnst: str) -> str:
+    """Prepends the constant section to a line not carrying one"""
+    if not cnst or CNST_RE.match(line):
+        return line
+    return '{' + cnst + line[1:]
+
+
+def iter_store(path: str, time_window: tuple = None, cycle_window: tuple = None):
+    """Yields the raw lines of a container within the given inclusive windows
+
+    Only the blocks overlapping both windows are read and decompressed.
+    """
+
+    index = read_index(path)
+    decompress = CODECS[index['codec']][1]
+    t_lo, t_hi = time_window or (None, None)
+    c_lo, c_hi = cycle_window or (None, None)
+
+    first = True
+    with open(path, 'rb') as store:
+        for block in index['blocks']:
+            # skip blocks entirely outside the windows
+            c_first = block['cycle']
+            c_last = c_first + block['lines'] - 1
+            if c_lo is not None and c_last < c_lo or c_hi is not None and c_first > c_hi:
+                continue
+            if t_lo is not None and block['t_last'] < t_lo:
+                continue
+            if t_hi is not None and block['t_first'] > t_hi:
+                continue
+
+            store.seek(block['offset'])
+            data = decompress(store.read(block['size'])).decode('utf8')
+            for cycle, line in enumerate(data.splitlines(keepends=True), c_first):
+                if c_lo is not None and cycle < c_lo or c_hi is not None and cycle > c_hi:
+                    continue
+                if t_lo is not None or t_hi is not None:
+                    time = line_time(line)
+                    if t_lo is not None and time < t_lo or t_hi is not None and time > t_hi:
+                        continue
+                if first:
+                    line = _attach_cnst(line, index['cnst'])
+                    first = False
+                yield line
+
+
+def iter_plain(path: str, time_window: tuple = None, cycle_window: tuple = None):
+    """Yields the raw lines of a plain or fully compressed trace within the given windows"""
+
+    codec = codec_of(path)
+    opener = {'gzip': gzip.open, 'lzma': lzma.open}.get(codec, open)
+    t_lo, t_hi = time_window or (None, None)
+    c_lo, c_hi = cycle_window or (None, None)
+
+    cnst = ''
+    first = True
+    with opener(path, 'rt', encoding='utf8') as trace:
+        for cycle, line in enumerate(trace):
+            if not line.strip():
+                continue
+            if cycle == 0:
+                match = CNST_RE.match(line)
+                cnst = match.group(1) if match else ''
+            if c_hi is not None and cycle > c_hi:
+                break
+            if c_lo is not None and cycle < c_lo:
+                continue
+            if t_lo is not None or t_hi is not None:
+                time = line_time(line)
+                if t_hi is not None and time > t_hi:
+                    break
+                if t_lo is not None and time < t_lo:
+                    continue
+            if first:
+                line = _attach_cnst(line, cnst)
+                first = False
+            yield line
+
+
+def iter_lines(path: str, time_window: tuple = None, cycle_window: tuple = None):
+    """Yields raw trace lines, seeking through the index if the trace is a container"""
+
+    try:
+        read_index(path)
+    except FileNotFoundError:
+        return iter_plain(path, time_window, cycle_window)
+    return iter_store(path, time_window, cycle_window)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Solderpad Hardware License, Version 0.51, see LICENSE for details.
+# SPDX-License-Identifier: SHL-0.51
+
+# Authors:
+# - Thomas Benz <tbenz@iis.ee.ethz.ch>
+
+"""Reconstructs the job file of a traced run from a backend trace.
+
+Every request the backend accepted becomes one job in the 1D format of
+`jobs/README.md`, in the order it was accepted. The trace may come from the
+standalone testbench or from any system the tracer is bound into, so traffic of a
+full SoC simulation can be replayed against a backend in the standalone testbench.
+
+The trace does not carry the errors the memory injected; extracted jobs have none.
+Traces written before the tracer logged the backend options lack the burst
+limits and decoupling bits; `--max-src-len`, `--max-dst-len`, `--decouple-aw` and
+`--decouple-rw` supply them. To replay against a backend of other protocols, remap
+the extracted file with `reprotocol.py`.
+"""
+
+import argparse
+import sys
+
+from job_file import BURST_LEN, Job, write_jobs
+from trace_idma import iter_trace
+
+
+def max_len(backend: dict, side: str, default: int) -> int:
+    """Returns the maximum burst length in beats of one side of a request"""
+    if f'req_{side}_reduce_len' not in backend:
+        return default
+    if backend[f'req_{side}_reduce_len']:
+        return 1 << backend[f'req_{side}_max_llen']
+    return BURST_LEN
+
+
+def request_job(backend: dict, max_src_len: int = BURST_LEN, max_dst_len: int = BURST_LEN,
+                decouple_aw: int = 0, decouple_rw: int = 0) -> Job:
+    """Returns the job of a backend request, the defaults apply if the trace does not log them"""
+    return Job(
+        length=backend['req_length'],
+        src_addr=backend['req_src_addr'],
+        dst_addr=backend['req_dst_addr'],
+        src_protocol=backend['req_src_protocol'],
+        dst_protocol=backend['req_dst_protocol'],
+        max_src_len=max_len(backend, 'src', max_src_len),
+        max_dst_len=max_len(backend, 'dst', max_dst_len),
+        decouple_aw=backend.get('req_decouple_aw', decouple_aw),
+        decouple_rw=backend.get('req_decouple_rw', decouple_rw)
+    )
+
+
+def extract_jobs(idma_trace, args):
+    """Yields the job of every request the backend accepted in a trace"""
+
+    for ele in idma_trace:
+        backend = ele['backend']
+        if backend['req_valid'] and backend['req_ready']:
+            yield request_job(backend, args.max_src_len, args.max_dst_len, args.decouple_aw,
+                args.decouple_rw)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='trace_to_jobs',
+        description='Reconstructs the job file of a traced run'
+    )
+    parser.add_argument('--trace', dest='trace_file', required=True,
+        help='Trace file or container of the run')
+    parser.add_argument('--outfile', dest='outfile', required=True,
+        help='Job file to write')
+    parser.add_argument('--time-window', dest='time_window', nargs=2, type=int,
+        metavar=('FROM', 'TO'), help='Only extract requests within this time')
+    parser.add_argument('--max-src-len', dest='max_src_len', type=int, default=BURST_LEN,
+        help='Maximum source burst length if the trace does not log it')
+    parser.add_argument('--max-dst-len', dest='max_dst_len', type=int, default=BURST_LEN,
+        help='Maximum destination burst length if the trace does not log it')
+    parser.add_argument('--decouple-aw', dest='decouple_aw', type=int, choices=[0, 1],
+        default=0, help='Decouple R-AW bit if the trace does not log it')
+    parser.add_argument('--decouple-rw', dest='decouple_rw', type=int, choices=[0, 1],
+        default=0, help='Decouple R-W bit if the trace does not log it')
+    args = parser.parse_args()
+
+    with open(args.outfile, 'w', encoding='utf8') as job_file:
+        num_jobs = write_jobs(job_file,
+            extract_jobs(iter_trace(args.trace_file, args.time_window), args))
+
+    print(f'Extracted {num_jobs} jobs to {args.outfile}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -233,6 +233,47 @@ idma_verify_sim_%: idma_verify_toolchain
 	  test -n "$$p" && $(MAKE) $$p
 	$(IDMA_VERIFY_RUN) --suite $*
 
+.PHONY: idma_verify_perf_check idma_verify_perf idma_perf_calibrate idma_verify_legalizer_model
+
+# The performance model needs NumPy, an optional extra
+IDMA_PERF_PYTHON   ?= $(UV_RUN) --extra models python
+# Latencies of the performance model, calibrated per variant against traced runs
+IDMA_PERF_LATENCIES := $(IDMA_ROOT)/jobs/perf_latencies.json
+
+# The legalizer model and perf_bound.py split every job file of the database alike
+idma_verify_legalizer_model:
+	$(IDMA_PERF_PYTHON) $(IDMA_UTIL_DIR)/legalizer_model.py --db $(IDMA_DB_FILES) \
+	  --jobs $(IDMA_VERIFY_DB) --self-check
+
+# The suites and expectations in the database match the ones the model derives
+idma_verify_perf_check: $(IDMA_VERIFY_DIR)/perf_variants.list
+	@test -s $(IDMA_VERIFY_DIR)/perf_variants.list || \
+	  { echo "error: no variants with performance suites listed"; exit 1; }
+	$(IDMA_PERF_PYTHON) $(IDMA_UTIL_DIR)/gen_perf_suites.py --db $(IDMA_DB_FILES) \
+	  --jobs $(IDMA_VERIFY_DB) --latencies $(IDMA_PERF_LATENCIES) --check \
+	  --variant $$(cut -d' ' -f1 $(IDMA_VERIFY_DIR)/perf_variants.list)
+
+# Every performance suite runs; calibrated ones at or above their expected write utilization
+idma_verify_perf: idma_verify_toolchain idma_verify_perf_check
+	set -e; while read -r v tb; do \
+	  $(MAKE) $(IDMA_VLT_DIR)/$$tb.f; \
+	  $(IDMA_VERIFY_RUN) --db $(IDMA_VERIFY_DB) --protocol-db $(IDMA_DB_FILES) --perf $$v; \
+	done < $(IDMA_VERIFY_DIR)/perf_variants.list
+
+# Fit the model to traces of the suites, then print the jobs.json entries it derives
+idma_perf_calibrate: idma_verify_toolchain $(IDMA_VERIFY_DIR)/perf_variants.list
+	set -e; while read -r v tb; do \
+	  $(MAKE) $(IDMA_VLT_DIR)/$$tb.f; \
+	  VERILATOR="$(VERILATOR)" \
+	  IDMA_VLT_MAKEFLAGS="CXX=$(IDMA_VLT_CXX) LINK=$(IDMA_VLT_CXX) $(IDMA_VLT_MAKEFLAGS)" \
+	  $(IDMA_PERF_PYTHON) $(IDMA_UTIL_DIR)/run_verify.py --vlt-dir $(IDMA_VLT_DIR) \
+	    --db $(IDMA_VERIFY_DB) --protocol-db $(IDMA_DB_FILES) --perf $$v \
+	    --calibrate $(IDMA_PERF_LATENCIES); \
+	done < $(IDMA_VERIFY_DIR)/perf_variants.list
+	$(IDMA_PERF_PYTHON) $(IDMA_UTIL_DIR)/gen_perf_suites.py --db $(IDMA_DB_FILES) \
+	  --jobs $(IDMA_VERIFY_DB) --latencies $(IDMA_PERF_LATENCIES) \
+	  --variant $$(cut -d' ' -f1 $(IDMA_VERIFY_DIR)/perf_variants.list)
+
 
 # ---------------
 # Codegen consistency and advisory report
@@ -278,6 +319,7 @@ idma_verify_all: idma_verify_codegen idma_verify_shared idma_verify_tb_shared \
 	set -e; for s in $$(cat $(IDMA_VERIFY_DIR)/suites.list); do \
 	  $(MAKE) idma_verify_sim_$$s; \
 	done
+	$(MAKE) idma_verify_perf
 	set -e; for id in $(IDMA_BACKEND_IDS); do \
 	  $(MAKE) idma_verify_backend IDMA_VERIFY_ID=$$id; \
 	done